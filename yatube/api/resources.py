@@ -0,0 +1,129 @@
+from operator import attrgetter
+
+from django.db.models import FileField
+
+from posts.models import Comment, Follow, Group, Post
+
+USER_FIELDS = ('id', 'username', 'first_name', 'last_name')
+GROUP_FIELDS = ('id', 'title', 'slug', 'description', 'posts_count')
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def _file_url(name):
+    get = attrgetter(name)
+
+    def url(obj):
+        value = get(obj)
+        return value.url if value else None
+    return url
+
+
+class Resource:
+    """Описание модели для API: поля, связи, фильтры и порядок.
+
+    `relations` — связи, которые можно развернуть через `?include=`,
+    с полями вложенного объекта. Без `include` связь отдаётся как id.
+    `filters` — параметры запроса и соответствующие им лукапы.
+    """
+
+    def __init__(self, model, fields, ordering, relations=None,
+                 filters=None, lookup='pk'):
+        self.model = model
+        self.fields = tuple(fields)
+        self.ordering = tuple(ordering)
+        self.relations = relations or {}
+        self.filters = filters or {}
+        self.lookup = lookup
+
+    def parse(self, params):
+        """Поля и связи из `?fields=` и `?include=`."""
+        fields = _split(params.get('fields')) or list(self.fields)
+        include = _split(params.get('include'))
+        unknown = ([name for name in fields if name not in self.fields]
+                   + [name for name in include if name not in self.relations])
+        if unknown:
+            raise InvalidQuery(f'Неизвестные поля: {", ".join(unknown)}')
+        fields += [name for name in include if name not in fields]
+        return fields, include
+
+    def queryset(self, fields, include):
+        """Выборка только нужных колонок и связей."""
+        columns = {self.model._meta.pk.name}
+        columns.update(name.lstrip('-') for name in self.ordering)
+        columns.update(fields)
+        for relation in include:
+            columns.update(f'{relation}__{name}'
+                           for name in self.relations[relation])
+        queryset = self.model.objects.only(*columns)
+        return queryset.select_related(*include) if include else queryset
+
+    def filter(self, queryset, params):
+        lookups = {lookup: params[name]
+                   for name, lookup in self.filters.items() if name in params}
+        return queryset.filter(**lookups)
+
+    def serializer(self, fields, include):
+        """Функция объект -> словарь для выбранных полей.
+
+        Геттеры собираются один раз на запрос, а не на каждый объект.
+        """
+        getters = []
+        for name in fields:
+            field = self.model._meta.get_field(name)
+            if name in include:
+                getters.append((name, _nested(name, self.relations[name])))
+            elif field.is_relation:
+                getters.append((name, attrgetter(field.attname)))
+            elif isinstance(field, FileField):
+                getters.append((name, _file_url(name)))
+            else:
+                getters.append((name, attrgetter(name)))
+
+        def serialize(obj):
+            return {name: get(obj) for name, get in getters}
+        return serialize
+
+
+def _nested(name, fields):
+    get = attrgetter(name)
+
+    def nested(obj):
+        related = get(obj)
+        if related is None:
+            return None
+        return {field: getattr(related, field) for field in fields}
+    return nested
+
+
+def _split(value):
+    return [name for name in (value or '').split(',') if name]
+
+
+RESOURCES = {
+    'posts': Resource(
+        Post,
+        ('id', 'text', 'pub_date', 'updated', 'author', 'group', 'image',
+         'comments_count'),
+        ordering=('-pub_date', '-id'),
+        relations={'author': USER_FIELDS, 'group': GROUP_FIELDS},
+        filters={'group': 'group__slug', 'author': 'author__username'},
+    ),
+    'groups': Resource(
+        Group, GROUP_FIELDS, ordering=('id',), lookup='slug',
+    ),
+    'comments': Resource(
+        Comment, ('id', 'post', 'author', 'text', 'created'),
+        ordering=('-created', '-id'),
+        relations={'author': USER_FIELDS},
+        filters={'post': 'post_id', 'author': 'author__username'},
+    ),
+    'follows': Resource(
+        Follow, ('id', 'user', 'author'),
+        ordering=('-id',),
+        relations={'user': USER_FIELDS, 'author': USER_FIELDS},
+        filters={'author': 'author__username'},
+    ),
+}
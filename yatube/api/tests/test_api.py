@@ -0,0 +1,111 @@
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author',
+                                              first_name='Лев',
+                                              email='lev@example.com')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(25):
+            post = Post.objects.create(
+                text=f'Пост {number}', author=cls.author,
+                group=cls.group if number % 2 else None,
+            )
+        cls.post = post
+        Comment.objects.create(post=post, author=cls.reader, text='Первый')
+        Comment.objects.create(post=post, author=cls.author, text='Второй')
+
+    def setUp(self):
+        self.client = Client()
+
+    def get(self, name, query='', **kwargs):
+        url = reverse(f'api:{name}', kwargs=kwargs or None)
+        return self.client.get(f'{url}?{query}')
+
+    def test_cursor_pagination(self):
+        """Проверяем, что курсоры проходят все посты по одному разу"""
+        seen = []
+        url = reverse('api:posts') + '?limit=10'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            seen.extend(item['id'] for item in body['data'])
+            url = body['links']['next']
+        self.assertEqual(seen, list(
+            Post.objects.order_by('-pub_date', '-id').values_list('id',
+                                                                  flat=True)
+        ))
+
+    def test_sparse_fields(self):
+        """Проверяем, что `fields` ограничивает и ответ, и колонки SQL"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('posts', 'fields=id,text')
+        self.assertEqual(set(response.json()['data'][0]), {'id', 'text'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"image"', queries[0]['sql'])
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+    def test_include(self):
+        """Проверяем, что `include` разворачивает связи одним запросом"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('posts', 'include=author,group')
+        self.assertEqual(len(queries), 1)
+        items = response.json()['data']
+        self.assertEqual(items[0]['author'],
+                         {'id': self.author.pk, 'username': 'author',
+                          'first_name': 'Лев', 'last_name': ''})
+        self.assertIsNone(items[0]['group'])
+        self.assertEqual(items[1]['group']['slug'], 'group')
+        self.assertEqual(self.get('posts').json()['data'][0]['author'],
+                         self.author.pk)
+
+    def test_filters(self):
+        """Проверяем фильтры постов, комментариев и подписок"""
+        posts = self.get('posts', 'group=group&limit=100').json()['data']
+        self.assertEqual(len(posts), 12)
+        comments = self.get('comments', f'post={self.post.pk}').json()['data']
+        self.assertEqual([item['text'] for item in comments],
+                         ['Второй', 'Первый'])
+        self.client.force_login(self.reader)
+        follows = self.get('follows', 'include=author')
+        self.assertEqual(follows.json()['data'][0]['author']['username'],
+                         'author')
+
+    def test_follows_private(self):
+        """Проверяем, что подписки видны только их владельцу"""
+        self.assertEqual(self.get('follows').status_code, 401)
+        self.client.force_login(self.author)
+        for query in ('', 'user=reader'):
+            with self.subTest(query=query):
+                self.assertEqual(self.get('follows', query).json()['data'],
+                                 [])
+
+    def test_detail(self):
+        """Проверяем получение поста и группы по ключу"""
+        response = self.get('post', 'fields=text', pk=self.post.pk)
+        self.assertEqual(response.json(), {'data': {'text': 'Пост 24'}})
+        response = self.get('group', slug='group')
+        self.assertEqual(response.json()['data']['title'], 'Группа')
+        self.assertEqual(self.get('group', slug='missing').status_code, 404)
+
+    def test_invalid_query(self):
+        """Проверяем, что неизвестные поля и параметры дают 400"""
+        for name, query in (('posts', 'fields=password'),
+                            ('posts', 'include=comments'),
+                            ('posts', 'limit=много'),
+                            ('comments', 'post=первый')):
+            with self.subTest(query=query):
+                response = self.get(name, query)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('errors', response.json())
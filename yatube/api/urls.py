@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('v1/posts/', views.posts, name='posts'),
+    path('v1/posts/<int:pk>/', views.post, name='post'),
+    path('v1/groups/', views.groups, name='groups'),
+    path('v1/groups/<slug:slug>/', views.group, name='group'),
+    path('v1/comments/', views.comments, name='comments'),
+    path('v1/follows/', views.follows, name='follows'),
+]
@@ -0,0 +1,114 @@
+import orjson
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+
+from core.constants.constants import API_MAX_PAGE_SIZE, API_PAGE_SIZE
+from core.db.replicas import use_replica
+from core.middleware.querybudget import query_budget
+from posts.paginators import CursorPaginator
+from .resources import RESOURCES, InvalidQuery
+
+
+def _json(payload, status=200):
+    return HttpResponse(orjson.dumps(payload), status=status,
+                        content_type='application/json')
+
+
+def _error(status, message):
+    return _json({'errors': [message]}, status)
+
+
+def _link(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def _limit(params):
+    try:
+        limit = int(params.get('limit', API_PAGE_SIZE))
+    except ValueError:
+        raise InvalidQuery('limit должен быть числом')
+    return min(max(limit, 1), API_MAX_PAGE_SIZE)
+
+
+def _list(request, name, **scope):
+    """Страница ресурса по курсору одним запросом, без COUNT(*).
+
+    `scope` — лукапы, которые ограничивают выборку независимо
+    от параметров запроса.
+    """
+    resource = RESOURCES[name]
+    try:
+        fields, include = resource.parse(request.GET)
+        queryset = resource.filter(
+            resource.queryset(fields, include).filter(**scope), request.GET
+        )
+        paginator = CursorPaginator(queryset, _limit(request.GET),
+                                    ordering=resource.ordering)
+        page = paginator.get_cursor_page(request.GET.get('cursor'))
+    except (ValueError, ValidationError) as error:
+        return _error(400, str(error))
+    serialize = resource.serializer(fields, include)
+    return _json({
+        'data': [serialize(obj) for obj in page.object_list],
+        'links': {
+            'next': _link(request, paginator.next_cursor),
+            'previous': _link(request, paginator.previous_cursor),
+        },
+    })
+
+
+def _detail(request, name, value):
+    resource = RESOURCES[name]
+    try:
+        fields, include = resource.parse(request.GET)
+    except InvalidQuery as error:
+        return _error(400, str(error))
+    obj = resource.queryset(fields, include).filter(
+        **{resource.lookup: value}
+    ).first()
+    if obj is None:
+        return _error(404, 'Не найдено')
+    return _json({'data': resource.serializer(fields, include)(obj)})
+
+
+@query_budget(1)
+@use_replica
+def posts(request):
+    return _list(request, 'posts')
+
+
+@query_budget(1)
+@use_replica
+def post(request, pk):
+    return _detail(request, 'posts', pk)
+
+
+@query_budget(1)
+@use_replica
+def groups(request):
+    return _list(request, 'groups')
+
+
+@query_budget(1)
+@use_replica
+def group(request, slug):
+    return _detail(request, 'groups', slug)
+
+
+@query_budget(1)
+@use_replica
+def comments(request):
+    return _list(request, 'comments')
+
+
+@query_budget(2)
+@use_replica
+def follows(request):
+    """Только свои подписки: граф подписок сайт никому не показывает."""
+    if not request.user.is_authenticated:
+        return _error(401, 'Нужна авторизация')
+    return _list(request, 'follows', user=request.user)
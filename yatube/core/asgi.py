@@ -0,0 +1,175 @@
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+
+from core.constants.constants import UPLOAD_FORM_OVERHEAD
+
+_done = object()
+_too_large = object()
+
+
+def build_environ(scope, body):
+    """Окружение WSGI из описания соединения ASGI."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode().decode('iso-8859-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('ascii'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'CONTENT_LENGTH': str(body.seek(0, 2)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    body.seek(0)
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = (
+            str(part) for part in scope['client']
+        )
+    for name, value in scope.get('headers', ()):
+        name = name.decode('iso-8859-1').upper().replace('-', '_')
+        value = value.decode('iso-8859-1')
+        if name not in ('CONTENT_LENGTH', 'CONTENT_TYPE'):
+            name = f'HTTP_{name}'
+        if name in environ and name.startswith('HTTP_'):
+            separator = '; ' if name == 'HTTP_COOKIE' else ','
+            value = environ[name] + separator + value
+        environ[name] = value
+    return environ
+
+
+class ASGIHandler:
+    """Приложение ASGI 3 поверх обработчика WSGI Django 2.2.
+
+    Асинхронных представлений в Django 2.2 нет, поэтому представление
+    с его запросами к базе и рендерингом выполняется в пуле из
+    `ASGI_THREADS` потоков. Всё, что зависит от скорости клиента, —
+    чтение тела запроса и отдача ответа — идёт в цикле событий
+    и потока не занимает: медленный клиент держит только сокет.
+    """
+
+    def __init__(self, threads=None):
+        self.wsgi = WSGIHandler()
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads or settings.ASGI_THREADS,
+            thread_name_prefix='asgi',
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f'Соединения {scope["type"]} не поддерживаются')
+        body = await self.read_body(scope, receive)
+        if body is None:
+            return
+        if body is _too_large:
+            await send({'type': 'http.response.start', 'status': 413,
+                        'headers': [(b'content-type', b'text/plain')]})
+            await send({'type': 'http.response.body',
+                        'body': b'Request Entity Too Large'})
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            status, headers, content, response = await loop.run_in_executor(
+                self.executor, self.run, build_environ(scope, body)
+            )
+        finally:
+            body.close()
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': headers})
+        if response is None:
+            await send({'type': 'http.response.body', 'body': content})
+            return
+        try:
+            chunks = iter(response)
+            while True:
+                chunk = await loop.run_in_executor(self.executor, next,
+                                                   chunks, _done)
+                if chunk is _done:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk,
+                            'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            await loop.run_in_executor(self.executor, response.close)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, scope, receive):
+        """Тело запроса целиком; большое уходит во временный файл.
+
+        None, если клиент отключился, не дослав его. Тело больше
+        `UPLOAD_MAX_BYTES` с запасом на поля формы не дочитывается:
+        вместо него `_too_large`, и клиент получает 413.
+        """
+        limit = settings.UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD
+        for name, value in scope.get('headers', ()):
+            if (name.lower() == b'content-length' and value.isdigit()
+                    and int(value) > limit):
+                return _too_large
+        body = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if body.tell() > limit:
+                body.close()
+                return _too_large
+            if not message.get('more_body', False):
+                body.seek(0)
+                return body
+
+    def run(self, environ):
+        """Выполняет запрос в потоке пула.
+
+        Обычный ответ читается и закрывается здесь же, чтобы соединения
+        с базой освобождал тот поток, который их брал. Потоковый
+        возвращается целиком, его части читаются по одной.
+        """
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [int(status.split(' ', 1)[0]), [
+                (name.lower().encode('iso-8859-1'),
+                 value.encode('iso-8859-1'))
+                for name, value in headers
+            ]]
+
+        response = self.wsgi(environ, start_response)
+        if getattr(response, 'streaming', False):
+            return (*started, None, response)
+        try:
+            return (*started, b''.join(response), None)
+        finally:
+            response.close()
+
+
+def get_asgi_application():
+    """Как `get_wsgi_application`, только для серверов ASGI."""
+    django.setup(set_prefix=False)
+    return ASGIHandler()
@@ -0,0 +1,178 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache '
+    '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+)
+LIVE = '(expires IS NULL OR expires > ?)'
+
+
+class SQLiteCache(BaseCache):
+    """Кэш в файле SQLite, общий для всех воркеров на машине.
+
+    Файл работает в режиме WAL, поэтому читатели не ждут писателя.
+    У каждого потока своё соединение, после fork оно открывается заново.
+    Просроченные записи вычищаются раз в `CULL_EVERY` записей,
+    а при превышении `MAX_ENTRIES` удаляется `1/CULL_FREQUENCY` самых
+    старых.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.path = location
+        options = params.get('OPTIONS', {})
+        self._cull_every = int(options.get('CULL_EVERY', 100))
+        self._writes = 0
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        pid, connection = getattr(self._local, 'connection', (None, None))
+        if pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=20,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode = wal')
+            connection.execute('PRAGMA synchronous = normal')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            self._local.connection = (os.getpid(), connection)
+        return connection
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _dumps(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.execute(f'DELETE FROM cache WHERE key = ? AND NOT {LIVE}',
+                       (key, time.time()))
+            added = db.execute(
+                'INSERT OR IGNORE INTO cache VALUES (?, ?, ?)',
+                (key, self._dumps(value), self.get_backend_timeout(timeout)),
+            ).rowcount
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        self._wrote()
+        return bool(added)
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        row = self._db.execute(
+            f'SELECT value FROM cache WHERE key = ? AND {LIVE}',
+            (key, time.time()),
+        ).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        names = {self._key(key, version): key for key in keys}
+        if not names:
+            return {}
+        marks = ', '.join('?' * len(names))
+        rows = self._db.execute(
+            f'SELECT key, value FROM cache WHERE key IN ({marks}) AND {LIVE}',
+            (*names, time.time()),
+        )
+        return {names[key]: pickle.loads(value) for key, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        rows = [(self._key(key, version), self._dumps(value), expires)
+                for key, value in data.items()]
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.executemany('REPLACE INTO cache VALUES (?, ?, ?)', rows)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        self._wrote(len(rows))
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        return bool(self._db.execute(
+            f'UPDATE cache SET expires = ? WHERE key = ? AND {LIVE}',
+            (self.get_backend_timeout(timeout), key, time.time()),
+        ).rowcount)
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            marks = ', '.join('?' * len(keys))
+            self._db.execute(f'DELETE FROM cache WHERE key IN ({marks})',
+                             keys)
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._db.execute(
+            f'SELECT 1 FROM cache WHERE key = ? AND {LIVE}',
+            (key, time.time()),
+        ).fetchone() is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute(
+                f'SELECT value FROM cache WHERE key = ? AND {LIVE}',
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            db.execute('UPDATE cache SET value = ? WHERE key = ?',
+                       (self._dumps(value), key))
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return value
+
+    def clear(self):
+        self._db.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        pass
+
+    def _wrote(self, total=1):
+        self._writes += total
+        if self._writes >= self._cull_every:
+            self._writes = 0
+            self._cull()
+
+    def _cull(self):
+        db = self._db
+        db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        total = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if total > self._max_entries:
+            db.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY expires IS NULL, expires LIMIT ?)',
+                (max(total // self._cull_frequency, 1),),
+            )
@@ -0,0 +1,185 @@
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+STATS = ('l1_hits', 'l2_hits', 'misses')
+STATS_PREFIX = 'cache-stats'
+
+_stores = {}
+_stats = {}
+_locks = {}
+_missing = object()
+
+
+class TieredCache(BaseCache):
+    """Небольшой LRU в памяти процесса перед общим кэшем.
+
+    L2 — кэш из `CACHES` с именем `OPTIONS['SHARED']`, общий для всех
+    воркеров. L1 держит не больше `L1_MAX_ENTRIES` значений и не дольше
+    `L1_TIMEOUT` секунд: запись из другого процесса становится видна
+    здесь не позже, чем через это время. Запись и `add` идут в L2,
+    поэтому блокировки и счётчики остаются общими.
+
+    Попадания в L1, L2 и промахи копятся в процессе и раз в
+    `STATS_INTERVAL` секунд складываются в L2, см. `shared_stats()`.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED', 'shared')
+        self._l1_max = int(options.get('L1_MAX_ENTRIES', 1000))
+        self._l1_timeout = float(options.get('L1_TIMEOUT', 2))
+        self._stats_interval = float(options.get('STATS_INTERVAL', 10))
+        self._store = _stores.setdefault(name, OrderedDict())
+        self._stats = _stats.setdefault(name, Counter())
+        self._lock = _locks.setdefault(name, threading.Lock())
+        self._flushed = time.monotonic()
+
+    @cached_property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _remember(self, key, value, timeout=DEFAULT_TIMEOUT):
+        lifetime = self._l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            lifetime = min(lifetime, timeout)
+        with self._lock:
+            if lifetime <= 0:
+                self._store.pop(key, None)
+                return
+            self._store[key] = (pickle.dumps(value, self.pickle_protocol),
+                                time.monotonic() + lifetime)
+            self._store.move_to_end(key)
+            while len(self._store) > self._l1_max:
+                self._store.popitem(last=False)
+
+    def _recall(self, key):
+        with self._lock:
+            pickled, expires = self._store.get(key, (None, 0))
+            if expires <= time.monotonic():
+                self._store.pop(key, None)
+                return _missing
+            self._store.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def _forget(self, keys):
+        with self._lock:
+            for key in keys:
+                self._store.pop(key, None)
+
+    def _count(self, stat, total=1):
+        with self._lock:
+            self._stats[stat] += total
+        if time.monotonic() - self._flushed >= self._stats_interval:
+            self.flush_stats()
+
+    def _l1_key(self, key, version):
+        return self.make_key(key, version)
+
+    def get(self, key, default=None, version=None):
+        l1_key = self._l1_key(key, version)
+        value = self._recall(l1_key)
+        if value is not _missing:
+            self._count('l1_hits')
+            return value
+        value = self.shared.get(key, _missing, version)
+        if value is _missing:
+            self._count('misses')
+            return default
+        self._count('l2_hits')
+        self._remember(l1_key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        rest = []
+        for key in keys:
+            value = self._recall(self._l1_key(key, version))
+            if value is _missing:
+                rest.append(key)
+            else:
+                found[key] = value
+        self._count('l1_hits', len(found))
+        if rest:
+            shared = self.shared.get_many(rest, version)
+            for key, value in shared.items():
+                self._remember(self._l1_key(key, version), value)
+            self._count('l2_hits', len(shared))
+            self._count('misses', len(rest) - len(shared))
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version)
+        self._remember(self._l1_key(key, version), value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version)
+        for key, value in data.items():
+            self._remember(self._l1_key(key, version), value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version)
+        if added:
+            self._remember(self._l1_key(key, version), value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self._forget([self._l1_key(key, version)])
+        return self.shared.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        self._forget([self._l1_key(key, version) for key in keys])
+        self.shared.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        if self._recall(self._l1_key(key, version)) is not _missing:
+            return True
+        return self.shared.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version)
+        self._remember(self._l1_key(key, version), value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+        self.shared.clear()
+
+    def stats(self):
+        """Попадания и промахи этого процесса с последнего сброса в L2."""
+        return dict(self._stats)
+
+    def flush_stats(self):
+        with self._lock:
+            counts = dict(self._stats)
+            self._stats.clear()
+            self._flushed = time.monotonic()
+        for stat, total in counts.items():
+            key = f'{STATS_PREFIX}:{stat}'
+            self.shared.add(key, 0, None)
+            self.shared.incr(key, total)
+
+    def shared_stats(self):
+        """Сумма по всем процессам и доля попаданий."""
+        totals = self.shared.get_many(f'{STATS_PREFIX}:{stat}'
+                                      for stat in STATS)
+        totals = {stat: totals.get(f'{STATS_PREFIX}:{stat}', 0)
+                  for stat in STATS}
+        requests = sum(totals.values())
+        hits = totals['l1_hits'] + totals['l2_hits']
+        totals['hit_rate'] = hits / requests if requests else None
+        return totals
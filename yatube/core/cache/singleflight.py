@@ -0,0 +1,79 @@
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+LOCK_SECONDS = 10
+WAIT_SECONDS = 2
+POLL_SECONDS = 0.05
+
+
+def _store(key, compute, timeout):
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    cache.set(key, (value, delta, time.time() + timeout), timeout)
+    return value
+
+
+def _rebuild(key, compute, timeout):
+    lock = f'{key}:lock'
+    if not cache.add(lock, 1, LOCK_SECONDS):
+        return None
+    try:
+        return _store(key, compute, timeout)
+    finally:
+        cache.delete(lock)
+
+
+def _wait(key, stale=None):
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None and entry[0] != stale:
+            return entry
+    return None
+
+
+def recompute(key, compute, timeout, stale):
+    """Пересчитывает значение `stale`, оказавшееся устаревшим.
+
+    Пересчётом занимается владелец той же блокировки, что и в
+    `get_or_compute`; остальные ждут, пока в кэше появится новое
+    значение.
+    """
+    rebuilt = _rebuild(key, compute, timeout)
+    if rebuilt is not None:
+        return rebuilt
+    entry = _wait(key, stale)
+    if entry is not None:
+        return entry[0]
+    return _store(key, compute, timeout)
+
+
+def get_or_compute(key, compute, timeout, beta=1.0):
+    """Значение из кэша; пересчитывает его только один воркер.
+
+    Перед истечением срока значение пересчитывается заранее
+    с вероятностью, растущей к концу срока (XFetch), поэтому все воркеры
+    не пересчитывают его разом. При промахе пересчётом занимается
+    владелец блокировки, остальные ждут его результат.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires = entry
+        jitter = -delta * beta * math.log(1 - random.random())
+        if time.time() + jitter < expires:
+            return value
+        rebuilt = _rebuild(key, compute, timeout)
+        return value if rebuilt is None else rebuilt
+
+    rebuilt = _rebuild(key, compute, timeout)
+    if rebuilt is not None:
+        return rebuilt
+    entry = _wait(key)
+    if entry is not None:
+        return entry[0]
+    return _store(key, compute, timeout)
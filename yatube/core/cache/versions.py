@@ -0,0 +1,35 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+PREFIX = 'version'
+
+
+def _key(name):
+    return f'{PREFIX}:{name}'
+
+
+def bump(name):
+    """Выдаёт новую версию; всё, что было построено на старой, протухает."""
+    cache.set(_key(name), uuid4().hex, None)
+
+
+def bump_many(names):
+    """`bump` для многих имён одним обращением к кэшу."""
+    cache.set_many({_key(name): uuid4().hex for name in names}, None)
+
+
+def get_versions(names):
+    """Текущие версии по именам одним обращением к кэшу.
+
+    Потерянная версия заменяется новой, а не нулевой, чтобы не поднять
+    устаревшие данные, сохранённые под старой.
+    """
+    keys = {name: _key(name) for name in names}
+    found = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid4().hex, None)
+        found.update(cache.get_many(missing))
+    return {name: found.get(key, '') for name, key in keys.items()}
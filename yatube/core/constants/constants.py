@@ -1,14 +1,51 @@
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+ELEMENTS_PER_PAGE = 10
 
+COMMENTS_PER_PAGE = 20
 
-def get_object_or_none(klass, *args, **kwargs):
-    try:
-        return get_object_or_404(klass, *args, **kwargs)
-    except Http404:
-        return None
+FEED_CACHE_SECONDS = 600
 
+FEED_ITEMS = 20
 
-ELEMENTS_PER_PAGE = 10
+API_PAGE_SIZE = 20
+
+API_MAX_PAGE_SIZE = 100
+
+TIMELINE_FANOUT_LIMIT = 10000
+
+TIMELINE_BACKFILL = 200
+
+TIMELINE_PENDING_SECONDS = 300
+
+THUMBNAIL_RENDITIONS = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+
+SEARCH_LIMIT = 1000
+
+POST_IMAGE_MAX_SIZE = (1600, 1600)
+
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
+POST_IMAGE_QUALITY = 80
+
+TASK_MAX_ATTEMPTS = 5
+
+TASK_RETRY_DELAY = 10
+
+TASK_LEASE_SECONDS = 300
+
+TASK_BATCH_SIZE = 100
+
+TASK_POLL_INTERVAL = 1
+
+DIGEST_RECIPIENTS_PER_BATCH = 100
+
+DIGEST_POSTS = 20
+
+PAGE_SHARED_MAX_AGE = 30
+
+EDGE_CACHE_MAX_ENTRIES = 10000
+
+FOLLOWS_CACHE_SECONDS = 3600
 
-CACHE_SECONDS = 20
+UPLOAD_FORM_OVERHEAD = 64 * 1024
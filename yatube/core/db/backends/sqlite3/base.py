@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+from core.db.pool import PoolMixin
+
+
+class DatabaseWrapper(PoolMixin, base.DatabaseWrapper):
+    def init_connection(self, connection):
+        """Применяет `SQLITE_PRAGMAS`.
+
+        Запросы идут мимо обёрток Django, чтобы не попадать в подсчёт
+        запросов представления.
+        """
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            connection.execute(f'PRAGMA {name} = {value}')
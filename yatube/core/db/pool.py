@@ -0,0 +1,151 @@
+import threading
+import time
+
+from django.db.utils import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений с одной базой.
+
+    Одновременно выдаётся не больше `max_size` соединений, остальные
+    ждут освобождения до `timeout` секунд. Простаивающее соединение
+    старше `max_age` закрывается, остальные перед выдачей проверяются
+    функцией `check`.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=10, max_age=None,
+                 check=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.check = check
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._given = {}
+
+    def _fresh(self, created):
+        return (self.max_age is None
+                or time.monotonic() - created < self.max_age)
+
+    def _take(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, created = self._idle.pop()
+            if self._fresh(created) and (self.check is None
+                                         or self.check(connection)):
+                with self._lock:
+                    self._given[id(connection)] = created
+                return connection
+            connection.close()
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(
+                f'Нет свободного соединения за {self.timeout} с'
+            )
+        try:
+            connection = self._take()
+            if connection is None:
+                connection = self.connect()
+                with self._lock:
+                    self._given[id(connection)] = time.monotonic()
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection, reusable=True):
+        with self._lock:
+            created = self._given.pop(id(connection), None)
+            if created is None:
+                connection.close()
+                return
+            if reusable and self._fresh(created):
+                self._idle.append((connection, created))
+            else:
+                connection.close()
+        self._slots.release()
+
+    def close(self):
+        """Закрывает простаивающие соединения."""
+        with self._lock:
+            for connection, _ in self._idle:
+                connection.close()
+            self._idle.clear()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, conn_params, connect, options, check=None):
+    key = (alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(connect, check=check, **options)
+        return _pools[key]
+
+
+class PoolMixin:
+    """Выдаёт соединения `DatabaseWrapper` из `ConnectionPool`.
+
+    Пул включается ключом `OPTIONS['pool']`: `True` или словарь
+    аргументов `ConnectionPool`. `close()` возвращает соединение
+    в пул, откатив незавершённую транзакцию.
+    """
+
+    pool = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def check_connection(self, connection):
+        try:
+            connection.cursor().execute('SELECT 1')
+        except self.Database.Error:
+            return False
+        return True
+
+    def init_connection(self, connection):
+        """Настраивает только что открытое соединение.
+
+        Вызывается один раз на соединение, а не при каждой выдаче
+        из пула.
+        """
+
+    def connect_raw(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        self.init_connection(connection)
+        return connection
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options:
+            return self.connect_raw(conn_params)
+        self.pool = get_pool(
+            self.alias, conn_params, lambda: self.connect_raw(conn_params),
+            {} if options is True else options, self.check_connection,
+        )
+        return self.pool.acquire()
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        try:
+            with self.wrap_database_errors:
+                self.connection.rollback()
+        except self.Database.Error:
+            self.pool.release(self.connection, reusable=False)
+            raise
+        self.pool.release(self.connection,
+                          reusable=not self.errors_occurred)
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from itertools import count
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+PIN_COOKIE = 'db_primary'
+WRITES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_state = threading.local()
+_turns = count()
+_lags = {}
+
+
+def sync_marker(alias):
+    """Файл, время изменения которого — момент последней синхронизации."""
+    return f'{connections[alias].settings_dict["NAME"]}.synced'
+
+
+def _measure_lag(alias):
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT EXTRACT(EPOCH FROM now() - '
+                           'pg_last_xact_replay_timestamp())')
+            lag = cursor.fetchone()[0]
+        return 0 if lag is None else float(lag)
+    try:
+        return time.time() - os.path.getmtime(sync_marker(alias))
+    except OSError:
+        return None
+
+
+def replica_lag(alias):
+    """Отставание реплики в секундах; None — реплика недоступна.
+
+    Значение запоминается на `DATABASE_REPLICA_LAG_CHECK` секунд,
+    чтобы не спрашивать реплику на каждом запросе.
+    """
+    checked, lag = _lags.get(alias, (None, None))
+    now = time.monotonic()
+    interval = settings.DATABASE_REPLICA_LAG_CHECK
+    if checked is None or now - checked > interval:
+        try:
+            lag = _measure_lag(alias)
+        except DatabaseError:
+            lag = None
+        _lags[alias] = (now, lag)
+    return lag
+
+
+def choose_replica():
+    """Реплика для чтения или None, если подходящих нет."""
+    lags = {}
+    for alias in settings.DATABASE_REPLICAS:
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.DATABASE_REPLICA_MAX_LAG:
+            lags[alias] = lag
+    if not lags:
+        return None
+    if settings.DATABASE_REPLICA_STRATEGY == 'lowest_lag':
+        return min(lags, key=lags.get)
+    aliases = sorted(lags)
+    return aliases[next(_turns) % len(aliases)]
+
+
+@contextmanager
+def _reading(alias):
+    previous = getattr(_state, 'replica', None)
+    _state.replica = alias
+    try:
+        yield alias
+    finally:
+        _state.replica = previous
+
+
+def replica_reads():
+    return _reading(choose_replica())
+
+
+def primary_reads():
+    """Возвращает чтение на основную базу внутри `use_replica`.
+
+    Для всего, что попадает в общий кэш: отставшая реплика
+    не должна оставить там старые данные на весь срок записи.
+    """
+    return _reading(None)
+
+
+def is_pinned(request):
+    """Пользователь недавно писал и должен читать с основной базы."""
+    return bool(request.COOKIES.get(PIN_COOKIE))
+
+
+def use_replica(view):
+    """Читает модели `DATABASE_REPLICA_APPS` с реплики.
+
+    Пользователь, который только что что-то записал, читает
+    с основной базы, пока у него есть кука `PIN_COOKIE`.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if is_pinned(request):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+def use_primary(view):
+    """Выполняет представление на основной базе.
+
+    Если представление что-то записало, ставит куку `PIN_COOKIE`
+    на `DATABASE_REPLICA_PIN_SECONDS`: реплика может ещё не знать
+    о записи, а автор должен сразу её увидеть.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        wrote = []
+
+        def detect(execute, sql, params, many, context):
+            if sql.lstrip()[:7].upper().startswith(WRITES):
+                wrote.append(sql)
+            return execute(sql, params, many, context)
+
+        with connections[DEFAULT_DB_ALIAS].execute_wrapper(detect):
+            response = view(request, *args, **kwargs)
+        if wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1', httponly=True, samesite='Lax',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+            )
+        return response
+    return wrapper
+
+
+class ReplicaRouter:
+    """Направляет чтение в реплику внутри `use_replica`.
+
+    Запись и всё, что не входит в `DATABASE_REPLICA_APPS`,
+    например сессии и пользователи, остаются на основной базе.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = getattr(_state, 'replica', None)
+        if (alias is None or model._meta.app_label
+                not in settings.DATABASE_REPLICA_APPS):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
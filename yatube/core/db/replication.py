@@ -0,0 +1,27 @@
+import os
+import sqlite3
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .replicas import sync_marker
+
+
+def sync(alias, source=DEFAULT_DB_ALIAS):
+    """Копирует основную базу SQLite в файл реплики.
+
+    Замена настоящей репликации для локального запуска: используется
+    online backup API, так что читатели реплики не видят
+    полускопированную базу, а основная база не блокируется.
+    """
+    source_path = connections[source].settings_dict['NAME']
+    target_path = connections[alias].settings_dict['NAME']
+    primary = sqlite3.connect(source_path)
+    replica = sqlite3.connect(target_path, timeout=20)
+    try:
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
+    marker = sync_marker(alias)
+    with open(marker, 'a'):
+        os.utime(marker)
@@ -0,0 +1,13 @@
+from django.db import connections
+
+
+def check_connections(**kwargs):
+    """Закрывает сломанные постоянные соединения в начале запроса.
+
+    Включается ключом `CONN_HEALTH_CHECKS` базы, как в новых Django.
+    """
+    for connection in connections.all():
+        if (connection.connection is not None
+                and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+                and not connection.is_usable()):
+            connection.close()
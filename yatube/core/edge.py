@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.cookies import SimpleCookie
+
+from django.utils.cache import parse_etags
+
+from core.constants.constants import EDGE_CACHE_MAX_ENTRIES
+from core.db.replicas import PIN_COOKIE
+
+STATS = ('hits', 'revalidated', 'misses', 'passes')
+
+
+def _cache_control(headers):
+    directives = {}
+    for name, value in headers:
+        if name.lower() != 'cache-control':
+            continue
+        for directive in value.split(','):
+            key, _, argument = directive.strip().partition('=')
+            directives[key.lower()] = argument
+    return directives
+
+
+def _header(headers, name):
+    return next((value for key, value in headers
+                 if key.lower() == name), None)
+
+
+class EdgeCache:
+    """Кэш перед приложением WSGI, как обратный прокси или CDN.
+
+    Замена настоящему краю сети для локального запуска и замеров.
+    Хранит ответы GET с `Cache-Control: public, s-maxage` без
+    `Set-Cookie` и `Vary: Cookie`, ключ — адрес без кук. Устаревший
+    ответ переспрашивается у приложения по ETag. Запросы с кукой
+    закрепления за основной базой идут мимо кэша: только что
+    записавший пользователь видит свою запись сразу.
+    """
+
+    def __init__(self, application, max_entries=EDGE_CACHE_MAX_ENTRIES):
+        self.application = application
+        self.max_entries = max_entries
+        self.stats = Counter()
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if not self._cacheable_request(environ):
+            self._count('passes')
+            return self.application(environ, start_response)
+        key = (environ.get('HTTP_HOST', environ.get('SERVER_NAME')),
+               environ.get('PATH_INFO', ''), environ.get('QUERY_STRING', ''))
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None:
+                self._store.move_to_end(key)
+        if entry is not None and entry['expires'] > time.monotonic():
+            self._count('hits')
+            return self._serve(entry, environ, start_response)
+        upstream = dict(environ)
+        upstream.pop('HTTP_IF_MODIFIED_SINCE', None)
+        upstream.pop('HTTP_IF_NONE_MATCH', None)
+        if entry is not None and entry['etag']:
+            upstream['HTTP_IF_NONE_MATCH'] = entry['etag']
+        status, headers, body = self._fetch(upstream)
+        if status.startswith('304') and entry is not None:
+            entry['expires'] = self._expires(headers) or entry['expires']
+            entry['stored'] = time.monotonic()
+            self._count('revalidated')
+            return self._serve(entry, environ, start_response)
+        expires = self._expires(headers)
+        if not status.startswith('200') or expires is None:
+            self._count('passes')
+        else:
+            self._count('misses')
+            entry = {'status': status, 'headers': headers, 'body': body,
+                     'etag': _header(headers, 'etag'), 'expires': expires,
+                     'stored': time.monotonic()}
+            with self._lock:
+                self._store[key] = entry
+                while len(self._store) > self.max_entries:
+                    self._store.popitem(last=False)
+        start_response(status, headers)
+        return [body]
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _cacheable_request(self, environ):
+        if environ['REQUEST_METHOD'] != 'GET':
+            return False
+        if 'HTTP_AUTHORIZATION' in environ:
+            return False
+        cookies = SimpleCookie(environ.get('HTTP_COOKIE', ''))
+        return PIN_COOKIE not in cookies
+
+    def _expires(self, headers):
+        """Срок хранения из `s-maxage`; None — ответ хранить нельзя."""
+        control = _cache_control(headers)
+        vary = (_header(headers, 'vary') or '').lower()
+        if ('public' not in control or 'private' in control
+                or 'no-store' in control or 'cookie' in vary or '*' in vary
+                or _header(headers, 'set-cookie') is not None):
+            return None
+        age = control.get('s-maxage') or control.get('max-age')
+        if not age or not age.isdigit() or int(age) <= 0:
+            return None
+        return time.monotonic() + int(age)
+
+    def _fetch(self, environ):
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+
+        result = self.application(environ, start_response)
+        try:
+            body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return (*started, body)
+
+    def _serve(self, entry, environ, start_response):
+        etag = entry['etag']
+        if etag and etag in parse_etags(
+                environ.get('HTTP_IF_NONE_MATCH', '')):
+            start_response('304 Not Modified', [
+                (name, value) for name, value in entry['headers']
+                if name.lower() in ('etag', 'cache-control', 'last-modified')
+            ])
+            return []
+        age = int(time.monotonic() - entry['stored'])
+        start_response(entry['status'], entry['headers'] + [
+            ('Age', str(age)), ('X-Cache', 'HIT'),
+        ])
+        return [entry['body']]
+
+    def hit_rate(self):
+        """Доля ответов из кэша среди запросов, которые он мог обслужить."""
+        served = self.stats['hits'] + self.stats['revalidated']
+        total = served + self.stats['misses']
+        return served / total if total else None
@@ -0,0 +1,16 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания в L1, L2 и промахи кэша по всем воркерам'
+
+    def handle(self, *args, **options):
+        if not hasattr(cache, 'shared_stats'):
+            raise CommandError('Кэш по умолчанию не TieredCache')
+        stats = cache.shared_stats()
+        for name in ('l1_hits', 'l2_hits', 'misses'):
+            self.stdout.write(f'{name}: {stats[name]}')
+        rate = stats['hit_rate']
+        self.stdout.write('hit_rate: ' + ('-' if rate is None
+                                          else f'{rate:.1%}'))
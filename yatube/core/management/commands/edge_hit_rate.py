@@ -0,0 +1,65 @@
+import random
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from core.edge import STATS, EdgeCache
+from posts.models import Group, Post, User
+
+
+def _environ(path, cookie):
+    path, _, query = path.partition('?')
+    environ = {'PATH_INFO': path.encode().decode('iso-8859-1'),
+               'QUERY_STRING': query, 'HTTP_HOST': 'testserver'}
+    if cookie:
+        environ['HTTP_COOKIE'] = cookie
+    setup_testing_defaults(environ)
+    return environ
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет вошедших пользователей по общим страницам через '
+            'EdgeCache и показывает долю ответов из кэша')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        users = list(User.objects.order_by('pk')[:options['users']])
+        if not users:
+            raise CommandError('Нет пользователей, сначала seed_data')
+        cookies = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            session = client.cookies[settings.SESSION_COOKIE_NAME]
+            cookies.append(f'{session.key}={session.value}')
+        paths = [reverse('posts:main')]
+        paths += [reverse('posts:blog', args=(slug,)) for slug in
+                  Group.objects.values_list('slug', flat=True)[:10]]
+        paths += [reverse('posts:profile', args=(user.username,))
+                  for user in users]
+        paths += [reverse('posts:post_detail', args=(pk,)) for pk in
+                  Post.objects.values_list('pk', flat=True)[:20]]
+        edge = EdgeCache(WSGIHandler())
+        randomizer = random.Random(options['seed'])
+        for _ in range(options['requests']):
+            cookie = randomizer.choice(cookies)
+            for path in (randomizer.choice(paths),
+                         reverse('posts:session') + '?nav='):
+                response = edge(_environ(path, cookie),
+                                lambda status, headers: None)
+                b''.join(response)
+                if hasattr(response, 'close'):
+                    response.close()
+        for name in STATS:
+            self.stdout.write(f'{name}: {edge.stats[name]}')
+        rate = edge.hit_rate()
+        self.stdout.write('hit_rate: ' + ('-' if rate is None
+                                          else f'{rate:.1%}'))
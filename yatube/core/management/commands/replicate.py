@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db.replication import sync
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в реплики (для локального запуска)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('aliases', nargs='*',
+                            help='Реплики, по умолчанию DATABASE_REPLICAS')
+        parser.add_argument('--interval', type=float,
+                            help='Повторять каждые N секунд')
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DATABASE_REPLICAS
+        while True:
+            for alias in aliases:
+                sync(alias)
+                self.stdout.write(f'{alias}: синхронизирована')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.slow_clients import compare
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает WSGI и ASGI на одном процессе: сколько медленных '
+            'клиентов он держит одновременно')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--clients', type=int, default=200)
+        parser.add_argument('--delay', type=float, default=.5,
+                            help='Секунд на отправку запроса и на чтение '
+                                 'ответа у каждого клиента')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Потоков у воркера WSGI и в пуле ASGI')
+
+    def handle(self, *args, **options):
+        result = compare(options['path'], options['clients'],
+                         options['delay'], options['threads'])
+        self.stdout.write(f'{"mode":6} {"seconds":>8} {"peak":>6} '
+                          f'{"req/s":>8} {"errors":>6}')
+        for mode, row in result.items():
+            errors = sum(status >= 400 for status in row['statuses'])
+            self.stdout.write(
+                f'{mode:6} {row["seconds"]:8.2f} {row["peak"]:6} '
+                f'{options["clients"] / row["seconds"]:8.1f} {errors:6}'
+            )
@@ -0,0 +1,133 @@
+import logging
+import re
+import sys
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDERS = re.compile(r'\((?:%s|\?)(?:,\s*(?:%s|\?))*\)')
+TRANSACTION = re.compile(
+    r'\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE
+)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(limit):
+    """Объявляет, сколько SQL-запросов разрешено представлению."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def _location():
+    """Шаблон и строка, а если их нет — строка кода проекта."""
+    frame = sys._getframe(2)
+    code_location = None
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        if frame.f_code.co_name == 'render_annotated' and node is not None:
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f'{origin.template_name}:{token.lineno}'
+        filename = frame.f_code.co_filename
+        if (code_location is None and filename.startswith(settings.BASE_DIR)
+                and filename != __file__):
+            code_location = f'{filename}:{frame.f_lineno}'
+        frame = frame.f_back
+    return code_location
+
+
+class QueryReport:
+    """SQL-запросы одного HTTP-запроса, сгруппированные по форме."""
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.shapes = Counter()
+        self.locations = defaultdict(set)
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = PLACEHOLDERS.sub('(...)', sql)
+        self.shapes[shape] += 1
+        if self.shapes[shape] > 1:
+            self.locations[shape].add(_location())
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self):
+        return sum(self.shapes.values())
+
+    def repeated(self, threshold=None):
+        """Формы, повторившиеся не меньше `threshold` раз (N+1).
+
+        Управление транзакциями — BEGIN, точки сохранения — в бюджет
+        входит, но N+1 не считается.
+        """
+        if threshold is None:
+            threshold = settings.QUERY_BUDGET_REPEAT_THRESHOLD
+        return [
+            (shape, total, sorted(filter(None, self.locations[shape])))
+            for shape, total in self.shapes.items()
+            if total >= threshold and not TRANSACTION.match(shape)
+        ]
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.count > self.budget
+
+    def problems(self):
+        problems = []
+        if self.over_budget:
+            problems.append(
+                f'{self.count} запросов при бюджете {self.budget}'
+            )
+        for shape, total, locations in self.repeated():
+            where = ', '.join(locations) or 'место неизвестно'
+            problems.append(f'N+1: {total} раз ({where}): {shape}')
+        return problems
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы и ищет N+1.
+
+    Включается `QUERY_BUDGET_ENABLED`. Превышение бюджета из
+    `@query_budget` и повторяющиеся запросы пишутся в лог, а при
+    `QUERY_BUDGET_RAISE` поднимают `QueryBudgetExceeded` — так их ловят
+    тесты. Отчёт доступен в `response.query_report`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+        report = request.query_report = QueryReport()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(report)
+                )
+            response = self.get_response(request)
+        response.query_report = report
+        response['X-Query-Count'] = str(report.count)
+        problems = report.problems()
+        if problems:
+            message = f'{request.path}: ' + '; '.join(problems)
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        report = getattr(request, 'query_report', None)
+        if report is not None:
+            report.budget = getattr(view_func, 'query_budget', None)
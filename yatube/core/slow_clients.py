@@ -0,0 +1,102 @@
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.wsgi import WSGIHandler
+
+from .asgi import ASGIHandler, build_environ
+
+
+def _scope(path):
+    path, _, query = path.partition('?')
+    return {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path,
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 0)}
+
+
+class _Gauge:
+    """Сколько клиентов обслуживается одновременно и максимум за замер."""
+
+    def __init__(self):
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.active -= 1
+
+
+def run_wsgi(path, clients, delay, threads):
+    """Синхронный воркер: поток занят клиентом от запроса до конца ответа.
+
+    Клиент `delay` секунд присылает запрос и столько же читает ответ.
+    """
+    handler = WSGIHandler()
+    base = build_environ(_scope(path), io.BytesIO())
+    gauge = _Gauge()
+    statuses = []
+
+    def client(_):
+        with gauge:
+            time.sleep(delay)
+            response = handler(
+                dict(base, **{'wsgi.input': io.BytesIO()}),
+                lambda status, headers: statuses.append(int(status[:3])),
+            )
+            b''.join(response)
+            response.close()
+            time.sleep(delay)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(client, range(clients)))
+    return time.perf_counter() - started, gauge.peak, statuses
+
+
+def run_asgi(path, clients, delay, threads):
+    """То же через `ASGIHandler`: ожидание клиента идёт в цикле событий."""
+    handler = ASGIHandler(threads)
+    gauge = _Gauge()
+    statuses = []
+
+    async def client():
+        async def receive():
+            await asyncio.sleep(delay)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif not message.get('more_body', False):
+                await asyncio.sleep(delay)
+
+        with gauge:
+            await handler(_scope(path), receive, send)
+
+    async def main():
+        await asyncio.gather(*(client() for _ in range(clients)))
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(main())
+    finally:
+        handler.executor.shutdown(wait=True)
+    return time.perf_counter() - started, gauge.peak, statuses
+
+
+def compare(path='/', clients=200, delay=.5, threads=8):
+    """Оба режима на одном процессе: время, пик клиентов и статусы."""
+    return {
+        mode: dict(zip(('seconds', 'peak', 'statuses'),
+                       run(path, clients, delay, threads)))
+        for mode, run in (('wsgi', run_wsgi), ('asgi', run_asgi))
+    }
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.files.uploadhandler import (StopUpload,
+                                             TemporaryFileUploadHandler)
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку сразу во временный файл и не больше `UPLOAD_MAX_BYTES`.
+
+    Как только файл перешёл лимит, разбор тела прекращается, а остаток
+    запроса не читается вовсе. Имя поля попадает в
+    `request.oversized_uploads`, чтобы форма показала ошибку.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_BYTES:
+            self.request.oversized_uploads = [self.field_name]
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def oversized(request):
+    """Поля, загрузка которых оборвана из-за лимита."""
+    return getattr(request, 'oversized_uploads', [])
@@ -0,0 +1,52 @@
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+
+from core.constants.constants import DIGEST_POSTS, DIGEST_RECIPIENTS_PER_BATCH
+from .models import Notification
+
+
+def build(recipient, notifications):
+    """Письмо-сводка о новых постах для одного получателя."""
+    posts = [notification.post for notification in notifications]
+    body = render_to_string('notifications/digest.txt', {
+        'recipient': recipient,
+        'posts': posts[:DIGEST_POSTS],
+        'more': max(len(posts) - DIGEST_POSTS, 0),
+        'site_url': settings.SITE_URL,
+    })
+    return EmailMessage(f'Новые записи авторов, на которых вы подписаны: '
+                        f'{len(posts)}', body, to=[recipient.email])
+
+
+def send_digests(batch=DIGEST_RECIPIENTS_PER_BATCH, connection=None):
+    """Собирает накопленные события в письма, по одному на получателя.
+
+    Все письма уходят через одно соединение с почтовым сервером,
+    `send_messages` получает их порциями по `batch` получателей.
+    События удаляются после отправки своей порции: при сбое письмо
+    может уйти ещё раз, но не потеряется. Возвращает число писем.
+    """
+    recipients = (Notification.objects.order_by('recipient_id')
+                  .values_list('recipient_id', flat=True).distinct())
+    sent = 0
+    with connection or get_connection() as connection:
+        while True:
+            chunk = list(recipients[:batch])
+            if not chunk:
+                return sent
+            notifications = list(
+                Notification.objects.filter(recipient_id__in=chunk)
+                .select_related('recipient', 'post__author')
+                .order_by('recipient_id', '-post__pub_date')
+            )
+            messages = [
+                build(recipient, list(group)) for recipient, group in
+                groupby(notifications, key=lambda item: item.recipient)
+            ]
+            sent += connection.send_messages(messages) or 0
+            Notification.objects.filter(
+                pk__in=[notification.pk for notification in notifications]
+            ).delete()
@@ -0,0 +1,25 @@
+from posts.bulk import batches
+from posts.models import Follow, Post
+from tasks import queue
+from .models import Notification
+
+BATCH_SIZE = 1000
+
+
+@queue.task
+def new_post(post_id):
+    """Записывает новый пост в события подписчиков автора с почтой.
+
+    Пара получатель—пост уникальна, так что повторный запуск задачи
+    ничего не дублирует.
+    """
+    post = Post.objects.only('id', 'author_id').filter(pk=post_id).first()
+    if post is None:
+        return
+    followers = (Follow.objects.filter(author_id=post.author_id)
+                 .exclude(user__email='')
+                 .values_list('user_id', flat=True))
+    notifications = (Notification(recipient_id=user_id, post_id=post.pk)
+                     for user_id in followers.iterator())
+    for batch in batches(notifications, BATCH_SIZE):
+        Notification.objects.bulk_create(batch, ignore_conflicts=True)
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.constants.constants import DIGEST_RECIPIENTS_PER_BATCH
+from notifications.digest import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает накопленные уведомления сводками, письмо на человека'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int,
+                            default=DIGEST_RECIPIENTS_PER_BATCH,
+                            help='Получателей в одном вызове send_messages')
+        parser.add_argument('--interval', type=float,
+                            help='Повторять каждые N секунд')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_digests(options['batch'])
+            self.stdout.write(f'Отправлено сводок: {sent}')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
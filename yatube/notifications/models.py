@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Notification(models.Model):
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Дата события')
+
+    class Meta:
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        constraints = [
+            models.UniqueConstraint(fields=('recipient', 'post'),
+                                    name='unique_notification'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient} — {self.post}'
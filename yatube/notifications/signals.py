@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from posts.models import Post
+from tasks import queue
+from . import events
+
+
+@receiver(post_save, sender=Post)
+def notify_about_post(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        queue.enqueue(events.new_post, instance.pk,
+                      key=f'notify:{instance.pk}')
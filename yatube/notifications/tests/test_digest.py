@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.contrib.auth.tokens import default_token_generator
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post, User
+from tasks.models import Task
+from tasks.testing import run_on_commit
+from tasks.worker import run_pending
+from ..digest import send_digests
+from ..events import new_post
+from ..models import Notification
+
+
+class DigestTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader',
+                                              email='reader@example.com',
+                                              password='secret-password')
+        cls.other = User.objects.create_user(username='other',
+                                             email='other@example.com')
+        cls.silent = User.objects.create_user(username='silent')
+        for user in (cls.reader, cls.other, cls.silent):
+            Follow.objects.create(user=user, author=cls.author)
+
+    def publish(self, text):
+        with run_on_commit():
+            return Post.objects.create(text=text, author=self.author)
+
+    def test_events_for_followers_with_email(self):
+        """Проверяем, что события получают подписчики с почтой
+        и повтор задачи их не дублирует"""
+        post = self.publish('Первый')
+        new_post(post.pk)
+        self.assertCountEqual(
+            Notification.objects.values_list('recipient__username',
+                                             flat=True),
+            ['reader', 'other']
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_digest_per_recipient(self):
+        """Проверяем, что события сворачиваются в одно письмо
+        на получателя и удаляются после отправки"""
+        first = self.publish('Первый пост')
+        second = self.publish('Второй пост')
+        self.assertEqual(send_digests(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        message = next(message for message in mail.outbox
+                       if message.to == ['reader@example.com'])
+        self.assertIn('Новые записи', message.subject)
+        self.assertLess(message.body.index(second.text),
+                        message.body.index(first.text))
+        self.assertIn(reverse('posts:post_detail', args=(first.pk,)),
+                      message.body)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(send_digests(), 0)
+
+    def test_one_connection(self):
+        """Проверяем, что все порции уходят через одно соединение"""
+        self.publish('Пост')
+        connection = get_connection()
+        with mock.patch.object(connection, 'send_messages',
+                               wraps=connection.send_messages) as send, \
+                mock.patch('notifications.digest.get_connection',
+                           return_value=connection) as factory:
+            self.assertEqual(send_digests(batch=1), 2)
+        factory.assert_called_once()
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(len(send.call_args_list[0][0][0]), 1)
+
+    def test_password_reset_queued(self):
+        """Проверяем, что письмо сброса пароля уходит из очереди"""
+        with run_on_commit():
+            self.client.post(reverse('users:password_reset_form'),
+                             {'email': 'reader@example.com'})
+            self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reader@example.com'])
+
+    @override_settings(TASKS_BROKER='tasks.brokers.DatabaseBroker')
+    def test_password_reset_token_not_queued(self):
+        """Проверяем, что токен сброса не попадает в строку задачи,
+        а ссылка из письма действительна"""
+        with run_on_commit():
+            self.client.post(reverse('users:password_reset_form'),
+                             {'email': 'reader@example.com'})
+        arguments = Task.objects.get().arguments
+        self.assertNotIn('token', arguments)
+        self.assertNotIn('/reset/', arguments)
+        self.assertEqual(run_pending(), (1, 0))
+        token = default_token_generator.make_token(self.reader)
+        self.assertIn(token, mail.outbox[0].body)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Comment, Follow, Group, Post
+from .search import get_backend
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +11,11 @@ class PostAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
     list_editable = ('group',)
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return get_backend().filter(queryset, search_term), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment)
@@ -0,0 +1,87 @@
+import json
+import re
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from core.db.replicas import PIN_COOKIE
+from .benchmark import fixtures, routes
+
+SELECT = re.compile(r'^\s*SELECT\b', re.IGNORECASE)
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\S+)')
+# Таблицы-справочники, которые формы читают целиком.
+ALLOWED_SCANS = frozenset({'posts_group'})
+
+
+def explain(connection, sql):
+    """Строки плана запроса для SQLite и PostgreSQL."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return _postgres_nodes(plan[0]['Plan'])
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _postgres_nodes(node):
+    details = [node['Node Type'] + (f' on {node["Relation Name"]}'
+                                    if 'Relation Name' in node else '')]
+    for child in node.get('Plans', ()):
+        details.extend(_postgres_nodes(child))
+    return details
+
+
+def problems(plan, allowed=ALLOWED_SCANS):
+    """Полные просмотры таблиц и сортировки во временном B-дереве."""
+    found = []
+    for detail in plan:
+        scan = SQLITE_SCAN.match(detail)
+        if (scan and 'USING' not in detail and 'VIRTUAL TABLE' not in detail
+                and scan.group(1) != 'CONSTANT'
+                and scan.group(1) not in allowed):
+            found.append(detail)
+        elif detail.startswith('Seq Scan on '):
+            if detail.split()[-1] not in allowed:
+                found.append(detail)
+        elif 'TEMP B-TREE' in detail or detail in ('Sort', 'Incremental Sort'):
+            found.append(detail)
+    return found
+
+
+def audit(writes=True, allowed=ALLOWED_SCANS):
+    """Прогоняет адреса posts и разбирает планы их SELECT-запросов.
+
+    Возвращает словарь: имя адреса — список (запрос, замечания).
+    Формы отправляются внутри транзакции, которая затем откатывается.
+    Схема реплик та же, поэтому всё читается с основной базы.
+    """
+    report = {}
+    with transaction.atomic():
+        reader, author, group, post, own_post = fixtures()
+        client = Client()
+        client.force_login(reader)
+        client.cookies[PIN_COOKIE] = '1'
+        for name, method, url, data in routes(author, group, post, own_post,
+                                              writes):
+            with CaptureQueriesContext(connection) as queries:
+                if method == 'POST':
+                    client.post(url, data)
+                else:
+                    client.get(url)
+            seen = set()
+            findings = []
+            for query in queries:
+                sql = query['sql']
+                if not SELECT.match(sql) or sql in seen:
+                    continue
+                seen.add(sql)
+                found = problems(explain(connection, sql), allowed)
+                if found:
+                    findings.append((sql, found))
+            report[name] = findings
+        transaction.set_rollback(True)
+    return report
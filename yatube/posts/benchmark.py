@@ -0,0 +1,188 @@
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+from collections import defaultdict
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.db.replicas import PIN_COOKIE
+from . import urls
+from .models import Comment, Follow, Group, Post, User
+
+POST_DATA = {
+    'post_create': {'text': 'Замер'},
+    'post_edit': {'text': 'Замер, правка'},
+    'add_comment': {'text': 'Замер'},
+}
+POST_ONLY = {'add_comment'}
+WRITES = {'add_comment', 'profile_follow', 'profile_unfollow'}
+
+
+def percentile(values, share):
+    """Перцентиль по ближайшему рангу."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'), cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fixtures():
+    """Читатель с самой длинной лентой, популярный автор, группа и посты."""
+    reader = User.objects.order_by(
+        F('counters__following_count').desc(nulls_last=True), 'pk'
+    ).first()
+    author = User.objects.exclude(pk=reader.pk).order_by(
+        F('counters__followers_count').desc(nulls_last=True), 'pk'
+    ).first()
+    group = Group.objects.order_by('-posts_count', 'pk').first()
+    if group is None:
+        group = Group.objects.create(title='Замер', slug='benchmark',
+                                     description='Замер')
+    posts = []
+    for user in (author, reader):
+        post = Post.objects.filter(author=user).order_by('-pub_date').first()
+        if post is None:
+            post = Post.objects.create(text='Замер', author=user)
+        posts.append(post)
+    return reader, author, group, *posts
+
+
+def routes(author, group, post, own_post, writes=True):
+    """Запросы ко всем адресам `posts/urls.py`: имя, метод, URL, данные."""
+    values = {'slug': group.slug, 'username': author.username,
+              'post_id': post.pk, 'format': 'atom'}
+    for pattern in urls.urlpatterns:
+        name = pattern.name
+        if not writes and name in WRITES:
+            continue
+        kwargs = {key: values[key] for key in pattern.pattern.converters}
+        if name == 'post_edit':
+            kwargs['post_id'] = own_post.pk
+        url = reverse(f'{urls.app_name}:{name}', kwargs=kwargs)
+        if name == 'search':
+            url += '?q=' + post.text.split()[0]
+        if name not in POST_ONLY:
+            yield name, 'GET', url, None
+        if writes and name in POST_DATA:
+            yield f'{name}:POST', 'POST', url, POST_DATA[name]
+
+
+def _request(client, method, url, data, cold):
+    if cold:
+        cache.clear()
+    if method == 'POST':
+        return client.post(url, data)
+    return client.get(url)
+
+
+def run(rounds=20, warmup=1, cold=False, writes=True):
+    """Гоняет все адреса `rounds` раз и собирает задержки и запросы.
+
+    Память считается отдельным проходом под `tracemalloc`, чтобы
+    трассировка не искажала время. Всё идёт в транзакции, которая
+    затем откатывается, как в `advisor.audit`: формы и подписки не
+    меняют данные, и замеры разных запусков сравнимы. Поэтому же
+    чтение закреплено за основной базой, а задачи после фиксации
+    не выполняются.
+    """
+    dataset = {
+        'users': User.objects.count(),
+        'posts': Post.objects.count(),
+        'follows': Follow.objects.count(),
+        'comments': Comment.objects.count(),
+    }
+    samples = defaultdict(lambda: defaultdict(list))
+    with transaction.atomic():
+        reader, author, group, post, own_post = fixtures()
+        client = Client()
+        client.force_login(reader)
+        client.cookies[PIN_COOKIE] = '1'
+        plan = list(routes(author, group, post, own_post, writes))
+        for number in range(warmup + rounds):
+            for name, method, url, data in plan:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = _request(client, method, url, data, cold)
+                    elapsed = time.perf_counter() - started
+                if number < warmup:
+                    continue
+                samples[name]['times'].append(elapsed * 1000)
+                samples[name]['queries'].append(len(queries))
+                samples[name]['status'].append(response.status_code)
+        for name, method, url, data in plan:
+            tracemalloc.start()
+            _request(client, method, url, data, cold)
+            samples[name]['peak'].append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        transaction.set_rollback(True)
+    # В кэше остались ленты и версии, собранные на откатанных данных.
+    cache.clear()
+
+    results = {}
+    for name, method, url, data in plan:
+        times = samples[name]['times']
+        results[name] = {
+            'method': method,
+            'url': url,
+            'status': samples[name]['status'][-1],
+            'p50': round(percentile(times, .5), 3),
+            'p95': round(percentile(times, .95), 3),
+            'p99': round(percentile(times, .99), 3),
+            'mean': round(sum(times) / len(times), 3),
+            'queries': max(samples[name]['queries']),
+            'peak_kb': round(samples[name]['peak'][0] / 1024, 1),
+        }
+    return {
+        'meta': {
+            'commit': _commit(),
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'rounds': rounds,
+            'cold_cache': cold,
+            'dataset': dataset,
+        },
+        'routes': results,
+    }
+
+
+def compare(baseline, current, threshold=.2):
+    """Регрессии относительно прошлого замера.
+
+    Время и память сравниваются с допуском `threshold`,
+    число запросов — строго.
+    """
+    regressions = []
+    for name, now in current['routes'].items():
+        before = baseline['routes'].get(name)
+        if before is None:
+            continue
+        for metric in ('p95', 'peak_kb'):
+            if now[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f'{name}: {metric} {before[metric]} -> {now[metric]}'
+                )
+        if now['queries'] > before['queries']:
+            regressions.append(
+                f'{name}: queries {before["queries"]} -> {now["queries"]}'
+            )
+    return regressions
@@ -0,0 +1,136 @@
+import csv
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Comment, Follow, Post
+
+TABLES = {
+    'posts': (Post, ('id', 'text', 'pub_date', 'updated', 'author_id',
+                     'group_id', 'image')),
+    'comments': (Comment, ('id', 'post_id', 'author_id', 'text',
+                           'created')),
+    'follows': (Follow, ('id', 'user_id', 'author_id')),
+}
+FORMATS = ('ndjson', 'csv')
+
+
+def _encode(value):
+    return '' if value is None else str(value)
+
+
+def export_rows(table, stream, fmt='ndjson', chunk_size=2000):
+    """Пишет таблицу в поток построчно, не держа её в памяти."""
+    model, fields = TABLES[table]
+    rows = (model.objects.order_by('pk').values_list(*fields)
+            .iterator(chunk_size=chunk_size))
+    total = 0
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([_encode(value) for value in row])
+            total += 1
+        return total
+    for row in rows:
+        stream.write(json.dumps(dict(zip(fields, row)), default=str,
+                                ensure_ascii=False))
+        stream.write('\n')
+        total += 1
+    return total
+
+
+def _read(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _build(model, fields, record):
+    values = {}
+    for name in fields:
+        if name not in record:
+            continue
+        field = model._meta.get_field(name)
+        value = record[name]
+        if value == '' and field.null:
+            value = None
+        values[field.attname] = (None if value is None
+                                 else field.to_python(value))
+    return model(**values)
+
+
+def insert_raw(model, objs, using):
+    """Вставка пачки как есть, в своей транзакции.
+
+    Используется raw-вставка: `bulk_create` перезаписал бы даты
+    с `auto_now_add`, а при переносе данных их нужно сохранить.
+    Пустые даты с `auto_now`, например в старых выгрузках,
+    заполняются текущим временем. Сигналы моделей не вызываются,
+    производные данные пересчитывает `derived.rebuild`.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if not (field.primary_key and objs[0].pk is None)]
+    now = timezone.now()
+    for field in fields:
+        if getattr(field, 'auto_now', False):
+            for obj in objs:
+                if getattr(obj, field.attname) is None:
+                    setattr(obj, field.attname, now)
+    size = connections[using].ops.bulk_batch_size(fields, objs) or len(objs)
+    manager = model._base_manager.using(using)
+    with transaction.atomic(using=using):
+        for start in range(0, len(objs), size):
+            manager._insert(objs[start:start + size], fields=fields,
+                            raw=True, using=using)
+    return len(objs)
+
+
+def _insert_in_thread(model, objs, using):
+    try:
+        return insert_raw(model, objs, using)
+    finally:
+        connections[using].close()
+
+
+def batches(records, size):
+    """Списки по `size` записей из любого итератора."""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_rows(table, stream, fmt='ndjson', batch_size=5000, workers=1,
+                using='default'):
+    """Загружает таблицу пачками `batch_size` в `workers` потоков.
+
+    В полёте держится не больше `2 * workers` пачек,
+    так что память не зависит от размера входа.
+    """
+    model, fields = TABLES[table]
+    objects = (_build(model, fields, record) for record in _read(stream, fmt))
+    if workers <= 1:
+        return sum(insert_raw(model, batch, using)
+                   for batch in batches(objects, batch_size))
+
+    total = 0
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch in batches(objects, batch_size):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                total += sum(future.result() for future in done)
+            pending.add(
+                executor.submit(_insert_in_thread, model, batch, using)
+            )
+        total += sum(future.result() for future in pending)
+    return total
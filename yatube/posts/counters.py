@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .bulk import batches
+from .models import Comment, Follow, Group, Post, User, UserCounter
+
+BATCH_SIZE = 1000
+
+
+def _shift(queryset, **deltas):
+    """Атомарно сдвигает счётчики F-выражением, не уходя ниже нуля."""
+    return queryset.update(**{
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    })
+
+
+def bump_user(user_id, **deltas):
+    updated = _shift(UserCounter.objects.filter(user_id=user_id), **deltas)
+    if not updated and any(delta > 0 for delta in deltas.values()):
+        recount_users(User.objects.filter(pk=user_id))
+
+
+def bump_group(group_id, delta):
+    if group_id is not None:
+        _shift(Group.objects.filter(pk=group_id), posts_count=delta)
+
+
+def bump_post(post_id, delta):
+    _shift(Post.objects.filter(pk=post_id), comments_count=delta)
+
+
+def get_counters(user):
+    """Счётчики пользователя; недостающая строка пересчитывается."""
+    try:
+        return user.counters
+    except UserCounter.DoesNotExist:
+        recount_users(User.objects.filter(pk=user.pk))
+        return UserCounter.objects.get(user=user)
+
+
+def _count(model, field, ref='pk'):
+    rows = (model.objects.filter(**{field: OuterRef(ref)})
+            .order_by().values(field)
+            .annotate(total=Count('pk')).values('total'))
+    return Coalesce(Subquery(rows), 0)
+
+
+def _reconcile(queryset, **expressions):
+    """Пересчитывает поля одним UPDATE и возвращает число расхождений."""
+    drifted = queryset.annotate(**{
+        f'actual_{field}': expression
+        for field, expression in expressions.items()
+    })
+    mismatch = None
+    for field in expressions:
+        lookup = drifted.exclude(**{field: F(f'actual_{field}')})
+        mismatch = lookup if mismatch is None else mismatch | lookup
+    total = mismatch.count()
+    if total:
+        queryset.update(**expressions)
+    return total
+
+
+def recount_users(users=None):
+    users = User.objects.all() if users is None else users
+    missing = (users.filter(counters__isnull=True)
+               .values_list('pk', flat=True))
+    for batch in batches((UserCounter(user_id=pk)
+                          for pk in missing.iterator()), 1000):
+        UserCounter.objects.bulk_create(batch, ignore_conflicts=True)
+    return _reconcile(
+        UserCounter.objects.filter(user__in=users),
+        posts_count=_count(Post, 'author', 'user_id'),
+        followers_count=_count(Follow, 'author', 'user_id'),
+        following_count=_count(Follow, 'user', 'user_id'),
+    )
+
+
+def _in_batches(model, recount):
+    """Сверка пачками по `BATCH_SIZE` ключей, каждая в своей транзакции,
+    чтобы не держать блокировку записи на всю таблицу."""
+    total = 0
+    pks = model.objects.order_by('pk').values_list('pk', flat=True)
+    for batch in batches(pks.iterator(), BATCH_SIZE):
+        with transaction.atomic():
+            total += recount(model.objects.filter(pk__in=batch))
+    return total
+
+
+def reconcile():
+    """Сверяет все счётчики с реальными данными."""
+    return {
+        'users': _in_batches(User, recount_users),
+        'groups': _in_batches(Group, lambda groups: _reconcile(
+            groups, posts_count=_count(Post, 'group'))),
+        'posts': _in_batches(Post, lambda posts: _reconcile(
+            posts, comments_count=_count(Comment, 'post'))),
+    }
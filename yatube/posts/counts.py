@@ -0,0 +1,159 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils.module_loading import import_string
+
+from .models import Group, Post, UserCounter
+
+
+class CountStrategy:
+    """Способ узнать число строк в выборке."""
+
+    def count(self, queryset):
+        raise NotImplementedError
+
+
+class ExactCount(CountStrategy):
+    """Честный COUNT(*) на каждый вызов."""
+
+    def count(self, queryset):
+        return queryset.count()
+
+
+class CachedCount(CountStrategy):
+    """COUNT(*), запомненный в кэше на `POSTS_COUNT_CACHE_SECONDS`."""
+
+    key_prefix = 'count'
+
+    def __init__(self, timeout=None):
+        if timeout is None:
+            timeout = settings.POSTS_COUNT_CACHE_SECONDS
+        self.timeout = timeout
+
+    def make_key(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(
+            f'{queryset.db}:{sql}:{params!r}'.encode()
+        ).hexdigest()
+        return f'{self.key_prefix}:{digest}'
+
+    def count(self, queryset):
+        key = self.make_key(queryset)
+        value = cache.get(key)
+        if value is None:
+            value = queryset.count()
+            cache.set(key, value, self.timeout)
+        return value
+
+
+class EstimatedCount(CountStrategy):
+    """Оценка планировщика СУБД, без обхода таблицы.
+
+    PostgreSQL отдаёт оценку для любого запроса через EXPLAIN,
+    SQLite — только для всей таблицы из `sqlite_stat1` (после ANALYZE).
+    Если оценки нет, используется запасная стратегия.
+    """
+
+    fallback = CachedCount
+
+    def count(self, queryset):
+        try:
+            estimate = self.estimate(queryset)
+        except DatabaseError:
+            estimate = None
+        if estimate is None:
+            return self.fallback().count(queryset)
+        return estimate
+
+    def estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            return self._postgresql(connection, queryset)
+        if connection.vendor == 'sqlite' and not queryset.query.where:
+            return self._sqlite(connection, queryset.model._meta.db_table)
+        return None
+
+    def _postgresql(self, connection, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def _sqlite(self, connection, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return int(row[0].split()[0])
+
+
+class CounterCount(CountStrategy):
+    """Денормализованные счётчики из `posts.counters`.
+
+    Посты автора берутся из `UserCounter.posts_count`, посты группы —
+    из `Group.posts_count`, все посты — суммой счётчиков авторов.
+    Это чтение одной строки вместо COUNT(*) по постам. Учитываются
+    только поля самого поста, без соединений; прочие выборки считает
+    запасная стратегия.
+    """
+
+    fallback = CachedCount
+    counters = {
+        'author': (UserCounter, 'user_id'),
+        'group': (Group, 'pk'),
+    }
+
+    def count(self, queryset):
+        value = self.lookup(queryset)
+        if value is None:
+            return self.fallback().count(queryset)
+        return value
+
+    def lookup(self, queryset):
+        query = queryset.query
+        if (queryset.model is not Post or query.distinct
+                or query.low_mark or query.high_mark is not None):
+            return None
+        if not query.where.children:
+            return UserCounter.objects.using(queryset.db).aggregate(
+                total=Coalesce(Sum('posts_count'), 0)
+            )['total']
+        if len(query.where.children) != 1 or query.where.negated:
+            return None
+        lookup = query.where.children[0]
+        column = getattr(lookup, 'lhs', None)
+        field = getattr(column, 'target', None)
+        if (getattr(lookup, 'lookup_name', None) != 'exact'
+                or field is None or field.model is not Post
+                or column.alias != Post._meta.db_table
+                or field.name not in self.counters):
+            return None
+        model, key = self.counters[field.name]
+        return (model.objects.using(queryset.db)
+                .filter(**{key: lookup.rhs})
+                .values_list('posts_count', flat=True).first())
+
+
+def get_count_strategy(path=None):
+    return import_string(path or settings.POSTS_COUNT_STRATEGY)()
+
+
+def count_rows(queryset, exact=False):
+    """Число строк по настроенной стратегии; `exact=True` — точный COUNT."""
+    if exact:
+        return ExactCount().count(queryset)
+    return get_count_strategy().count(queryset)
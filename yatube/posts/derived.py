@@ -0,0 +1,45 @@
+from core.cache import versions
+from core.constants.constants import TIMELINE_BACKFILL
+from . import follows, timeline
+from .bulk import batches
+from .counters import reconcile
+from .models import Follow, Group, Post
+from .search import get_backend
+
+BATCH_SIZE = 1000
+SCOPES = ('feed', 'page', 'fragment')
+
+
+def expire():
+    """Меняет версии лент, страниц и фрагментов авторов и групп
+    и сбрасывает множества подписок.
+
+    Версия фрагмента поста включает версии автора и группы, так что
+    протухают и карточки. Остальной кэш, например сессии, не трогается.
+    """
+    versions.bump_many(['feed:index', 'page:index'])
+    authors = (Post.objects.order_by('author_id')
+               .values_list('author_id', flat=True).distinct())
+    groups = Group.objects.order_by('pk').values_list('pk', flat=True)
+    for kind, pks in (('author', authors), ('group', groups)):
+        for batch in batches(pks.iterator(), BATCH_SIZE):
+            versions.bump_many([f'{scope}:{kind}:{pk}'
+                                for pk in batch for scope in SCOPES])
+    readers = (Follow.objects.order_by('user_id')
+               .values_list('user_id', flat=True).distinct())
+    for batch in batches(readers.iterator(), BATCH_SIZE):
+        follows.expire_many(batch)
+
+
+def rebuild(timeline_depth=TIMELINE_BACKFILL):
+    """Пересчитывает то, что сигналы ведут для каждой записи.
+
+    Массовая вставка сигналов не вызывает: после неё нужно сверить
+    счётчики, заполнить ленты подписок и поисковый индекс и сменить
+    версии закэшированных страниц. Каждый шаг идёт пачками в отдельных
+    транзакциях, чтобы не держать блокировку записи SQLite.
+    """
+    reconcile()
+    timeline.rebuild(timeline_depth)
+    get_backend().rebuild()
+    expire()
@@ -0,0 +1,74 @@
+import hashlib
+
+from core.cache import versions
+from core.cache.singleflight import get_or_compute, recompute
+from core.constants.constants import ELEMENTS_PER_PAGE, FEED_CACHE_SECONDS
+from core.db.replicas import is_pinned, primary_reads
+from .fragments import attach_versions
+from .paginators import CursorPaginator
+
+
+def expire(scope):
+    versions.bump(f'feed:{scope}')
+
+
+def expire_post(post, previous_group_id=None):
+    """Сбрасывает все ленты, в которые входит пост."""
+    expire('index')
+    expire(f'author:{post.author_id}')
+    for group_id in {post.group_id, previous_group_id} - {None}:
+        expire(f'group:{group_id}')
+
+
+def _versions(posts):
+    return [post.fragment_version for post in posts]
+
+
+def get_page(request, scope, queryset, build_page):
+    """Страница ленты из общего кэша.
+
+    В кэше лежат сами строки страницы вместе с авторами и группами,
+    навигация и версии фрагментов постов. Попадание не ходит в базу:
+    проверяются только версии, и если пост, его автор или группа
+    изменились, страница строится заново, под той же блокировкой,
+    что и при промахе. Ключ включает версию ленты,
+    которую меняют сигналы `Post`, и курсор. Битый курсор даёт
+    первую страницу и её ключ; старые номера `?page=` не кэшируются,
+    чтобы произвольные параметры не плодили записи.
+
+    Страница для кэша строится по основной базе: реплика может ещё
+    не знать о посте, сменившем версию ленты. Тот, кто только что
+    писал, читает мимо кэша, чтобы сразу увидеть свою запись.
+    """
+    if request.GET.get('page') is not None or is_pinned(request):
+        return build_page()
+    paginator = CursorPaginator(queryset, ELEMENTS_PER_PAGE)
+    cursor = request.GET.get('cursor') or ''
+    if cursor and paginator.decode_cursor(cursor) is None:
+        cursor = ''
+    name = f'feed:{scope}'
+    generation = versions.get_versions([name])[name]
+    key = '{}:{}:{}'.format(name, generation,
+                            hashlib.md5(cursor.encode()).hexdigest())
+    built = []
+
+    def build():
+        with primary_reads():
+            page = build_page()
+        built.append(page)
+        return dict(page.paginator.dump(page),
+                    objects=list(page.object_list),
+                    versions=_versions(page.object_list))
+
+    state = get_or_compute(key, build, FEED_CACHE_SECONDS)
+    if built:
+        return built[0]
+    objects = attach_versions(state['objects'])
+    if _versions(objects) != state['versions']:
+        state = recompute(key, build, FEED_CACHE_SECONDS, state)
+        if built:
+            return built[0]
+        objects = attach_versions(state['objects'])
+        if _versions(objects) != state['versions']:
+            return build_page()
+    return paginator.load(state, objects)
@@ -0,0 +1,205 @@
+import json
+from io import StringIO
+
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import (Atom1Feed, Rss201rev2Feed,
+                                        SyndicationFeed, rfc3339_date)
+from django.utils.text import Truncator
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from core.constants.constants import FEED_ITEMS
+from core.db.replicas import use_replica
+from core.middleware.querybudget import query_budget
+from . import validators
+from .models import Group, Post, User
+
+
+class StreamingFeedMixin:
+    """Отдаёт XML ленты кусками: шапку и каждый элемент по отдельности.
+
+    Дата обновления ленты передаётся в `updated`, поэтому элементы можно
+    не держать в `self.items`, а строить по одному.
+    """
+
+    def latest_post_date(self):
+        return self.feed.get('updated') or super().latest_post_date()
+
+    def stream(self, items, encoding='utf-8'):
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, encoding)
+
+        def drain():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        handler.startDocument()
+        self.start_root(handler)
+        self.add_root_elements(handler)
+        yield drain()
+        for kwargs in items:
+            self.add_item(**kwargs)
+            item = self.items.pop()
+            handler.startElement(self.item_element, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            yield drain()
+        self.end_root(handler)
+        yield drain()
+
+
+class RssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    item_element = 'item'
+
+    def start_root(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+
+    def end_root(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class AtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_element = 'entry'
+
+    def start_root(self, handler):
+        handler.startElement('feed', self.root_attributes())
+
+    def end_root(self, handler):
+        handler.endElement('feed')
+
+
+class JSONFeed(SyndicationFeed):
+    """Лента в формате JSON Feed 1.1 для мобильных клиентов."""
+
+    content_type = 'application/feed+json; charset=utf-8'
+    version = 'https://jsonfeed.org/version/1.1'
+
+    def item_json(self, item):
+        data = {
+            'id': item['unique_id'] or item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_text': item['description'],
+            'date_published': rfc3339_date(item['pubdate']),
+        }
+        if item['author_name']:
+            data['authors'] = [{'name': item['author_name'],
+                                'url': item['author_link']}]
+        if item['categories']:
+            data['tags'] = list(item['categories'])
+        if item.get('image'):
+            data['image'] = item['image']
+        return data
+
+    def stream(self, items, encoding='utf-8'):
+        head = {
+            'version': self.version,
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'language': self.feed['language'],
+        }
+        if self.feed['description']:
+            head['description'] = self.feed['description']
+        yield json.dumps(head, ensure_ascii=False)[:-1] + ', "items": ['
+        separator = ''
+        for kwargs in items:
+            self.add_item(**kwargs)
+            item = self.items.pop()
+            yield separator + json.dumps(self.item_json(item),
+                                         ensure_ascii=False)
+            separator = ', '
+        yield ']}'
+
+    def write(self, outfile, encoding):
+        outfile.writelines(self.stream(self.items, encoding))
+
+
+FORMATS = {'atom': AtomFeed, 'rss': RssFeed, 'json': JSONFeed}
+
+
+class FeedFormatConverter:
+    regex = '|'.join(FORMATS)
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
+
+
+def _items(request, posts):
+    for post in posts:
+        link = request.build_absolute_uri(
+            reverse('posts:post_detail', args=(post.pk,))
+        )
+        yield {
+            'title': Truncator(post.text).chars(30),
+            'link': link,
+            'description': post.text,
+            'unique_id': link,
+            'pubdate': post.pub_date,
+            'author_name': post.author.get_full_name() or post.author.username,
+            'author_link': request.build_absolute_uri(
+                reverse('posts:profile', args=(post.author.username,))
+            ),
+            'categories': [post.group.title] if post.group else (),
+            'image': (request.build_absolute_uri(post.image.url)
+                      if post.image else None),
+        }
+
+
+def _response(request, format, posts, **feed):
+    """Потоковый ответ с первыми `FEED_ITEMS` постами.
+
+    Посты читаются до возврата ответа, чтобы запросы шли на реплику
+    и учитывались бюджетом; по частям строится только сам документ.
+    """
+    posts = list(posts.select_related('author', 'group')
+                 .order_by('-pub_date', '-id')[:FEED_ITEMS])
+    generator = FORMATS[format](
+        link=request.build_absolute_uri(feed.pop('link')),
+        feed_url=request.build_absolute_uri(),
+        language='ru',
+        updated=posts[0].pub_date if posts else None,
+        **feed,
+    )
+    return StreamingHttpResponse(generator.stream(_items(request, posts)),
+                                 content_type=generator.content_type)
+
+
+@query_budget(2)
+@use_replica
+@validators.conditional(validators.index, private=False)
+def index_feed(request, format):
+    return _response(request, format, Post.objects.all(),
+                     title='Последние обновления на сайте',
+                     link=reverse('posts:main'),
+                     description='')
+
+
+@query_budget(3)
+@use_replica
+@validators.conditional(validators.group, private=False)
+def group_feed(request, format, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return _response(request, format, Post.objects.filter(group=group),
+                     title=group.title,
+                     link=reverse('posts:blog', args=(slug,)),
+                     description=group.description)
+
+
+@query_budget(3)
+@use_replica
+@validators.conditional(validators.author, private=False)
+def author_feed(request, format, username):
+    author = get_object_or_404(User, username=username)
+    return _response(request, format, Post.objects.filter(author=author),
+                     title=f'Записи {author.get_full_name() or username}',
+                     link=reverse('posts:profile', args=(username,)),
+                     description='')
@@ -0,0 +1,49 @@
+from array import array
+
+from django.core.cache import cache
+
+from core.constants.constants import FOLLOWS_CACHE_SECONDS
+from .models import Follow
+
+PREFIX = 'follows'
+
+
+def _key(user_id):
+    return f'{PREFIX}:{user_id}'
+
+
+def followed_ids(user):
+    """Множество id авторов, на которых подписан пользователь.
+
+    Читается один раз за запрос и запоминается на объекте пользователя.
+    Между запросами лежит в кэше упакованным массивом id, поэтому
+    проверка подписки — поиск в `frozenset` без обращения к базе.
+    Сигналы `Follow` сбрасывают запись, см. `expire`.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    ids = getattr(user, '_followed_ids', None)
+    if ids is not None:
+        return ids
+    packed = cache.get(_key(user.pk))
+    if packed is None:
+        packed = array('q', sorted(
+            Follow.objects.filter(user_id=user.pk)
+            .values_list('author_id', flat=True)
+        )).tobytes()
+        cache.set(_key(user.pk), packed, FOLLOWS_CACHE_SECONDS)
+    ids = frozenset(array('q', packed))
+    user._followed_ids = ids
+    return ids
+
+
+def is_following(user, author_id):
+    return author_id in followed_ids(user)
+
+
+def expire(user_id):
+    cache.delete(_key(user_id))
+
+
+def expire_many(user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids])
@@ -1,9 +1,39 @@
 from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
-from .models import Comment, Post
+from . import images
+from .models import Comment, Group, Post, User
 
 
 class PostForm(forms.ModelForm):
+    def __init__(self, *args, oversized=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.oversized = oversized
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if not isinstance(image, UploadedFile):
+            return image
+        try:
+            return images.process(image)
+        except (images.ImageTooLarge, Image.DecompressionBombError):
+            raise forms.ValidationError(
+                'Слишком большое разрешение картинки'
+            )
+        except OSError:
+            raise forms.ValidationError('Картинка повреждена')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for name in self.oversized:
+            self.add_error(name, 'Файл больше {}'.format(
+                filesizeformat(settings.UPLOAD_MAX_BYTES)
+            ))
+        return cleaned_data
+
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
@@ -19,3 +49,23 @@ class CommentForm(forms.ModelForm):
         fields = ('text',)
         labels = {'text': 'Текст клмментария'}
         help_text = {'text': 'Введите здесь текст комментария'}
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(label='Запрос', max_length=200)
+    group = forms.ModelChoiceField(
+        queryset=Group.objects.all(),
+        to_field_name='slug',
+        required=False,
+        label='Группа'
+    )
+    author = forms.CharField(label='Автор', max_length=150, required=False)
+
+    def clean_author(self):
+        username = self.cleaned_data['author']
+        if not username:
+            return None
+        author = User.objects.filter(username=username).first()
+        if author is None:
+            raise forms.ValidationError('Такого автора нет')
+        return author
@@ -0,0 +1,29 @@
+from core.cache import versions
+
+
+def bump(kind, pk):
+    """Меняет версию объекта, и его фрагменты перестают совпадать."""
+    if pk is not None:
+        versions.bump(f'fragment:{kind}:{pk}')
+
+
+def _post_names(post):
+    names = [f'fragment:post:{post.pk}', f'fragment:author:{post.author_id}']
+    if post.group_id is not None:
+        names.append(f'fragment:group:{post.group_id}')
+    return names
+
+
+def attach_versions(posts):
+    """Проставляет постам `fragment_version` одним обращением к кэшу.
+
+    Версия меняется, когда меняется пост, имя автора или группа.
+    """
+    found = versions.get_versions(
+        {name for post in posts for name in _post_names(post)}
+    )
+    for post in posts:
+        post.fragment_version = '.'.join(
+            found[name] for name in _post_names(post)
+        )
+    return posts
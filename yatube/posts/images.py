@@ -0,0 +1,131 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, ImageSequence, features
+
+from core.constants.constants import (POST_IMAGE_MAX_PIXELS,
+                                      POST_IMAGE_MAX_SIZE, POST_IMAGE_QUALITY)
+
+METADATA = {'exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop'}
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif'}
+
+_executor = None
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.POSTS_IMAGE_WORKERS
+        )
+    return _executor
+
+
+def output_format(has_alpha):
+    """WebP, если Pillow собран с ним, иначе JPEG или PNG для прозрачных."""
+    preferred = settings.POSTS_IMAGE_FORMAT
+    if preferred == 'WEBP' and not features.check('webp'):
+        preferred = 'JPEG'
+    if preferred == 'JPEG' and has_alpha:
+        return 'PNG'
+    return preferred
+
+
+def reencode(source, target, max_size=POST_IMAGE_MAX_SIZE,
+             max_pixels=POST_IMAGE_MAX_PIXELS, quality=POST_IMAGE_QUALITY):
+    """Пережимает картинку из файла `source` в `target`.
+
+    Выполняется в отдельном процессе, поэтому получает и отдаёт пути,
+    а не файлы. Размер проверяется по заголовку, до декодирования.
+    Поворот из EXIF применяется к пикселям, сами метаданные
+    не сохраняются. Возвращает формат и признак того, что оригинал
+    нельзя оставить как есть.
+    """
+    with Image.open(source) as image:
+        frames = getattr(image, 'n_frames', 1)
+        if image.width * image.height * frames > max_pixels:
+            raise ImageTooLarge(f'{image.width}x{image.height}x{frames}')
+        stripped = bool(METADATA & set(image.info))
+        if frames > 1:
+            return _reencode_animation(image, target, max_size, quality,
+                                       stripped)
+        icc_profile = image.info.get('icc_profile')
+        image = ImageOps.exif_transpose(image)
+        resized = image.width > max_size[0] or image.height > max_size[1]
+        image.thumbnail(max_size, Image.LANCZOS)
+        has_alpha = (image.mode in ('RGBA', 'LA', 'PA')
+                     or 'transparency' in image.info)
+        fmt = output_format(has_alpha)
+        if fmt == 'JPEG':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        image.save(target, fmt, quality=quality, optimize=True,
+                   icc_profile=icc_profile)
+    return fmt, stripped or resized
+
+
+def _reencode_animation(image, target, max_size, quality, stripped):
+    """Анимация по кадрам: тот же предел размера и без метаданных.
+
+    Сохраняется в анимированный WebP, если Pillow его умеет, иначе в GIF.
+    """
+    frames, durations = [], []
+    for frame in ImageSequence.Iterator(image):
+        durations.append(frame.info.get('duration', 100))
+        frame = frame.convert('RGBA')
+        frame.info = {}
+        frame.thumbnail(max_size, Image.LANCZOS)
+        frames.append(frame)
+    resized = frames[0].size != image.size
+    fmt = 'WEBP' if (output_format(True) == 'WEBP'
+                     and features.check('webp_anim')) else 'GIF'
+    frames[0].save(target, fmt, save_all=True, append_images=frames[1:],
+                   duration=durations, loop=image.info.get('loop', 0),
+                   quality=quality)
+    return fmt, stripped or resized
+
+
+def _source_path(upload):
+    if hasattr(upload, 'temporary_file_path'):
+        return upload.temporary_file_path(), False
+    handle, path = tempfile.mkstemp(suffix='.upload')
+    with os.fdopen(handle, 'wb') as stream:
+        for chunk in upload.chunks():
+            stream.write(chunk)
+    return path, True
+
+
+def process(upload):
+    """Файл для сохранения вместо загруженного.
+
+    Оригинал остаётся, только если пережатие его не уменьшает
+    и в нём нечего вырезать: крошечные GIF и PNG так не раздуваются.
+    При `POSTS_IMAGE_WORKERS` работа уходит в пул процессов.
+    """
+    source, own_source = _source_path(upload)
+    handle, target = tempfile.mkstemp(suffix='.image')
+    os.close(handle)
+    try:
+        if settings.POSTS_IMAGE_WORKERS:
+            result = _get_executor().submit(reencode, source, target).result()
+        else:
+            result = reencode(source, target)
+        fmt, must_replace = result
+        if not must_replace and os.path.getsize(target) >= upload.size:
+            return upload
+        stem = os.path.splitext(os.path.basename(upload.name))[0]
+        with open(target, 'rb') as stream:
+            return ContentFile(stream.read(),
+                               name=f'{stem}.{EXTENSIONS[fmt]}')
+    finally:
+        os.unlink(target)
+        if own_source:
+            os.unlink(source)
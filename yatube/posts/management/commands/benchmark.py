@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.benchmark import compare, run
+
+
+class Command(BaseCommand):
+    help = 'Замеряет задержки, SQL-запросы и память на всех адресах posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кэш перед каждым запросом')
+        parser.add_argument('--read-only', action='store_true',
+                            help='Не отправлять формы и не подписываться')
+        parser.add_argument('--output', help='Куда сохранить JSON')
+        parser.add_argument('--baseline',
+                            help='JSON прошлого замера для сравнения')
+        parser.add_argument('--threshold', type=float, default=.2,
+                            help='Допустимый рост времени и памяти')
+
+    def handle(self, *args, **options):
+        result = run(options['rounds'], options['warmup'], options['cold'],
+                     not options['read_only'])
+        self.stdout.write(
+            f'{"route":24} {"p50":>9} {"p95":>9} {"p99":>9} '
+            f'{"queries":>7} {"peak_kb":>9}'
+        )
+        for name, row in result['routes'].items():
+            self.stdout.write(
+                f'{name:24} {row["p50"]:9.2f} {row["p95"]:9.2f} '
+                f'{row["p99"]:9.2f} {row["queries"]:7} {row["peak_kb"]:9.1f}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                json.dump(result, stream, ensure_ascii=False, indent=2)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as stream:
+                baseline = json.load(stream)
+            if baseline['meta']['dataset'] != result['meta']['dataset']:
+                self.stderr.write('Наборы данных замеров различаются')
+            regressions = compare(baseline, result, options['threshold'])
+            if regressions:
+                raise CommandError('Регрессии: ' + '; '.join(regressions))
+            self.stdout.write('Регрессий нет')
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.advisor import ALLOWED_SCANS, audit
+
+
+class Command(BaseCommand):
+    help = ('Разбирает планы SQL-запросов всех адресов posts и ищет '
+            'полные просмотры таблиц и временные сортировки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--read-only', action='store_true',
+                            help='Не отправлять формы и не подписываться')
+        parser.add_argument('--allow', action='append', default=[],
+                            metavar='TABLE',
+                            help='Таблица, которую можно читать целиком')
+
+    def handle(self, *args, **options):
+        report = audit(not options['read_only'],
+                       ALLOWED_SCANS | set(options['allow']))
+        total = 0
+        for name, findings in report.items():
+            if not findings:
+                self.stdout.write(f'{name}: OK')
+                continue
+            total += len(findings)
+            self.stdout.write(f'{name}:')
+            for sql, found in findings:
+                self.stdout.write(f'  {sql}')
+                for detail in found:
+                    self.stdout.write(f'    {detail}')
+        if total:
+            raise CommandError(f'Запросов без подходящего индекса: {total}')
+        self.stdout.write('Все запросы используют индексы')
@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.bulk import FORMATS, TABLES, export_rows
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты, комментарии или подписки в NDJSON/CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=TABLES)
+        parser.add_argument('path', nargs='?', default='-',
+                            help='Файл для выгрузки, по умолчанию stdout')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        stream = (sys.stdout if path == '-'
+                  else open(path, 'w', encoding='utf-8', newline=''))
+        try:
+            total = export_rows(options['table'], stream,
+                                options['format'], options['chunk_size'])
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        self.stderr.write(f'Выгружено строк: {total}')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import backfill
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры для постов, у которых их ещё нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Число параллельных потоков')
+        parser.add_argument('--all', action='store_true',
+                            help='Перестроить миниатюры у всех постов')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(thumbnails='')
+        post_ids = posts.values_list('pk', flat=True).iterator()
+        backfill(post_ids, options['workers'])
+        self.stdout.write('Миниатюры построены')
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.bulk import FORMATS, TABLES, import_rows
+from posts import derived
+
+
+class Command(BaseCommand):
+    help = ('Загружает посты, комментарии или подписки из NDJSON/CSV. '
+            'Строки пишутся без сигналов, поэтому затем пересчитываются '
+            'счётчики, ленты подписок, поисковый индекс и версии кэша лент')
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=TABLES)
+        parser.add_argument('path', nargs='?', default='-',
+                            help='Файл для загрузки, по умолчанию stdin')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Число потоков, пишущих пачки')
+        parser.add_argument('--skip-rebuild', '--skip-reconcile',
+                            dest='skip_rebuild', action='store_true',
+                            help='Ничего не пересчитывать после загрузки, '
+                                 'например между частями одного переноса')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        stream = (sys.stdin if path == '-'
+                  else open(path, encoding='utf-8', newline=''))
+        try:
+            total = import_rows(options['table'], stream,
+                                options['format'], options['batch_size'],
+                                options['workers'])
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(f'Загружено строк: {total}')
+        if not options['skip_rebuild']:
+            derived.rebuild()
+            self.stdout.write('Счётчики, ленты и индекс пересчитаны')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.constants.constants import TIMELINE_BACKFILL
+from posts.timeline import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Заполняет ленты подписок последними постами авторов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=TIMELINE_BACKFILL,
+                            help='Сколько последних постов автора добавить')
+
+    def handle(self, *args, **options):
+        rebuild(options['limit'])
+        self.stdout.write('Ленты подписок заполнены')
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from posts.seed import seed
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу большим набором данных для нагрузочных замеров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--follows', type=int, default=20,
+                            help='Сколько подписок в среднем у пользователя')
+        parser.add_argument('--comments', type=int, default=500000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--images', type=int, default=50,
+                            help='Сколько разных картинок создать')
+        parser.add_argument('--image-share', type=float, default=.2,
+                            help='Доля постов с картинкой')
+        parser.add_argument('--timeline-depth', type=int, default=20,
+                            help='Сколько постов автора положить в ленты')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        totals = seed(
+            users=options['users'], posts=options['posts'],
+            follows=options['follows'], comments=options['comments'],
+            groups=options['groups'], images=options['images'],
+            image_share=options['image_share'],
+            timeline_depth=options['timeline_depth'],
+            seed=options['seed'], batch_size=options['batch_size'],
+        )
+        for table, total in totals.items():
+            self.stdout.write(f'{table}: {total}')
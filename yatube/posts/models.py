@@ -1,3 +1,5 @@
+import json
+
 from django.db import models
 from django.contrib.auth import get_user_model
 
@@ -8,6 +10,11 @@ class Group(models.Model):
     title = models.CharField(max_length=200, verbose_name='Заголовок')
     slug = models.SlugField(unique=True)
     description = models.TextField(verbose_name='Описание')
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число постов'
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -20,6 +27,8 @@ class Group(models.Model):
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст')
     pub_date = models.DateTimeField(auto_now_add=True, verbose_name='Дата')
+    updated = models.DateTimeField(auto_now=True,
+                                   verbose_name='Дата изменения')
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -39,15 +48,39 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    thumbnails = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Миниатюры'
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число комментариев'
+    )
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ('-pub_date', )
+        indexes = [
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_pub_date_id_idx'),
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def thumbnail_urls(self):
+        """Адреса готовых миниатюр по именам из `THUMBNAIL_RENDITIONS`."""
+        return json.loads(self.thumbnails) if self.thumbnails else {}
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -68,6 +101,10 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-created', )
+        indexes = [
+            models.Index(fields=('post', '-created', '-id'),
+                         name='comment_post_created_id_idx'),
+        ]
 
     def __str__(self):
         return self.text
@@ -95,6 +132,81 @@ class Follow(models.Model):
                 fields=("user", "author"),
                 name="unique_user_author")
         ]
+        indexes = [
+            models.Index(fields=('author', 'user'),
+                         name='follow_author_user_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user} подписан на {self.author}'
+
+
+class UserCounter(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='counters',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число постов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число подписок'
+    )
+
+    class Meta:
+        verbose_name = 'Счётчики пользователя'
+        verbose_name_plural = 'Счётчики пользователей'
+
+    def __str__(self):
+        return f'Счётчики {self.user}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_user_post')
+        ]
+        indexes = [
+            models.Index(fields=('user', '-pub_date', '-post'),
+                         name='timeline_user_pub_date_idx'),
+            models.Index(fields=('user', 'author'),
+                         name='timeline_user_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} в ленте {self.user_id}'
@@ -0,0 +1,148 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .counts import get_count_strategy
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинатор по составному ключу сортировки.
+
+    Страница по курсору читается одним запросом
+    `WHERE key < cursor ORDER BY key LIMIT per_page + 1`,
+    поэтому её стоимость не зависит от глубины и не требует COUNT(*).
+    Обычный `get_page(number)` оставлен для старых ссылок `?page=`.
+
+    Пагинатор создаётся на один запрос: после выборки страницы
+    в нём лежат `has_next`, `has_previous` и курсоры соседних страниц.
+    """
+
+    has_next = False
+    has_previous = False
+    next_cursor = None
+    previous_cursor = None
+
+    def __init__(self, object_list, per_page,
+                 ordering=('-pub_date', '-id'), count_strategy=None,
+                 **kwargs):
+        self.ordering = tuple(ordering)
+        self.count_strategy = count_strategy or get_count_strategy()
+        super().__init__(object_list.order_by(*self.ordering),
+                         per_page, **kwargs)
+
+    @cached_property
+    def count(self):
+        return self.count_strategy.count(self.object_list)
+
+    @property
+    def _fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, name) for name in self._fields]
+        payload = json.dumps([direction, values], default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Возвращает (направление, значения ключа) или None."""
+        try:
+            payload = base64.urlsafe_b64decode(cursor.encode())
+            direction, values = json.loads(payload.decode())
+            if direction not in (NEXT, PREVIOUS):
+                return None
+            if len(values) != len(self._fields):
+                return None
+            model = self.object_list.model
+            values = [model._meta.get_field(name).to_python(value)
+                      for name, value in zip(self._fields, values)]
+        except (ValueError, TypeError, AttributeError,
+                FieldDoesNotExist, ValidationError):
+            return None
+        return direction, values
+
+    def _seek(self, values, reverse=False, ordering=None):
+        """Условие «строго после ключа» для заданного направления."""
+        condition = Q()
+        equal = {}
+        for name, value in zip(ordering or self.ordering, values):
+            descending = name.startswith('-')
+            field = name.lstrip('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def _reversed_ordering(self, ordering=None):
+        return [name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering or self.ordering]
+
+    def _rows(self, values=None, reverse=False):
+        """До `per_page + 1` объектов за ключом `values`.
+
+        При `reverse=True` объекты идут в обратном порядке сортировки.
+        """
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+        if reverse:
+            queryset = queryset.order_by(*self._reversed_ordering())
+        return list(queryset[:self.per_page + 1])
+
+    def _bind(self, page, has_next, has_previous):
+        self.has_next = has_next
+        self.has_previous = has_previous
+        if page.object_list and has_next:
+            self.next_cursor = self.encode_cursor(page.object_list[-1], NEXT)
+        if page.object_list and has_previous:
+            self.previous_cursor = self.encode_cursor(page.object_list[0],
+                                                      PREVIOUS)
+        return page
+
+    def dump(self, page):
+        """Состояние страницы для кэша: ключи объектов и навигация."""
+        return {
+            'ids': [obj.pk for obj in page.object_list],
+            'number': page.number,
+            'has_next': self.has_next,
+            'has_previous': self.has_previous,
+            'next_cursor': self.next_cursor,
+            'previous_cursor': self.previous_cursor,
+        }
+
+    def load(self, state, objects):
+        """Собирает страницу из сохранённого `dump` и объектов."""
+        self.has_next = state['has_next']
+        self.has_previous = state['has_previous']
+        self.next_cursor = state['next_cursor']
+        self.previous_cursor = state['previous_cursor']
+        return Page(objects, state['number'], self)
+
+    def page(self, number):
+        page = super().page(number)
+        page.object_list = list(page.object_list)
+        return self._bind(page, page.has_next(), page.has_previous())
+
+    def get_cursor_page(self, cursor=None):
+        """Страница по курсору; без курсора или с битым — первая."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            rows = self._rows()
+            page = Page(rows[:self.per_page], None, self)
+            return self._bind(page, len(rows) > self.per_page, False)
+
+        direction, values = decoded
+        if direction == NEXT:
+            rows = self._rows(values)
+            page = Page(rows[:self.per_page], None, self)
+            return self._bind(page, len(rows) > self.per_page, True)
+
+        rows = self._rows(values, reverse=True)
+        page = Page(rows[:self.per_page][::-1], None, self)
+        return self._bind(page, True, len(rows) > self.per_page)
@@ -0,0 +1,156 @@
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from core.constants.constants import SEARCH_LIMIT
+from tasks import queue
+from .bulk import batches
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+WORD = re.compile(r'\w+')
+BACKENDS = {'sqlite': 'posts.search.SQLiteFTSBackend'}
+
+
+class SearchBackend:
+    """Полнотекстовый поиск по `Post.text`."""
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query, group=None, author=None, limit=SEARCH_LIMIT):
+        """Ключи найденных постов, самые релевантные первыми."""
+        raise NotImplementedError
+
+    def filter(self, queryset, query):
+        """Все посты `queryset`, подходящие под запрос, без ограничения
+        числа и без ранжирования, например для поиска в админке."""
+        raise NotImplementedError
+
+
+class SimpleBackend(SearchBackend):
+    """Поиск через LIKE для баз без полнотекстового индекса."""
+
+    def filter(self, queryset, query):
+        words = WORD.findall(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(text__icontains=word)
+        return queryset
+
+    def search(self, query, group=None, author=None, limit=SEARCH_LIMIT):
+        posts = self.filter(Post.objects.all(), query)
+        if group is not None:
+            posts = posts.filter(group=group)
+        if author is not None:
+            posts = posts.filter(author=author)
+        return list(posts.values_list('pk', flat=True)[:limit])
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Инвертированный индекс SQLite FTS5 с ранжированием по bm25.
+
+    Таблица `posts_post_fts` создаётся миграцией, её `rowid` совпадает
+    с ключом поста. Слова запроса ищутся по префиксу и все сразу.
+    """
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [post.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text]
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [post_id])
+
+    def rebuild(self, batch_size=1000):
+        """Перестраивает индекс диапазонами ключей, каждый в своей
+        транзакции: поиск не пустеет и не блокирует запись надолго."""
+        table = Post._meta.db_table
+        pks = Post.objects.order_by('pk').values_list('pk', flat=True)
+        low = 0
+        for batch in batches(pks.iterator(), batch_size):
+            bounds = [low, batch[-1]]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {FTS_TABLE} '
+                               f'WHERE rowid BETWEEN %s AND %s', bounds)
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                    f'SELECT id, text FROM {table} '
+                    f'WHERE id BETWEEN %s AND %s', bounds
+                )
+            low = batch[-1] + 1
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid >= %s',
+                           [low])
+
+    @staticmethod
+    def _match(query):
+        return ' '.join(f'"{word}"*' for word in WORD.findall(query))
+
+    def filter(self, queryset, query):
+        match = self._match(query)
+        if not match:
+            return queryset.none()
+        # RawSQL в `pk__in` Django 2.2 оборачивает в лишние скобки,
+        # и подзапрос становится скалярным, поэтому условие — через extra.
+        return queryset.extra(
+            where=[f'{Post._meta.db_table}.id IN (SELECT rowid FROM '
+                   f'{FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)'],
+            params=[match],
+        )
+
+    def search(self, query, group=None, author=None, limit=SEARCH_LIMIT):
+        match = self._match(query)
+        if not match:
+            return []
+        sql = [
+            f'SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE}',
+            f'JOIN {Post._meta.db_table} p ON p.id = {FTS_TABLE}.rowid',
+            f'WHERE {FTS_TABLE} MATCH %s',
+        ]
+        params = [match]
+        if group is not None:
+            sql.append('AND p.group_id = %s')
+            params.append(group.pk)
+        if author is not None:
+            sql.append('AND p.author_id = %s')
+            params.append(author.pk)
+        sql.append(f'ORDER BY {FTS_TABLE}.rank LIMIT %s')
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(' '.join(sql), params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+def get_backend():
+    """Бэкенд из `POSTS_SEARCH_BACKEND`, а если он не задан — по СУБД:
+    FTS5 для SQLite, LIKE для остальных."""
+    path = settings.POSTS_SEARCH_BACKEND or BACKENDS.get(
+        connection.vendor, 'posts.search.SimpleBackend'
+    )
+    return import_string(path)()
+
+
+@queue.task
+def reindex(post_id):
+    """Приводит запись индекса к текущему состоянию поста."""
+    post = Post.objects.only('id', 'text').filter(pk=post_id).first()
+    if post is None:
+        get_backend().remove(post_id)
+    else:
+        get_backend().index(post)
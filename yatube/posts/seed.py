@@ -0,0 +1,130 @@
+import io
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from faker import Faker
+from PIL import Image
+
+from . import derived
+from .bulk import batches, insert_raw
+from .models import Comment, Follow, Group, Post, User
+
+PREFIX = 'bench'
+PASSWORD = 'benchmark'
+BATCH_SIZE = 5000
+
+
+def zipf(size, exponent=1.1):
+    """Накопленные веса степенного распределения для `random.choices`."""
+    return list(accumulate(1 / rank ** exponent
+                           for rank in range(1, size + 1)))
+
+
+def _images(total, rng):
+    names = []
+    for number in range(total):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        buffer = io.BytesIO()
+        Image.new('RGB', (960, 540), color).save(buffer, 'JPEG')
+        names.append(default_storage.save(f'posts/{PREFIX}_{number}.jpg',
+                                          ContentFile(buffer.getvalue())))
+    return names
+
+
+def _users(total, fake):
+    password = make_password(PASSWORD)
+    for number in range(total):
+        yield User(username=f'{PREFIX}{number}', password=password,
+                   first_name=fake.first_name(), last_name=fake.last_name())
+
+
+def _posts(total, authors, groups, images, image_share, fake, rng):
+    weights = zipf(len(authors))
+    started = timezone.now() - timedelta(days=365)
+    step = timedelta(days=365) / max(total, 1)
+    for number in range(total):
+        pub_date = started + step * number
+        yield Post(
+            text=fake.paragraph(nb_sentences=rng.randint(1, 8)),
+            author_id=rng.choices(authors, cum_weights=weights)[0],
+            group_id=rng.choice(groups) if groups and rng.random() < .5
+            else None,
+            image=rng.choice(images) if images and rng.random() < image_share
+            else '',
+            pub_date=pub_date,
+            updated=pub_date,
+        )
+
+
+def _follows(users, average, rng):
+    weights = zipf(len(users))
+    for user_id in users:
+        total = min(len(users) - 1, int(rng.expovariate(1 / average)) + 1)
+        authors = set(rng.choices(users, cum_weights=weights, k=total))
+        authors.discard(user_id)
+        for author_id in authors:
+            yield Follow(user_id=user_id, author_id=author_id)
+
+
+def _comments(total, posts, users, fake, rng):
+    now = timezone.now()
+    for _ in range(total):
+        yield Comment(post_id=rng.choice(posts), author_id=rng.choice(users),
+                      text=fake.sentence(), created=now)
+
+
+def seed(users=100000, posts=1000000, follows=20, comments=500000,
+         groups=50, images=50, image_share=.2, timeline_depth=20,
+         seed=0, batch_size=BATCH_SIZE):
+    """Заполняет базу правдоподобными данными для нагрузочных замеров.
+
+    Авторство постов и подписки распределены по степенному закону:
+    немного очень популярных авторов и длинный хвост. Одинаковый `seed`
+    даёт одинаковый набор данных, так что замеры разных коммитов
+    сравнимы. Вставка идёт пачками, минуя сигналы, поэтому счётчики,
+    ленты и поисковый индекс пересобираются в конце.
+    """
+    rng = random.Random(seed)
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+
+    Group.objects.bulk_create(
+        (Group(title=fake.catch_phrase(), slug=f'{PREFIX}-{number}',
+               description=fake.text()) for number in range(groups)),
+        ignore_conflicts=True,
+    )
+    for batch in batches(_users(users, fake), batch_size):
+        User.objects.bulk_create(batch, ignore_conflicts=True)
+    user_ids = list(User.objects.filter(username__startswith=PREFIX)
+                    .order_by('pk').values_list('pk', flat=True))
+    group_ids = list(Group.objects.filter(slug__startswith=PREFIX)
+                     .values_list('pk', flat=True))
+
+    names = _images(images, rng)
+    for batch in batches(_posts(posts, user_ids, group_ids, names,
+                                image_share, fake, rng), batch_size):
+        insert_raw(Post, batch, 'default')
+    for batch in batches(_follows(user_ids, follows, rng), batch_size):
+        Follow.objects.bulk_create(batch, ignore_conflicts=True)
+
+    post_ids = list(Post.objects.filter(author__username__startswith=PREFIX)
+                    .values_list('pk', flat=True))
+    if post_ids:
+        for batch in batches(_comments(comments, post_ids, user_ids, fake,
+                                       rng), batch_size):
+            insert_raw(Comment, batch, 'default')
+
+    derived.rebuild(timeline_depth)
+    return {
+        'users': len(user_ids),
+        'posts': len(post_ids),
+        'follows': Follow.objects.filter(
+            user__username__startswith=PREFIX).count(),
+        'comments': Comment.objects.filter(
+            post__author__username__startswith=PREFIX).count(),
+    }
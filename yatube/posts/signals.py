@@ -0,0 +1,130 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from tasks import queue
+from . import (counters, feed_cache, follows, fragments, search, thumbnails,
+               timeline, validators)
+from .models import Comment, Follow, Group, Post, User, UserCounter
+
+NAME_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=User)
+def create_user_counter(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        UserCounter.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def expire_author_fragments(sender, instance, created, update_fields,
+                            **kwargs):
+    if update_fields is None or NAME_FIELDS & set(update_fields):
+        fragments.bump('author', instance.pk)
+        if created:
+            return
+        validators.touch(
+            author_ids=[instance.pk],
+            group_ids=Post.objects.filter(author=instance)
+            .values_list('group_id', flat=True).distinct(),
+        )
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def expire_group_fragments(sender, instance, **kwargs):
+    fragments.bump('group', instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def expire_post_caches(sender, instance, **kwargs):
+    fragments.bump('post', instance.pk)
+    feed_cache.expire_post(
+        instance, getattr(instance, '_previous_group_id', None)
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(sender, instance, raw, **kwargs):
+    instance._previous_group_id = None
+    instance._image_changed = bool(instance.image)
+    if raw or instance._state.adding:
+        return
+    previous = (Post.objects.filter(pk=instance.pk)
+                .values_list('group_id', 'image').first())
+    if previous is not None:
+        instance._previous_group_id, previous_image = previous
+        instance._image_changed = previous_image != instance.image.name
+    if instance._image_changed:
+        instance.thumbnails = ''
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnails(sender, instance, raw, **kwargs):
+    changed = getattr(instance, '_image_changed', False)
+    if not raw and instance.image and changed:
+        thumbnails.schedule(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.bump_user(instance.author_id, posts_count=1)
+        counters.bump_group(instance.group_id, 1)
+        queue.enqueue(timeline.fan_out, instance.pk,
+                      key=f'fan_out:{instance.pk}')
+        return
+    previous = getattr(instance, '_previous_group_id', None)
+    if previous != instance.group_id:
+        counters.bump_group(previous, -1)
+        counters.bump_group(instance.group_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.bump_user(instance.author_id, posts_count=-1)
+    counters.bump_group(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        counters.bump_post(instance.post_id, 1)
+        fragments.bump('post', instance.post_id)
+        validators.touch(post_ids=[instance.post_id])
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.bump_post(instance.post_id, -1)
+    fragments.bump('post', instance.post_id)
+    validators.touch(post_ids=[instance.post_id])
+
+
+@receiver(post_save, sender=Follow)
+def count_saved_follow(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        counters.bump_user(instance.author_id, followers_count=1)
+        counters.bump_user(instance.user_id, following_count=1)
+        transaction.on_commit(lambda: follows.expire(instance.user_id))
+        # Как и trim, сразу: подписчик ждёт посты автора в своей ленте.
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    counters.bump_user(instance.author_id, followers_count=-1)
+    counters.bump_user(instance.user_id, following_count=-1)
+    transaction.on_commit(lambda: follows.expire(instance.user_id))
+    timeline.trim(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reindex_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        queue.enqueue(search.reindex, instance.pk,
+                      key=f'search:{instance.pk}')
@@ -0,0 +1,53 @@
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..advisor import problems
+from ..models import Comment, Follow, Group, Post, User
+
+
+class IndexAdvisorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        reader = User.objects.create_user(username='reader')
+        author = User.objects.create_user(username='author')
+        group = Group.objects.create(title='Группа', slug='group',
+                                     description='Описание')
+        Follow.objects.create(user=reader, author=author)
+        for number in range(3):
+            post = Post.objects.create(text=f'пост {number}', author=author,
+                                       group=group)
+            Post.objects.create(text=f'свой {number}', author=reader)
+            Comment.objects.create(post=post, author=reader, text='коммент')
+
+    def test_views_use_indexes(self):
+        """Проверяем, что запросы страниц не читают таблицы целиком"""
+        call_command('explain_queries', stdout=io.StringIO())
+
+    def test_problems(self):
+        """Проверяем разбор планов SQLite и PostgreSQL"""
+        plan = [
+            'SCAN posts_post',
+            'SCAN posts_post USING INDEX post_pub_date_id_idx',
+            'SEARCH auth_user USING INTEGER PRIMARY KEY (rowid=?)',
+            'SCAN posts_group',
+            'SCAN posts_post_fts VIRTUAL TABLE INDEX 0:M1',
+            'USE TEMP B-TREE FOR ORDER BY',
+            'Seq Scan on posts_comment',
+            'Index Scan on posts_post',
+            'Sort',
+        ]
+        self.assertEqual(problems(plan), [
+            'SCAN posts_post', 'USE TEMP B-TREE FOR ORDER BY',
+            'Seq Scan on posts_comment', 'Sort',
+        ])
+
+    def test_command_fails_on_problems(self):
+        """Проверяем, что команда завершается ошибкой для CI"""
+        command = 'posts.management.commands.explain_queries'
+        with mock.patch(f'{command}.ALLOWED_SCANS', frozenset()), \
+                self.assertRaisesMessage(CommandError, 'без подходящего'):
+            call_command('explain_queries', stdout=io.StringIO())
@@ -0,0 +1,107 @@
+import asyncio
+import io
+
+from django.conf import settings
+from django.test import Client, TransactionTestCase, override_settings
+
+from core.asgi import ASGIHandler, build_environ
+from core.slow_clients import _scope, compare
+from ..models import Post, User
+
+
+class ASGITest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='author')
+        self.post = Post.objects.create(text='Пост через ASGI',
+                                        author=self.user)
+        self.handler = ASGIHandler(threads=2)
+
+    def tearDown(self):
+        self.handler.executor.shutdown(wait=True)
+
+    def request(self, path, headers=(), messages=None):
+        scope = _scope(path)
+        scope['headers'] += list(headers)
+        incoming = list(messages or [{'type': 'http.request', 'body': b''}])
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(self.handler(scope, receive, send))
+        return sent
+
+    def test_page(self):
+        """Проверяем, что страница отдаётся одним сообщением"""
+        start, body = self.request('/')
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/html; charset=utf-8'),
+                      start['headers'])
+        self.assertIn(self.post.text, body['body'].decode())
+
+    def test_streaming(self):
+        """Проверяем, что потоковый ответ уходит частями"""
+        start, *chunks = self.request('/feed/rss/')
+        self.assertEqual(start['status'], 200)
+        self.assertGreater(len(chunks), 2)
+        self.assertTrue(chunks[0]['more_body'])
+        self.assertFalse(chunks[-1].get('more_body', False))
+        body = b''.join(chunk['body'] for chunk in chunks).decode()
+        self.assertIn(self.post.text, body)
+
+    def test_cookies(self):
+        """Проверяем, что сессия из заголовков доходит до представления"""
+        client = Client()
+        client.force_login(self.user)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME]
+        start, _ = self.request('/follow/', headers=[
+            (b'cookie', f'{cookie.key}={cookie.value}'.encode()),
+        ])
+        self.assertEqual(start['status'], 200)
+
+    def test_disconnect(self):
+        """Проверяем, что без тела запроса представление не вызывается"""
+        sent = self.request('/', messages=[
+            {'type': 'http.request', 'body': b'a=', 'more_body': True},
+            {'type': 'http.disconnect'},
+        ])
+        self.assertEqual(sent, [])
+
+    @override_settings(UPLOAD_MAX_BYTES=0)
+    def test_body_too_large(self):
+        """Проверяем, что слишком большое тело не дочитывается"""
+        chunk = {'type': 'http.request', 'body': b'a' * 40 * 1024,
+                 'more_body': True}
+        messages = [chunk] * 3 + [{'type': 'http.request', 'body': b''}]
+        start, _ = self.request('/', messages=messages)
+        self.assertEqual(start['status'], 413)
+        start, _ = self.request('/', headers=[
+            (b'content-length', str(1024 * 1024).encode()),
+        ], messages=[])
+        self.assertEqual(start['status'], 413)
+
+    def test_environ(self):
+        """Проверяем сборку окружения WSGI"""
+        scope = _scope('/группа/?q=1')
+        scope['headers'] += [(b'content-type', b'text/plain'),
+                             (b'cookie', b'a=1'), (b'cookie', b'b=2')]
+        environ = build_environ(scope, io.BytesIO(b'text'))
+        self.assertEqual(environ['PATH_INFO'].encode('iso-8859-1').decode(),
+                         '/группа/')
+        self.assertEqual(environ['QUERY_STRING'], 'q=1')
+        self.assertEqual(environ['CONTENT_LENGTH'], '4')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(environ['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(environ['wsgi.input'].read(), b'text')
+
+    def test_slow_clients(self):
+        """Проверяем, что ASGI держит всех медленных клиентов сразу,
+        а WSGI — не больше числа потоков"""
+        result = compare(clients=6, delay=.05, threads=2)
+        self.assertEqual(result['wsgi']['peak'], 2)
+        self.assertEqual(result['asgi']['peak'], 6)
+        for row in result.values():
+            self.assertEqual(row['statuses'], [200] * 6)
@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+
+from .. import urls
+from ..benchmark import compare, percentile, run
+from ..models import Comment, Follow, Post, User
+from ..seed import PREFIX, seed
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.totals = seed(users=8, posts=60, follows=3, comments=30,
+                          groups=2, images=0)
+
+    def test_seed(self):
+        """Проверяем, что набор данных создан без подписок на себя"""
+        self.assertEqual(self.totals['users'], 8)
+        self.assertEqual(self.totals['posts'], 60)
+        self.assertEqual(self.totals['comments'], 30)
+        self.assertFalse(
+            Follow.objects.filter(user=F('author')).exists()
+        )
+        dates = list(Post.objects.filter(author__username__startswith=PREFIX)
+                     .order_by('pk').values_list('pub_date', flat=True))
+        self.assertEqual(dates, sorted(dates))
+        self.assertTrue(User.objects.get(username=f'{PREFIX}0')
+                        .check_password('benchmark'))
+
+    def test_run_covers_every_route(self):
+        """Проверяем, что замер проходит по всем адресам posts"""
+        counts = [model.objects.count() for model in (Post, Comment, Follow)]
+        result = run(rounds=2)
+        self.assertEqual(
+            [model.objects.count() for model in (Post, Comment, Follow)],
+            counts
+        )
+        names = {name.split(':')[0] for name in result['routes']}
+        self.assertEqual(names,
+                         {pattern.name for pattern in urls.urlpatterns})
+        for name, row in result['routes'].items():
+            with self.subTest(name=name):
+                self.assertIn(row['status'], (200, 302))
+                self.assertLessEqual(row['p50'], row['p99'])
+                self.assertGreater(row['queries'], 0)
+        self.assertEqual(result['meta']['dataset']['users'],
+                         User.objects.count())
+
+    def test_compare(self):
+        """Проверяем, что сравнение находит регрессии"""
+        row = {'p95': 10, 'peak_kb': 100, 'queries': 3}
+        baseline = {'routes': {'main': row}}
+        self.assertEqual(compare(baseline, baseline), [])
+        slower = {'routes': {'main': dict(row, p95=13, queries=4)}}
+        self.assertEqual(len(compare(baseline, slower)), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], .5), 2)
+
+    def test_command_writes_json(self):
+        """Проверяем, что команда сохраняет результат в JSON"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'result.json')
+        call_command('benchmark', rounds=1, read_only=True, output=path,
+                     stdout=io.StringIO())
+        with open(path, encoding='utf-8') as stream:
+            result = json.load(stream)
+        self.assertIn('main', result['routes'])
+        self.assertNotIn('profile_follow', result['routes'])
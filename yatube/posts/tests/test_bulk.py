@@ -0,0 +1,81 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.cache import versions
+
+from ..models import (Comment, Follow, Post, TimelineEntry, User,
+                      UserCounter)
+from ..search import get_backend
+
+
+class BulkDataTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_import_rebuilds_derived(self):
+        """Проверяем, что загруженные посты попадают в ленты подписок
+        и поисковый индекс"""
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.user)
+        post = Post.objects.create(text='перенесённый', author=self.user)
+        path = os.path.join(self.directory, 'posts.ndjson')
+        call_command('export_data', 'posts', path, stderr=io.StringIO())
+        Post.objects.all().delete()
+        call_command('import_data', 'posts', path, stdout=io.StringIO())
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=reader, post_id=post.pk).exists())
+        self.assertEqual(get_backend().search('перенесённый'), [post.pk])
+
+    def test_import_expires_only_feeds(self):
+        """Проверяем, что загрузка меняет версии лент автора, а
+        остальной кэш сохраняется"""
+        Post.objects.create(text='пост', author=self.user)
+        path = os.path.join(self.directory, 'posts.ndjson')
+        call_command('export_data', 'posts', path, stderr=io.StringIO())
+        Post.objects.all().delete()
+        cache.set('session', 'данные')
+        scope = f'feed:author:{self.user.pk}'
+        before = versions.get_versions([scope, 'feed:index'])
+        call_command('import_data', 'posts', path, stdout=io.StringIO())
+        after = versions.get_versions([scope, 'feed:index'])
+        self.assertNotEqual(before[scope], after[scope])
+        self.assertNotEqual(before['feed:index'], after['feed:index'])
+        self.assertEqual(cache.get('session'), 'данные')
+
+    def test_roundtrip(self):
+        """Проверяем выгрузку и загрузку постов и комментариев"""
+        for fmt in ('ndjson', 'csv'):
+            with self.subTest(fmt=fmt):
+                post = Post.objects.create(text='пост', author=self.user)
+                Comment.objects.create(text='комментарий', post=post,
+                                       author=self.user)
+                for table in ('posts', 'comments'):
+                    path = os.path.join(self.directory, f'{table}.{fmt}')
+                    call_command('export_data', table, path,
+                                 '--format', fmt, stderr=io.StringIO())
+                Post.objects.all().delete()
+
+                for table in ('posts', 'comments'):
+                    path = os.path.join(self.directory, f'{table}.{fmt}')
+                    call_command('import_data', table, path,
+                                 '--format', fmt, '--batch-size', '1',
+                                 stdout=io.StringIO())
+
+                imported = Post.objects.get(pk=post.pk)
+                self.assertEqual(imported.pub_date, post.pub_date)
+                self.assertEqual(imported.comments_count, 1)
+                self.assertEqual(
+                    UserCounter.objects.get(user=self.user).posts_count, 1)
+                Post.objects.all().delete()
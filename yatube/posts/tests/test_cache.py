@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.cache.singleflight import get_or_compute, recompute
+from ..models import Post, User
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def page_ids(self, url):
+        response = self.client.get(url)
+        return [post.id for post in response.context['page_obj']]
+
+    def test_new_post_invalidates_feeds(self):
+        """Проверяем, что новый пост сразу виден во всех лентах"""
+        urls = (reverse('posts:main'),
+                reverse('posts:profile', kwargs={'username': 'author'}))
+        for url in urls:
+            self.page_ids(url)
+        post = Post.objects.create(text='новый', author=self.user)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.page_ids(url)[0], post.id)
+
+    def test_cached_feed_skips_list_query(self):
+        """Проверяем, что повторный запрос не ходит в базу за лентой"""
+        Post.objects.create(text='пост', author=self.user)
+        url = reverse('posts:main')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_author_rename_rebuilds_page(self):
+        """Проверяем, что смена имени автора перестраивает страницу"""
+        Post.objects.create(text='пост', author=self.user)
+        url = reverse('posts:main')
+        self.client.get(url)
+        self.user.first_name = 'Новое'
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(
+            response.context['page_obj'][0].author.first_name, 'Новое'
+        )
+
+    def test_only_valid_cursors_cached(self):
+        """Проверяем, что битые курсоры и номера страниц
+        не создают записей в кэше"""
+        Post.objects.create(text='пост', author=self.user)
+        url = reverse('posts:main')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url, {'cursor': 'мусор'})
+        with mock.patch('posts.feed_cache.get_or_compute') as cached:
+            self.client.get(url, {'page': 'x'})
+        cached.assert_not_called()
+
+    def test_single_flight(self):
+        """Проверяем, что значение пересчитывается один раз"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 'значение'
+
+        self.assertEqual(get_or_compute('key', compute, 60), 'значение')
+        self.assertEqual(get_or_compute('key', compute, 60), 'значение')
+        self.assertEqual(len(calls), 1)
+
+        cache.add('other:lock', 1)
+        cache.set('other', ('готово', 0, float('inf')))
+        self.assertEqual(get_or_compute('other', compute, 60), 'готово')
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_recompute_single_flight(self):
+        """Проверяем, что устаревшее значение пересчитывает только
+        владелец блокировки, а остальные ждут его результат"""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 'своё'
+
+        def other_worker(seconds):
+            cache.set('key', ('новое', 0, float('inf')))
+
+        cache.set('key', ('старое', 0, float('inf')))
+        cache.add('key:lock', 1)
+        with mock.patch('core.cache.singleflight.time.sleep',
+                        side_effect=other_worker):
+            self.assertEqual(recompute('key', compute, 60, 'старое'),
+                             'новое')
+        self.assertEqual(calls, [])
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from core.cache.backends.sqlite import SQLiteCache
+from core.cache.backends.tiered import TieredCache
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'cache.sqlite3')
+        self.cache = SQLiteCache(self.path, {})
+
+    def test_operations(self):
+        """Проверяем основные операции кэша"""
+        cache = self.cache
+        cache.set('a', {'value': 1})
+        self.assertEqual(cache.get('a'), {'value': 1})
+        self.assertFalse(cache.add('a', 2))
+        self.assertTrue(cache.add('b', 2))
+        self.assertEqual(cache.incr('b', 3), 5)
+        self.assertEqual(cache.get_many(['a', 'b', 'c']),
+                         {'a': {'value': 1}, 'b': 5})
+        cache.delete('a')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('a', 'нет'), 'нет')
+        with self.assertRaises(ValueError):
+            cache.incr('a')
+        cache.clear()
+        self.assertFalse(cache.has_key('b'))
+
+    def test_expiry(self):
+        """Проверяем, что просроченные записи не читаются и заменяются"""
+        self.cache.set('a', 1, 0.05)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertTrue(self.cache.add('a', 2))
+        self.assertEqual(self.cache.get('a'), 2)
+
+    def test_shared_between_workers(self):
+        """Проверяем, что два экземпляра видят один файл"""
+        other = SQLiteCache(self.path, {})
+        self.cache.set('a', 1)
+        self.assertEqual(other.get('a'), 1)
+
+    def test_cull(self):
+        """Проверяем, что размер кэша ограничен"""
+        cache = SQLiteCache(self.path, {
+            'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_EVERY': 5},
+        })
+        for number in range(30):
+            cache.set(f'key{number}', number)
+        total = cache._db.execute('SELECT COUNT(*) FROM cache').fetchone()
+        self.assertLessEqual(total[0], 15)
+
+
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'cache.sqlite3')
+
+    def worker(self, name, **options):
+        """Отдельный процесс: свой L1, общий L2."""
+        cache = TieredCache(f'{self.id()}:{name}', {'OPTIONS': options})
+        cache.shared = SQLiteCache(self.path, {})
+        return cache
+
+    def test_l1_serves_repeated_reads(self):
+        """Проверяем, что повторное чтение не идёт в общий кэш"""
+        cache = self.worker('a', STATS_INTERVAL=3600)
+        cache.set('a', 1)
+        cache.shared.set('a', 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats(), {'l1_hits': 1, 'misses': 1})
+
+    def test_other_worker_sees_writes(self):
+        """Проверяем, что запись другого воркера видна после L1_TIMEOUT"""
+        first = self.worker('a', L1_TIMEOUT=0.05)
+        second = self.worker('b', L1_TIMEOUT=0.05)
+        first.set('a', 1)
+        self.assertEqual(second.get('a'), 1)
+        first.set('a', 2)
+        time.sleep(0.1)
+        self.assertEqual(second.get('a'), 2)
+        second.delete('a')
+        self.assertIsNone(second.get('a'))
+
+    def test_close_leaves_shared_alone(self):
+        """Проверяем, что close не создаёт общий кэш: Django закрывает
+        кэши, обходя словарь `caches`, и сам закроет L2"""
+        cache = TieredCache(f'{self.id()}:a', {})
+        cache.close()
+        self.assertNotIn('shared', cache.__dict__)
+
+    def test_l1_bounded(self):
+        """Проверяем, что L1 не растёт больше L1_MAX_ENTRIES"""
+        cache = self.worker('a', L1_MAX_ENTRIES=3)
+        for number in range(10):
+            cache.set(f'key{number}', number)
+        self.assertEqual(len(cache._store), 3)
+        self.assertEqual(cache.get('key0'), 0)
+
+    def test_shared_stats(self):
+        """Проверяем, что статистика воркеров складывается в L2"""
+        first = self.worker('a')
+        second = self.worker('b')
+        first.set('a', 1)
+        first.get('a')
+        second.get('a')
+        second.get('b')
+        first.flush_stats()
+        second.flush_stats()
+        stats = first.shared_stats()
+        self.assertEqual(
+            stats, {'l1_hits': 1, 'l2_hits': 1, 'misses': 1,
+                    'hit_rate': 2 / 3}
+        )
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.constants.constants import COMMENTS_PER_PAGE
+from ..models import Comment, Post, User
+
+
+class CommentPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        created = timezone.now()
+        comments = [
+            Comment(post=cls.post, author=cls.author, text=f'Комментарий {n}')
+            for n in range(COMMENTS_PER_PAGE * 2 + 5)
+        ]
+        Comment.objects.bulk_create(comments)
+        # Половина комментариев с одинаковым временем: курсор должен
+        # различать их по id.
+        for number, comment in enumerate(Comment.objects.order_by('id')):
+            Comment.objects.filter(pk=comment.pk).update(
+                created=created + timedelta(seconds=number // 2)
+            )
+        cls.expected = list(Comment.objects.order_by('-created', '-id')
+                            .values_list('text', flat=True))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+
+    def test_detail_shows_first_page(self):
+        """Проверяем, что страница поста выводит только первые
+        комментарии и ссылку «Показать ещё»"""
+        response = self.client.get(self.url)
+        texts = [c.text for c in response.context['post_comments']]
+        self.assertEqual(texts, self.expected[:COMMENTS_PER_PAGE])
+        self.assertContains(response, 'data-fragment="'
+                            + reverse('posts:comments', args=(self.post.pk,)))
+
+    def test_fragments_cover_all_comments(self):
+        """Проверяем, что фрагменты по курсору проходят все комментарии
+        по одному разу и каждый строится одним запросом"""
+        page = self.client.get(self.url).context['post_comments']
+        texts = [comment.text for comment in page]
+        fragment_url = reverse('posts:comments', args=(self.post.pk,))
+        while page.paginator.has_next:
+            with self.assertNumQueries(1):
+                response = self.client.get(
+                    fragment_url, {'cursor': page.paginator.next_cursor}
+                )
+            self.assertTemplateNotUsed(response, 'base.html')
+            page = response.context['post_comments']
+            texts.extend(comment.text for comment in page)
+        self.assertEqual(texts, self.expected)
+        self.assertNotContains(response, 'Показать ещё')
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.post = Post.objects.create(text='Пост', author=cls.author,
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.urls = (
+            reverse('posts:main'),
+            reverse('posts:blog', args=('group',)),
+            reverse('posts:profile', args=('author',)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_not_modified(self):
+        """Проверяем, что неизменная страница отдаёт 304 без рендеринга"""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('s-maxage', response['Cache-Control'])
+                self.assertNotIn('Cookie', response.get('Vary', ''))
+                cached = self.revalidate(url, response)
+                self.assertEqual(cached.status_code, 304)
+                self.assertIsNone(cached.context)
+
+    def test_etag_shared(self):
+        """Проверяем, что страница одна для всех: личного в ней нет"""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(Client().get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                ).status_code, 304)
+
+    def test_comment_changes_pages(self):
+        """Проверяем, что комментарий меняет ленты и страницу поста"""
+        responses = {url: self.client.get(url) for url in self.urls}
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.revalidate(url, response).status_code,
+                                 200)
+
+    def test_edit_changes_post(self):
+        """Проверяем, что правка поста обновляет его дату изменения"""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        response = self.client.get(url)
+        updated = self.post.updated
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        self.assertGreater(self.post.updated, updated)
+        changed = self.revalidate(url, response)
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, 'Исправленный пост')
+
+    def test_follow_changes_profile(self):
+        """Проверяем, что подписка меняет страницу профиля"""
+        url = reverse('posts:profile', args=('author',))
+        response = self.client.get(url)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
@@ -0,0 +1,134 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..counts import (CachedCount, CounterCount, EstimatedCount, ExactCount,
+                      count_rows)
+from ..models import Comment, Follow, Group, Post, User, UserCounter
+
+
+class CountStrategyTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='counter')
+        Post.objects.bulk_create(
+            Post(text=f'пост {i}', author=cls.user) for i in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_count(self):
+        """Проверяем, что кэшированный счётчик не ходит в базу повторно"""
+        queryset = Post.objects.filter(author=self.user)
+        self.assertEqual(CachedCount().count(queryset), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCount().count(queryset), 3)
+
+    def test_exact_count(self):
+        """Проверяем, что точный счётчик видит новые посты сразу"""
+        queryset = Post.objects.filter(author=self.user)
+        count_rows(queryset)
+        Post.objects.create(text='новый', author=self.user)
+        self.assertEqual(count_rows(queryset), 3)
+        self.assertEqual(count_rows(queryset, exact=True), 4)
+        self.assertEqual(ExactCount().count(queryset), 4)
+
+    def test_counter_count(self):
+        """Проверяем, что счётчики автора и группы читаются без COUNT(*)"""
+        author = User.objects.create_user(username='counted')
+        group = Group.objects.create(title='Группа', slug='counted',
+                                     description='Описание')
+        for _ in range(2):
+            Post.objects.create(text='пост', author=author, group=group)
+        strategy = CounterCount()
+        with self.assertNumQueries(1) as context:
+            self.assertEqual(
+                strategy.count(Post.objects.filter(author=author)), 2
+            )
+        self.assertNotIn('posts_post', context.captured_queries[0]['sql'])
+        self.assertEqual(strategy.count(Post.objects.filter(group=group)), 2)
+        # Посты из setUpClass созданы bulk_create мимо сигналов.
+        self.assertEqual(strategy.count(Post.objects.all()), 2)
+        self.assertEqual(strategy.count(Post.objects.filter(text='пост')), 2)
+
+    def test_counter_count_related_filter(self):
+        """Проверяем, что фильтр по полям связанных моделей считается
+        через COUNT(*), а не счётчиком автора"""
+        reader = User.objects.create_user(username='commenter')
+        for _ in range(2):
+            Post.objects.create(text='свой', author=reader)
+        post = Post.objects.filter(author=self.user).first()
+        Comment.objects.create(text='комментарий', post=post, author=reader)
+        queryset = Post.objects.filter(comment__author=reader)
+        self.assertEqual(CounterCount().count(queryset), 1)
+
+    def test_estimated_count_fallback(self):
+        """Проверяем запасную стратегию, когда оценки планировщика нет"""
+        queryset = Post.objects.filter(author=self.user)
+        self.assertEqual(EstimatedCount().count(queryset), 3)
+
+
+class DenormalizedCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_signals_update_counters(self):
+        """Проверяем обновление счётчиков при создании и удалении"""
+        post = Post.objects.create(text='пост', author=self.author,
+                                   group=self.group)
+        comment = Comment.objects.create(text='комментарий', post=post,
+                                         author=self.reader)
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+
+        author = UserCounter.objects.get(user=self.author)
+        reader = UserCounter.objects.get(user=self.reader)
+        self.assertEqual(author.posts_count, 1)
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(reader.following_count, 1)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 1)
+        self.assertEqual(Post.objects.get(pk=post.pk).comments_count, 1)
+
+        comment.delete()
+        follow.delete()
+        post.delete()
+        author.refresh_from_db()
+        reader.refresh_from_db()
+        self.assertEqual(author.posts_count, 0)
+        self.assertEqual(author.followers_count, 0)
+        self.assertEqual(reader.following_count, 0)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 0)
+
+    def test_reconcile_command(self):
+        """Проверяем исправление расхождений командой"""
+        Post.objects.bulk_create(
+            Post(text=f'пост {i}', author=self.author, group=self.group)
+            for i in range(3)
+        )
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(
+            UserCounter.objects.get(user=self.author).posts_count, 3)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).posts_count, 3)
+
+    def test_profile_count(self):
+        """Проверяем число постов в профиле"""
+        Post.objects.create(text='пост', author=self.author)
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        response = self.client.get(url)
+        self.assertEqual(response.context['posts_count'], 1)
+        self.assertContains(response, 'Всего постов: 1')
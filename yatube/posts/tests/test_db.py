@@ -0,0 +1,71 @@
+import sqlite3
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from core.db.backends.sqlite3.base import DatabaseWrapper
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class ConnectionPoolTest(TestCase):
+    def pool(self, **kwargs):
+        pool = ConnectionPool(lambda: sqlite3.connect(':memory:'),
+                              **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_connection(self):
+        """Проверяем, что возвращённое соединение выдаётся снова"""
+        pool = self.pool(max_size=1)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+
+    def test_waits_for_free_slot(self):
+        """Проверяем, что сверх max_size соединения не выдаются"""
+        pool = self.pool(max_size=1, timeout=.01)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+    def test_drops_broken_and_old_connections(self):
+        """Проверяем, что сломанные и старые соединения заменяются"""
+        for options in ({'check': lambda connection: False},
+                        {'max_age': 0}):
+            with self.subTest(options=options):
+                pool = self.pool(**options)
+                first = pool.acquire()
+                pool.release(first)
+                self.assertIsNot(pool.acquire(), first)
+
+    def test_unreusable_connection_closed(self):
+        """Проверяем, что соединение с ошибкой не возвращается в пул"""
+        pool = self.pool(max_size=1)
+        first = pool.acquire()
+        pool.release(first, reusable=False)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            first.execute('SELECT 1')
+        self.assertIsNot(pool.acquire(), first)
+
+
+class SQLitePragmasTest(TestCase):
+    def test_pragmas_applied(self):
+        """Проверяем, что соединение SQLite настроено"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -64 * 1024)
+
+    def test_pragmas_once_per_connection(self):
+        """Проверяем, что соединение из пула не настраивается повторно"""
+        settings_dict = dict(connection.settings_dict, NAME=':memory:',
+                             OPTIONS={'pool': {'max_size': 1}})
+        wrapper = DatabaseWrapper(settings_dict, alias='pragmas')
+        with mock.patch.object(DatabaseWrapper, 'init_connection') as init:
+            for _ in range(3):
+                wrapper.ensure_connection()
+                wrapper.close()
+        init.assert_called_once()
+        wrapper.pool.close()
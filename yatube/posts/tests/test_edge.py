@@ -0,0 +1,195 @@
+from unittest import mock
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.db.replicas import PIN_COOKIE
+from core.edge import EdgeCache
+from ..models import Follow, Post, User
+
+
+def environ(path, **extra):
+    path, _, query = path.partition('?')
+    result = dict({'PATH_INFO': path, 'QUERY_STRING': query,
+                   'HTTP_HOST': 'testserver'}, **extra)
+    setup_testing_defaults(result)
+    return result
+
+
+def request(application, path, **extra):
+    started = []
+    body = b''.join(application(
+        environ(path, **extra),
+        lambda status, headers: started.extend((status, dict(headers))),
+    ))
+    return started[0], started[1], body
+
+
+class SessionFragmentTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_public_pages_shared(self):
+        """Проверяем, что общие страницы не зависят от пользователя"""
+        for url in (reverse('posts:main'),
+                    reverse('posts:profile', args=('author',)),
+                    reverse('posts:post_detail', args=(self.post.pk,))):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotIn('Cookie', response.get('Vary', ''))
+                self.assertNotContains(response, 'reader')
+                self.assertNotContains(response, 'csrfmiddlewaretoken')
+                self.assertEqual(response.content,
+                                 Client().get(url).content)
+
+    def test_fragment(self):
+        """Проверяем, что фрагмент отдаёт личные части страницы"""
+        response = self.client.get(reverse('posts:session'), {
+            'nav': '', 'switcher': 'main',
+            'follow': f'{self.author.pk}:author',
+            'comment_form': self.post.pk,
+        })
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertContains(response, 'Пользователь: reader')
+        self.assertContains(response, reverse('posts:follow_index'))
+        self.assertContains(response,
+                            reverse('posts:profile_unfollow',
+                                    args=('author',)))
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertContains(response,
+                            reverse('posts:add_comment',
+                                    args=(self.post.pk,)))
+
+    def test_fragment_self_follow(self):
+        """Проверяем, что на своей странице кнопки подписки нет"""
+        response = self.client.get(reverse('posts:session'),
+                                   {'follow': f'{self.reader.pk}:reader'})
+        self.assertNotContains(response, 'data-slot="follow"')
+
+    def test_fragment_anonymous(self):
+        """Проверяем, что гостю фрагмент отдаёт только ссылки входа"""
+        response = Client().get(reverse('posts:session'), {
+            'nav': '', 'switcher': 'main',
+            'follow': f'{self.author.pk}:author',
+            'comment_form': self.post.pk,
+        })
+        self.assertContains(response, reverse('users:login'))
+        for slot in ('switcher', 'follow', 'comment_form'):
+            self.assertNotContains(response, f'data-slot="{slot}"')
+
+
+def shared_page(environ, start_response):
+    start_response('200 OK', [
+        ('Content-Type', 'text/plain'), ('ETag', '"v1"'),
+        ('Cache-Control', 'public, max-age=0, s-maxage=30'),
+    ])
+    return [b'page']
+
+
+class EdgeCacheTest(TestCase):
+    def setUp(self):
+        self.application = mock.Mock(side_effect=shared_page)
+        self.edge = EdgeCache(self.application)
+
+    def test_hit(self):
+        """Проверяем, что повторный запрос обслуживает кэш"""
+        request(self.edge, '/')
+        status, headers, body = request(self.edge, '/',
+                                        HTTP_COOKIE='sessionid=other')
+        self.assertEqual((status, body), ('200 OK', b'page'))
+        self.assertEqual(headers['X-Cache'], 'HIT')
+        self.assertEqual(self.application.call_count, 1)
+        self.assertEqual(self.edge.hit_rate(), .5)
+
+    def test_not_modified(self):
+        """Проверяем, что на совпавший ETag кэш сам отвечает 304"""
+        request(self.edge, '/')
+        status, _, body = request(self.edge, '/', HTTP_IF_NONE_MATCH='"v1"')
+        self.assertEqual((status, body), ('304 Not Modified', b''))
+        self.assertEqual(self.application.call_count, 1)
+
+    def test_pinned(self):
+        """Проверяем, что запросы с кукой закрепления идут мимо кэша"""
+        request(self.edge, '/')
+        request(self.edge, '/', HTTP_COOKIE=f'{PIN_COOKIE}=1')
+        self.assertEqual(self.application.call_count, 2)
+        self.assertEqual(self.edge.stats['passes'], 1)
+
+    def test_private(self):
+        """Проверяем, что личные ответы не сохраняются"""
+        for headers in ([('Cache-Control', 'private')],
+                        [('Cache-Control', 'public, s-maxage=30'),
+                         ('Vary', 'Cookie')],
+                        [('Cache-Control', 'public, s-maxage=30'),
+                         ('Set-Cookie', 'a=1')]):
+            with self.subTest(headers=headers):
+                self.application.side_effect = (
+                    lambda environ, start_response, headers=headers:
+                    start_response('200 OK', headers) or [b'']
+                )
+                request(self.edge, '/private/')
+                request(self.edge, '/private/')
+                self.assertFalse(self.edge._store)
+        self.assertIsNone(self.edge.hit_rate())
+
+    def test_revalidate(self):
+        """Проверяем, что устаревший ответ переспрашивается по ETag"""
+        request(self.edge, '/')
+        self.edge._store[('testserver', '/', '')]['expires'] = 0
+        self.application.side_effect = (
+            lambda environ, start_response:
+            start_response('304 Not Modified', [
+                ('ETag', environ['HTTP_IF_NONE_MATCH']),
+                ('Cache-Control', 'public, max-age=0, s-maxage=30'),
+            ]) or []
+        )
+        status, _, body = request(self.edge, '/')
+        self.assertEqual((status, body), ('200 OK', b'page'))
+        self.assertEqual(self.edge.stats['revalidated'], 1)
+
+
+class EdgeHitRateTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        cls.cookies = []
+        for number in range(5):
+            client = Client()
+            client.force_login(
+                User.objects.create_user(username=f'user{number}')
+            )
+            session = client.cookies[settings.SESSION_COOKIE_NAME]
+            cls.cookies.append(f'{session.key}={session.value}')
+
+    def test_logged_in_traffic(self):
+        """Проверяем, что страницы вошедших пользователей берутся
+        из кэша, а фрагмент — нет"""
+        cache.clear()
+        edge = EdgeCache(WSGIHandler())
+        urls = (reverse('posts:main'),
+                reverse('posts:profile', args=('author',)),
+                reverse('posts:post_detail', args=(self.post.pk,)))
+        for cookie in self.cookies:
+            for url in urls:
+                status, _, _ = request(edge, url, HTTP_COOKIE=cookie)
+                self.assertEqual(status, '200 OK')
+            status, _, body = request(edge, f'{reverse("posts:session")}?nav=',
+                                      HTTP_COOKIE=cookie)
+            self.assertIn(b'user', body)
+        self.assertEqual(edge.stats['misses'], len(urls))
+        self.assertEqual(edge.stats['passes'], len(self.cookies))
+        self.assertAlmostEqual(edge.hit_rate(), 1 - 1 / len(self.cookies))
@@ -0,0 +1,111 @@
+import json
+from xml.etree import ElementTree
+
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.constants.constants import FEED_ITEMS
+from ..models import Group, Post, User
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class FeedsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author',
+                                              first_name='Лев',
+                                              last_name='Толстой')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        for number in range(FEED_ITEMS + 2):
+            Post.objects.create(text=f'Пост номер {number}',
+                                author=cls.author, group=cls.group)
+        cls.other = Post.objects.create(
+            text='Чужой пост', author=User.objects.create_user('other')
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.urls = {
+            'index': reverse('posts:index_feed', args=('atom',)),
+            'group': reverse('posts:group_feed', args=('group', 'atom')),
+            'author': reverse('posts:author_feed', args=('author', 'atom')),
+        }
+
+    def content(self, response):
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode()
+
+    def test_atom(self):
+        """Проверяем, что Atom-лента группы содержит её последние посты"""
+        response = self.client.get(self.urls['group'])
+        self.assertEqual(response.status_code, 200)
+        root = ElementTree.fromstring(self.content(response))
+        entries = root.findall(f'{ATOM}entry')
+        self.assertEqual(len(entries), FEED_ITEMS)
+        self.assertEqual(root.find(f'{ATOM}title').text, 'Группа')
+        self.assertEqual(entries[0].find(f'{ATOM}author/{ATOM}name').text,
+                         'Лев Толстой')
+        self.assertEqual(entries[0].find(f'{ATOM}title').text,
+                         f'Пост номер {FEED_ITEMS + 1}')
+
+    def test_rss_and_json(self):
+        """Проверяем RSS и JSON-варианты ленты автора"""
+        response = self.client.get(
+            reverse('posts:author_feed', args=('author', 'rss'))
+        )
+        items = ElementTree.fromstring(self.content(response)).findall(
+            'channel/item'
+        )
+        self.assertEqual(len(items), FEED_ITEMS)
+        response = self.client.get(
+            reverse('posts:author_feed', args=('author', 'json'))
+        )
+        self.assertEqual(response['Content-Type'],
+                         'application/feed+json; charset=utf-8')
+        feed = json.loads(self.content(response))
+        self.assertEqual(len(feed['items']), FEED_ITEMS)
+        self.assertEqual(feed['items'][0]['tags'], ['Группа'])
+        self.assertNotIn('Чужой пост',
+                         [item['content_text'] for item in feed['items']])
+
+    def test_not_modified(self):
+        """Проверяем, что неизменная лента отдаёт 304 не больше чем
+        за один запрос"""
+        queries = {'index': 0, 'group': 1, 'author': 1}
+        for scope, url in self.urls.items():
+            with self.subTest(scope=scope):
+                response = self.client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                with self.assertNumQueries(queries[scope]):
+                    cached = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(cached.status_code, 304)
+                with self.assertNumQueries(queries[scope]):
+                    cached = self.client.get(
+                        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                    )
+                self.assertEqual(cached.status_code, 304)
+
+    def test_etag_changes_on_edit(self):
+        """Проверяем, что правка старого поста меняет ETag ленты"""
+        response = self.client.get(self.urls['group'])
+        post = Post.objects.filter(group=self.group).earliest('pub_date')
+        post.text = 'Исправленный пост'
+        post.save()
+        changed = self.client.get(self.urls['group'],
+                                  HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_unknown_scope(self):
+        """Проверяем, что лента несуществующей группы отдаёт 404"""
+        response = self.client.get(
+            reverse('posts:group_feed', args=('missing', 'json'))
+        )
+        self.assertEqual(response.status_code, 404)
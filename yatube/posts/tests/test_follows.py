@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from tasks.testing import run_on_commit
+from ..follows import followed_ids, is_following
+from ..models import Follow, User
+
+
+class FollowsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [User.objects.create_user(username=f'author{number}')
+                       for number in range(5)]
+        for author in cls.authors[:3]:
+            Follow.objects.create(user=cls.reader, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def fresh_reader(self):
+        return User.objects.get(pk=self.reader.pk)
+
+    def test_cached_set(self):
+        """Проверяем, что подписки читаются из базы один раз"""
+        expected = {author.pk for author in self.authors[:3]}
+        with self.assertNumQueries(1):
+            self.assertEqual(followed_ids(self.reader), expected)
+            self.assertTrue(is_following(self.reader, self.authors[0].pk))
+        reader = self.fresh_reader()
+        with self.assertNumQueries(0):
+            self.assertEqual(followed_ids(reader), expected)
+            self.assertFalse(is_following(reader, self.authors[4].pk))
+        self.assertEqual(followed_ids(AnonymousUser()), frozenset())
+
+    def test_expire_on_follow(self):
+        """Проверяем, что подписка и отписка сбрасывают кэш"""
+        followed_ids(self.reader)
+        with run_on_commit():
+            self.client.get(reverse('posts:profile_follow',
+                                    args=(self.authors[4].username,)))
+        self.assertTrue(is_following(self.fresh_reader(),
+                                     self.authors[4].pk))
+        with run_on_commit():
+            self.client.get(reverse('posts:profile_unfollow',
+                                    args=(self.authors[0].username,)))
+        self.assertFalse(is_following(self.fresh_reader(),
+                                      self.authors[0].pk))
+
+    def test_expire_after_commit(self):
+        """Проверяем, что кэш сбрасывается только после фиксации"""
+        with mock.patch('posts.follows.expire') as expire:
+            with run_on_commit():
+                Follow.objects.create(user=self.reader,
+                                      author=self.authors[4])
+                expire.assert_not_called()
+        expire.assert_called_once_with(self.reader.pk)
+
+    def test_fragment_without_follow(self):
+        """Проверяем, что без кнопок подписки множество не читается"""
+        with mock.patch('posts.views.followed_ids') as followed:
+            self.client.get(reverse('posts:session'), {'nav': ''})
+        followed.assert_not_called()
+
+    def test_fragment_batch(self):
+        """Проверяем, что кнопки для многих авторов не добавляют запросов"""
+        url = reverse('posts:session')
+        values = [f'{author.pk}:{author.username}' for author in self.authors]
+        self.client.get(url, {'follow': values[:1]})
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'follow': values})
+        for author in self.authors[:3]:
+            self.assertContains(response, reverse('posts:profile_unfollow',
+                                                  args=(author.username,)))
+        for author in self.authors[3:]:
+            self.assertContains(response, reverse('posts:profile_follow',
+                                                  args=(author.username,)))
@@ -0,0 +1,134 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.template.defaultfilters import filesizeformat
+from django.urls import reverse
+from PIL import Image
+
+from core.constants.constants import POST_IMAGE_MAX_SIZE
+from .. import images
+from ..forms import PostForm
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+ORIENTATION = 0x0112
+
+
+def photo(size=(3000, 2000), orientation=None):
+    """JPEG с шумом, как у фотографии, и EXIF-поворотом."""
+    image = Image.effect_noise(size, 60).convert('RGB')
+    exif = Image.Exif()
+    exif[ORIENTATION] = orientation or 1
+    stream = io.BytesIO()
+    image.save(stream, 'JPEG', quality=98, exif=exif.tobytes())
+    return SimpleUploadedFile('photo.jpeg', stream.getvalue(),
+                              content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImagePipelineTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='author')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create(self, upload):
+        return self.client.post(reverse('posts:post_create'),
+                                {'text': 'Фото', 'image': upload})
+
+    def stored(self):
+        post = Post.objects.get(text='Фото')
+        return post, Image.open(post.image.path)
+
+    def test_large_photo_reencoded(self):
+        """Проверяем, что фото уменьшается, пережимается и теряет EXIF"""
+        upload = photo()
+        self.create(upload)
+        post, image = self.stored()
+        self.assertLessEqual(image.width, POST_IMAGE_MAX_SIZE[0])
+        self.assertLessEqual(image.height, POST_IMAGE_MAX_SIZE[1])
+        self.assertNotIn('exif', image.info)
+        self.assertLess(post.image.size, upload.size / 4)
+        fmt = images.output_format(False)
+        self.assertTrue(post.image.name.endswith(images.EXTENSIONS[fmt]))
+
+    def test_orientation_applied(self):
+        """Проверяем, что поворот из EXIF применяется к пикселям"""
+        self.create(photo((200, 100), orientation=6))
+        _, image = self.stored()
+        self.assertEqual(image.size, (100, 200))
+
+    def test_edit_uses_pipeline(self):
+        """Проверяем, что правка поста тоже пережимает картинку"""
+        post = Post.objects.create(text='Пост', author=self.user)
+        self.client.post(reverse('posts:post_edit', args=(post.pk,)),
+                         {'text': 'Фото', 'image': photo()})
+        _, image = self.stored()
+        self.assertLessEqual(image.width, POST_IMAGE_MAX_SIZE[0])
+
+    @override_settings(UPLOAD_MAX_BYTES=1024)
+    def test_oversized_upload_rejected(self):
+        """Проверяем, что файл больше лимита не принимается"""
+        response = self.create(photo())
+        self.assertFalse(Post.objects.exists())
+        request = response.wsgi_request
+        self.assertEqual(request.oversized_uploads, ['image'])
+        self.assertGreater(request._stream.remaining, 0)
+        form = PostForm({'text': 'Фото'}, {'image': photo((200, 200))},
+                        oversized=['image'])
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['image'],
+                         ['Файл больше ' + filesizeformat(1024)])
+
+    def test_truncated_image_rejected(self):
+        """Проверяем, что обрезанный файл даёт ошибку формы, а не 500"""
+        upload = photo((400, 300))
+        truncated = SimpleUploadedFile('photo.jpeg',
+                                       upload.read()[:len(upload) // 2],
+                                       content_type='image/jpeg')
+        self.assertEqual(self.create(truncated).status_code, 200)
+        self.assertFalse(Post.objects.exists())
+        truncated.seek(0)
+        form = PostForm({'text': 'Фото'}, {'image': truncated})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['image'], ['Картинка повреждена'])
+
+    def test_animation_reencoded(self):
+        """Проверяем, что анимация уменьшается по кадрам и теряет метаданные"""
+        frames = [Image.new('RGB', (2000, 1000), color)
+                  for color in ('red', 'blue', 'green')]
+        stream = io.BytesIO()
+        frames[0].save(stream, 'GIF', save_all=True,
+                       append_images=frames[1:], duration=50, loop=0,
+                       comment=b'secret')
+        self.create(SimpleUploadedFile('anim.gif', stream.getvalue(),
+                                       content_type='image/gif'))
+        _, image = self.stored()
+        self.assertEqual(image.n_frames, 3)
+        self.assertLessEqual(image.width, POST_IMAGE_MAX_SIZE[0])
+        self.assertNotIn('comment', image.info)
+
+    def test_pixel_limit(self):
+        """Проверяем, что слишком большое разрешение отклоняется
+        по заголовку файла"""
+        source = os.path.join(TEMP_MEDIA_ROOT, 'source.png')
+        Image.new('RGB', (100, 100)).save(source)
+        with self.assertRaises(images.ImageTooLarge):
+            images.reencode(source, source + '.out', max_pixels=5000)
+
+    @override_settings(POSTS_IMAGE_WORKERS=1)
+    def test_process_pool(self):
+        """Проверяем пережатие в пуле процессов"""
+        self.create(photo())
+        _, image = self.stored()
+        self.assertLessEqual(image.width, POST_IMAGE_MAX_SIZE[0])
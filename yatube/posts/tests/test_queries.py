@@ -0,0 +1,173 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (Client, RequestFactory, TestCase,
+                         TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from core.middleware.querybudget import (QueryBudgetExceeded,
+                                         QueryBudgetMiddleware, QueryReport,
+                                         query_budget)
+from ..models import Comment, Follow, Group, Post, User
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True)
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(15):
+            post = Post.objects.create(
+                text=f'Пост {number}',
+                author=cls.author if number % 2 else cls.reader,
+                group=cls.group if number % 3 else None,
+            )
+            Comment.objects.create(post=post, author=cls.reader,
+                                   text='Комментарий')
+            Comment.objects.create(post=post, author=cls.author,
+                                   text='Комментарий')
+        cls.post = post
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.post.author)
+        cache.clear()
+
+    def test_pages_within_budget(self):
+        """Проверяем, что страницы укладываются в бюджет запросов"""
+        urls = (
+            reverse('posts:main'),
+            reverse('posts:main') + '?page=2',
+            reverse('posts:blog', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=Пост',
+            reverse('posts:comments', kwargs={'post_id': self.post.id}),
+            reverse('posts:session') + (
+                f'?nav=&switcher=main&comment_form={self.post.id}'
+                f'&follow={self.author.pk}:author'
+            ),
+            reverse('posts:index_feed', kwargs={'format': 'rss'}),
+            reverse('posts:group_feed',
+                    kwargs={'slug': 'group', 'format': 'atom'}),
+            reverse('posts:author_feed',
+                    kwargs={'username': 'author', 'format': 'rss'}),
+            reverse('api:posts') + '?include=author,group',
+            reverse('api:post', kwargs={'pk': self.post.id}),
+            reverse('api:groups'),
+            reverse('api:group', kwargs={'slug': 'group'}),
+            reverse('api:comments') + f'?post={self.post.id}',
+            reverse('api:follows') + '?include=author',
+        )
+        for client in (self.guest_client, self.authorized_client):
+            for url in urls:
+                with self.subTest(url=url):
+                    response = client.get(url)
+                    self.assertIn(response.status_code, (200, 302, 401))
+                    self.assertIn('X-Query-Count', response)
+
+    def test_n_plus_one_detected(self):
+        """Проверяем, что повторяющиеся запросы считаются N+1"""
+        @query_budget(100)
+        def view(request):
+            for post in Post.objects.all()[:5]:
+                post.author.username
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(
+            lambda request: middleware.process_view(
+                request, view, (), {}) or view(request)
+        )
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'N+1: 5'):
+            middleware(RequestFactory().get('/'))
+
+    def test_transactions_not_n_plus_one(self):
+        """Проверяем, что BEGIN и точки сохранения не считаются N+1"""
+        report = QueryReport()
+        for _ in range(3):
+            for sql in ('BEGIN', 'SAVEPOINT "s1"', 'RELEASE SAVEPOINT "s1"'):
+                report(lambda *args: None, sql, None, False, {})
+        self.assertEqual(report.repeated(), [])
+        self.assertEqual(report.count, 9)
+
+    def test_over_budget_detected(self):
+        """Проверяем, что превышение бюджета не проходит незамеченным"""
+        @query_budget(1)
+        def view(request):
+            list(Post.objects.all())
+            list(Group.objects.all())
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(
+            lambda request: middleware.process_view(
+                request, view, (), {}) or view(request)
+        )
+        with self.assertRaisesMessage(QueryBudgetExceeded,
+                                      '2 запросов при бюджете 1'):
+            middleware(RequestFactory().get('/'))
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_report_logged_without_raise(self):
+        """Проверяем, что без QUERY_BUDGET_RAISE проблемы пишутся в лог"""
+        @query_budget(0)
+        def view(request):
+            list(Post.objects.all())
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(
+            lambda request: middleware.process_view(
+                request, view, (), {}) or view(request)
+        )
+        with self.assertLogs('core.middleware.querybudget', 'WARNING'):
+            response = middleware(RequestFactory().get('/'))
+        self.assertEqual(response['X-Query-Count'], '1')
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True,
+                   TASKS_BROKER='tasks.brokers.DatabaseBroker')
+class ActionQueryBudgetTest(TransactionTestCase):
+    """Здесь транзакции фиксируются по-настоящему, и хуки `on_commit`
+    выполняются внутри запроса. Как в бою, они только ставят задачи
+    в очередь, а сами задачи в бюджет запроса не входят."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.post = Post.objects.create(text='Пост', author=self.author,
+                                        group=self.group)
+
+    def test_actions_within_budget(self):
+        """Проверяем, что действия вместе с задачами после фиксации
+        укладываются в бюджет запросов"""
+        client = Client()
+        client.force_login(self.post.author)
+        actions = (
+            ('posts:add_comment', {'post_id': self.post.id},
+             {'text': 'Ещё'}),
+            ('posts:post_create', {}, {'text': 'Новый',
+                                       'group': self.group.id}),
+            ('posts:post_edit', {'post_id': self.post.id},
+             {'text': 'Изменённый'}),
+        )
+        for name, kwargs, data in actions:
+            with self.subTest(name=name):
+                response = client.post(reverse(name, kwargs=kwargs), data)
+                self.assertEqual(response.status_code, 302)
+        follow = reverse('posts:profile_follow',
+                         kwargs={'username': 'reader'})
+        unfollow = reverse('posts:profile_unfollow',
+                           kwargs={'username': 'reader'})
+        client.force_login(self.author)
+        for url in (follow, unfollow):
+            self.assertEqual(client.get(url).status_code, 302)
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.db import replicas
+from ..models import Post, User
+
+
+def lags(**values):
+    return mock.patch.object(replicas, 'replica_lag',
+                             lambda alias: values.get(alias))
+
+
+class ReplicaRoutingTest(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='author')
+        Post.objects.create(text='пост', author=self.user)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def replica_queries(self, url, method='get', **kwargs):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+        return response, len(queries)
+
+    def test_read_views_use_replica(self):
+        """Проверяем, что страницы чтения читают посты с реплики"""
+        urls = (
+            reverse('posts:main') + '?page=1',
+            reverse('posts:profile', kwargs={'username': 'author'})
+            + '?page=1',
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url), lags(replica=0):
+                response, total = self.replica_queries(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(total, 0)
+
+    def test_stale_replica_skipped(self):
+        """Проверяем, что отставшая или недоступная реплика не читается"""
+        for lag in (None, 3600):
+            with self.subTest(lag=lag), lags(replica=lag):
+                _, total = self.replica_queries(reverse('posts:main'))
+                self.assertEqual(total, 0)
+
+    def test_sticky_after_write(self):
+        """Проверяем, что после записи автор читает с основной базы"""
+        with lags(replica=0):
+            response, total = self.replica_queries(
+                reverse('posts:post_create'), 'post', data={'text': 'новый'}
+            )
+            self.assertEqual(total, 0)
+            self.assertIn(replicas.PIN_COOKIE, response.cookies)
+            response, total = self.replica_queries(reverse('posts:main'))
+        self.assertEqual(total, 0)
+        self.assertEqual(response.context['page_obj'][0].text, 'новый')
+
+    def test_feed_cache_filled_from_primary(self):
+        """Проверяем, что общий кэш ленты не заполняется с реплики"""
+        cache.clear()
+        with lags(replica=0):
+            response, total = self.replica_queries(reverse('posts:main'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(total, 0)
+
+    def test_pinned_reader_skips_feed_cache(self):
+        """Проверяем, что после записи автор видит пост мимо кэша ленты"""
+        cache.clear()
+        self.client.get(reverse('posts:main'))
+        with mock.patch('posts.signals.feed_cache.expire_post'):
+            self.client.post(reverse('posts:post_create'),
+                             data={'text': 'новый'})
+        response = self.client.get(reverse('posts:main'))
+        self.assertEqual(response.context['page_obj'][0].text, 'новый')
+        self.assertNotContains(Client().get(reverse('posts:main')), 'новый')
+
+    def test_form_without_write_not_pinned(self):
+        """Проверяем, что открытие формы не привязывает к основной базе"""
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertNotIn(replicas.PIN_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'other'])
+    def test_strategies(self):
+        """Проверяем выбор реплики по очереди и по отставанию"""
+        with lags(replica=2, other=1):
+            chosen = {replicas.choose_replica() for _ in range(4)}
+            self.assertEqual(chosen, {'replica', 'other'})
+            with override_settings(DATABASE_REPLICA_STRATEGY='lowest_lag'):
+                self.assertEqual(replicas.choose_replica(), 'other')
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks.testing import run_on_commit
+from ..admin import PostAdmin
+from ..models import Group, Post, User
+from ..search import SQLiteFTSBackend, SimpleBackend, get_backend
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Кошки',
+            slug='cats',
+            description='Про кошек'
+        )
+        with run_on_commit():
+            cls.cat = Post.objects.create(text='Кот спит на диване',
+                                          author=cls.user, group=cls.group)
+            cls.cats = Post.objects.create(text='Коты, коты и ещё коты',
+                                           author=cls.other)
+            cls.dog = Post.objects.create(text='Собака гуляет',
+                                          author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, **params):
+        response = self.client.get(reverse('posts:search'), params)
+        return [post.id for post in response.context['page_obj']]
+
+    def test_search_finds_words(self):
+        """Проверяем поиск по префиксу слова"""
+        self.assertCountEqual(self.search(q='кот'),
+                              [self.cat.id, self.cats.id])
+        self.assertEqual(self.search(q='собака'), [self.dog.id])
+
+    def test_search_filters(self):
+        """Проверяем фильтры по группе и автору"""
+        self.assertEqual(self.search(q='кот', group='cats'), [self.cat.id])
+        self.assertEqual(self.search(q='кот', author='other'),
+                         [self.cats.id])
+
+    def test_index_follows_changes(self):
+        """Проверяем обновление индекса при правке и удалении"""
+        with run_on_commit():
+            post = Post.objects.create(text='Собака', author=self.user)
+            post.text = 'Кот вместо собаки'
+            post.save()
+        post_id = post.id
+        self.assertIn(post_id, get_backend().search('кот'))
+        with run_on_commit():
+            post.delete()
+        self.assertNotIn(post_id, get_backend().search('кот'))
+
+    def test_simple_backend(self):
+        """Проверяем запасной поиск без полнотекстового индекса"""
+        self.assertEqual(SimpleBackend().search('гуляет'), [self.dog.id])
+
+    def test_backend_by_vendor(self):
+        """Проверяем выбор бэкенда по СУБД и по настройке"""
+        self.assertIsInstance(get_backend(), SQLiteFTSBackend)
+        with override_settings(
+                POSTS_SEARCH_BACKEND='posts.search.SimpleBackend'):
+            self.assertIsInstance(get_backend(), SimpleBackend)
+
+    @mock.patch.object(SQLiteFTSBackend, 'search', return_value=[])
+    def test_admin_search_not_limited(self, search):
+        """Проверяем, что поиск в админке находит все посты,
+        а не первые SEARCH_LIMIT"""
+        admin = PostAdmin(Post, site)
+        queryset, _ = admin.get_search_results(None, Post.objects.all(),
+                                               'кот')
+        self.assertCountEqual(queryset, [self.cat, self.cats])
+        queryset, _ = admin.get_search_results(None, Post.objects.all(),
+                                               '!!')
+        self.assertFalse(queryset.exists())
+        search.assert_not_called()
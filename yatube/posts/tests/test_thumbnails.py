@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, User
+from ..thumbnails import generate
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='author')
+        self.post = Post.objects.create(
+            author=self.user,
+            text='с картинкой',
+            image=SimpleUploadedFile('small.gif', SMALL_GIF,
+                                     content_type='image/gif')
+        )
+
+    def test_generate_stores_urls(self):
+        """Проверяем, что готовые миниатюры попадают в шаблон"""
+        generate(self.post.id)
+        self.post.refresh_from_db()
+        url = self.post.thumbnail_urls['card']
+        response = self.client.get(reverse('posts:main'))
+        self.assertContains(response, url)
+
+    def test_new_image_resets_thumbnails(self):
+        """Проверяем, что новая картинка сбрасывает старые миниатюры"""
+        generate(self.post.id)
+        self.post.refresh_from_db()
+        self.post.image = SimpleUploadedFile('other.gif', SMALL_GIF,
+                                             content_type='image/gif')
+        self.post.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.thumbnail_urls, {})
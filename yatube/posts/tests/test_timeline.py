@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from tasks.testing import run_on_commit
+from ..models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.star = User.objects.create_user(username='star')
+
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader')
+        self.client = Client()
+        self.client.force_login(self.reader)
+        cache.clear()
+
+    def feed_ids(self):
+        response = self.client.get(reverse('posts:follow_index'))
+        return [post.id for post in response.context['page_obj']]
+
+    def test_fan_out_on_create(self):
+        """Проверяем, что новый пост попадает в ленты подписчиков"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with run_on_commit():
+            post = Post.objects.create(text='новый', author=self.author)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
+        self.assertEqual(self.feed_ids(), [post.id])
+
+    @override_settings(TASKS_BROKER='tasks.brokers.DatabaseBroker')
+    def test_pending_fan_out_visible(self):
+        """Проверяем, что пост виден в ленте, пока рассылка ждёт очереди"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with run_on_commit():
+            post = Post.objects.create(text='новый', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed_ids(), [post.id])
+
+    def test_backfill_and_trim(self):
+        """Проверяем заполнение ленты при подписке и очистку при отписке"""
+        post = Post.objects.create(text='старый', author=self.author)
+        self.client.get(reverse('posts:profile_follow',
+                                kwargs={'username': 'author'}))
+        self.assertEqual(self.feed_ids(), [post.id])
+
+        self.client.get(reverse('posts:profile_unfollow',
+                                kwargs={'username': 'author'}))
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.reader).exists())
+        self.assertEqual(self.feed_ids(), [])
+
+    @mock.patch('posts.timeline.TIMELINE_FANOUT_LIMIT', 0)
+    def test_celebrity_merge(self):
+        """Проверяем слияние ленты с постами авторов без рассылки"""
+        Follow.objects.create(user=self.reader, author=self.star)
+        Follow.objects.create(user=self.reader, author=self.author)
+        with run_on_commit():
+            first = Post.objects.create(text='звезда', author=self.star)
+            second = Post.objects.create(text='автор', author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.reader).exists())
+        self.assertEqual(self.feed_ids(), [second.id, first.id])
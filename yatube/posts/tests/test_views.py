@@ -9,6 +9,7 @@ from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
 
+from tasks.testing import run_on_commit
 from ..models import Comment, Follow, Group, Post
 
 
@@ -133,6 +134,35 @@ class ViewTest(TestCase):
         response = self.auth_client.get(reverse('posts:main') + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 6)
 
+    def test_main_cursor_pages(self):
+        """Проверяем переход по курсорам вперёд и назад"""
+        url = reverse('posts:main')
+        first = self.auth_client.get(url).context['page_obj']
+        self.assertFalse(first.paginator.has_previous)
+        self.assertTrue(first.paginator.next_cursor)
+
+        second = self.auth_client.get(
+            url, {'cursor': first.paginator.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(len(second), 6)
+        self.assertFalse(second.paginator.has_next)
+        self.assertFalse({post.id for post in first}
+                         & {post.id for post in second})
+
+        back = self.auth_client.get(
+            url, {'cursor': second.paginator.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual([post.id for post in back],
+                         [post.id for post in first])
+        self.assertFalse(back.paginator.has_previous)
+
+    def test_main_broken_cursor(self):
+        """Проверяем, что битый курсор открывает первую страницу"""
+        response = self.auth_client.get(reverse('posts:main'),
+                                        {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 10)
+
     def test_group_first_page(self):
         """Проверяем Paginator на первой странице группы"""
         response = self.auth_client.get(reverse('posts:blog',
@@ -230,19 +260,38 @@ class ViewTest(TestCase):
         self.assertEqual(response.context['post_comments'][0].text,
                          comment.text)
 
-    def test_index_cache(self):
-        """Проверяем работу кэширования страницы"""
-        Post.objects.create(
+    def test_post_fragment_cache(self):
+        """Проверяем кэширование карточки поста и его сброс"""
+        post = Post.objects.create(
             author=self.user,
             text='кэш'
         )
         self.auth_client.get(reverse('posts:main'))
-        Post.objects.get(text='кэш').delete()
+        Post.objects.filter(pk=post.pk).update(text='без сигнала')
         response = self.auth_client.get(reverse('posts:main'))
         self.assertIn('кэш', response.content.decode())
-        cache.clear()
+
+        post.text = 'после правки'
+        post.save()
+        response = self.auth_client.get(reverse('posts:main'))
+        self.assertIn('после правки', response.content.decode())
+
+    def test_post_fragment_author_rename(self):
+        """Проверяем сброс карточки при смене имени автора"""
+        Post.objects.create(author=self.user, text='имя')
+        self.auth_client.get(reverse('posts:main'))
+        self.user.first_name = 'Новое'
+        self.user.save()
+        response = self.auth_client.get(reverse('posts:main'))
+        self.assertIn('Новое', response.content.decode())
+
+    def test_deleted_post_disappears(self):
+        """Проверяем, что удалённый пост сразу пропадает с главной"""
+        Post.objects.create(author=self.user, text='удалить')
+        self.auth_client.get(reverse('posts:main'))
+        Post.objects.get(text='удалить').delete()
         response = self.auth_client.get(reverse('posts:main'))
-        self.assertNotIn('кэш', response.content.decode())
+        self.assertNotIn('удалить', response.content.decode())
 
     def test_following(self):
         """Проверяем работу подписки на / отписки от пользователя"""
@@ -267,8 +316,9 @@ class ViewTest(TestCase):
             author=ViewTest.user,
             text='Лента подписок'
         )
-        self.auth_client.get(reverse('posts:profile_follow',
-                                     kwargs={'username': ViewTest.user}))
+        with run_on_commit():
+            self.auth_client.get(reverse('posts:profile_follow',
+                                         kwargs={'username': ViewTest.user}))
         response = self.auth_client.get(reverse('posts:follow_index'))
         self.assertEqual(response.context['page_obj'][0].id, post.id)
 
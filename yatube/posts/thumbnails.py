@@ -0,0 +1,59 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from sorl.thumbnail import get_thumbnail
+
+from core.constants.constants import THUMBNAIL_RENDITIONS
+from tasks import queue
+from . import fragments, validators
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+def render(image):
+    """Строит все миниатюры и возвращает их адреса."""
+    return {
+        name: get_thumbnail(image, geometry, **options).url
+        for name, (geometry, options) in THUMBNAIL_RENDITIONS.items()
+    }
+
+
+@queue.task
+def generate(post_id):
+    """Строит миниатюры поста и сохраняет адреса в `Post.thumbnails`."""
+    post = Post.objects.only('id', 'image').filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    try:
+        urls = render(post.image)
+    except Exception:
+        logger.exception('Не удалось построить миниатюры поста %s', post_id)
+        return
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnails=json.dumps(urls)
+    )
+    if updated:
+        fragments.bump('post', post_id)
+        validators.touch(post_ids=[post_id])
+
+
+def _work(post_id):
+    try:
+        generate(post_id)
+    finally:
+        connections.close_all()
+
+
+def schedule(post_id):
+    """Ставит построение миниатюр в очередь после фиксации транзакции."""
+    queue.enqueue(generate, post_id, key=f'thumbnails:{post_id}')
+
+
+def backfill(post_ids, workers):
+    """Строит миниатюры для множества постов параллельно."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(_work, post_ids):
+            pass
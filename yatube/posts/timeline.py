@@ -0,0 +1,147 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.constants.constants import (TIMELINE_BACKFILL, TIMELINE_FANOUT_LIMIT,
+                                      TIMELINE_PENDING_SECONDS)
+from tasks import queue
+from .bulk import batches
+from .models import Follow, Post, TimelineEntry, UserCounter
+from .paginators import CursorPaginator
+
+BATCH_SIZE = 1000
+
+
+def _entries(user_ids, post):
+    for user_id in user_ids:
+        yield TimelineEntry(user_id=user_id, post_id=post.pk,
+                            author_id=post.author_id,
+                            pub_date=post.pub_date)
+
+
+def _save(entries):
+    """Вставка частями: размер запроса к СУБД подбирает Django."""
+    for batch in batches(entries, BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def is_celebrity(author_id):
+    """Авторы с огромной аудиторией не рассылаются по лентам."""
+    return UserCounter.objects.filter(
+        user_id=author_id, followers_count__gt=TIMELINE_FANOUT_LIMIT
+    ).exists()
+
+
+@queue.task
+def fan_out(post_id):
+    """Кладёт новый пост в ленты всех подписчиков автора."""
+    post = Post.objects.only('id', 'author_id', 'pub_date').filter(
+        pk=post_id).first()
+    if post is None or is_celebrity(post.author_id):
+        return
+    followers = (Follow.objects.filter(author_id=post.author_id)
+                 .values_list('user_id', flat=True))
+    _save(_entries(followers.iterator(), post))
+
+
+def _latest(author_id, limit):
+    return (Post.objects.filter(author_id=author_id)
+            .order_by('-pub_date', '-id')
+            .only('id', 'author_id', 'pub_date')[:limit])
+
+
+def backfill(user_id, author_id, limit=TIMELINE_BACKFILL):
+    """Добавляет в ленту последние посты автора после подписки."""
+    if is_celebrity(author_id):
+        return
+    _save(entry for post in _latest(author_id, limit)
+          for entry in _entries((user_id,), post))
+
+
+def trim(user_id, author_id):
+    """Убирает посты автора из ленты после отписки."""
+    TimelineEntry.objects.filter(user_id=user_id,
+                                 author_id=author_id).delete()
+
+
+def rebuild(limit=TIMELINE_BACKFILL):
+    """Заново заполняет ленты по всем подпискам.
+
+    Обход идёт по авторам: их последние посты читаются один раз
+    и раскладываются сразу всем подписчикам, каждый автор — в своей
+    транзакции.
+    """
+    celebrities = UserCounter.objects.filter(
+        followers_count__gt=TIMELINE_FANOUT_LIMIT
+    ).values_list('user_id', flat=True)
+    authors = (Follow.objects.exclude(author_id__in=celebrities)
+               .order_by('author_id').values_list('author_id', flat=True)
+               .distinct())
+    for author_id in authors.iterator():
+        followers = list(Follow.objects.filter(author_id=author_id)
+                         .values_list('user_id', flat=True))
+        with transaction.atomic():
+            _save(entry for post in _latest(author_id, limit)
+                  for entry in _entries(followers, post))
+
+
+class TimelinePaginator(CursorPaginator):
+    """Лента подписок: материализованная лента плюс посты знаменитостей.
+
+    Основная часть читается по индексу `(user, -pub_date, -post)`
+    одним диапазонным запросом. Посты авторов, у которых подписчиков
+    больше `TIMELINE_FANOUT_LIMIT`, читаются напрямую и сливаются
+    с лентой по тому же ключу `(pub_date, id)`. Так же читаются посты
+    всех подписок за последние `TIMELINE_PENDING_SECONDS`: рассылка
+    идёт через очередь и может ещё не дойти до ленты.
+
+    `object_list` — обычная выборка постов подписок, она нужна только
+    для старых ссылок `?page=`.
+    """
+
+    entry_ordering = ('-pub_date', '-post_id')
+
+    def __init__(self, object_list, per_page, user, **kwargs):
+        self.user = user
+        super().__init__(object_list, per_page, **kwargs)
+
+    def _celebrities(self):
+        return Follow.objects.filter(
+            user=self.user,
+            author__counters__followers_count__gt=TIMELINE_FANOUT_LIMIT,
+        ).values_list('author_id', flat=True)
+
+    def _rows(self, values=None, reverse=False):
+        limit = self.per_page + 1
+        entries = TimelineEntry.objects.filter(user=self.user)
+        ordering = self.entry_ordering
+        if values is not None:
+            entries = entries.filter(self._seek(values, reverse, ordering))
+        if reverse:
+            ordering = self._reversed_ordering(ordering)
+        entries = (entries.order_by(*ordering)
+                   .select_related('post__author', 'post__group')[:limit])
+        rows = [entry.post for entry in entries]
+
+        posts = Post.objects.select_related('author', 'group')
+        if values is not None:
+            posts = posts.filter(self._seek(values, reverse))
+        # Окно короткое, его посты сортируются вместе с остальными ниже.
+        pending = timezone.now() - timedelta(seconds=TIMELINE_PENDING_SECONDS)
+        rows.extend(posts.filter(
+            author_id__in=Follow.objects.filter(user=self.user)
+            .values('author_id'),
+            pub_date__gte=pending,
+        ).order_by())
+        celebrities = list(self._celebrities())
+        if celebrities:
+            ordering = (self._reversed_ordering() if reverse
+                        else self.ordering)
+            rows.extend(posts.filter(author_id__in=celebrities)
+                        .order_by(*ordering)[:limit])
+        unique = {post.pk: post for post in rows}
+        rows = sorted(unique.values(),
+                      key=lambda post: (post.pub_date, post.pk),
+                      reverse=not reverse)
+        return rows[:limit]
@@ -1,9 +1,11 @@
-from django.urls import path
+from django.urls import path, register_converter
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
+register_converter(feeds.FeedFormatConverter, 'feed')
+
 urlpatterns = [
     path('', views.index, name='main'),
     path('group/<slug:slug>/', views.group_post, name='blog'),
@@ -13,9 +15,17 @@ urlpatterns = [
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
+    path('posts/<int:post_id>/comments/', views.comments, name='comments'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('session/', views.session, name='session'),
+    path('search/', views.search, name='search'),
     path('profile/<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
     path('profile/<str:username>/unfollow/', views.profile_unfollow,
          name='profile_unfollow'),
+    path('feed/<feed:format>/', feeds.index_feed, name='index_feed'),
+    path('group/<slug:slug>/feed/<feed:format>/', feeds.group_feed,
+         name='group_feed'),
+    path('profile/<str:username>/feed/<feed:format>/', feeds.author_feed,
+         name='author_feed'),
 ]
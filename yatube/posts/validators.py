@@ -0,0 +1,155 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import Max, OuterRef, Subquery
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from core.cache import versions
+from core.cache.singleflight import get_or_compute
+from core.constants.constants import FEED_CACHE_SECONDS, PAGE_SHARED_MAX_AGE
+from core.db.replicas import is_pinned, primary_reads
+from .models import Comment, Post, User
+
+
+def touch(post_ids=(), author_ids=(), group_ids=()):
+    """Меняет версии страниц, на которых видны карточки этих постов.
+
+    Нужна для изменений, которые не трогают сами ленты: комментарии,
+    миниатюры, имя автора. Добавление, правку и удаление постов
+    покрывает версия ленты из `feed_cache`.
+    """
+    scopes = {'index'}
+    scopes.update(f'author:{pk}' for pk in author_ids)
+    scopes.update(f'group:{pk}' for pk in group_ids if pk is not None)
+    if post_ids:
+        for author_id, group_id in Post.objects.filter(
+                pk__in=post_ids).values_list('author_id', 'group_id'):
+            scopes.add(f'author:{author_id}')
+            if group_id is not None:
+                scopes.add(f'group:{group_id}')
+    for scope in scopes:
+        versions.bump(f'page:{scope}')
+
+
+def _newest(**lookups):
+    return Subquery(Post.objects.filter(**lookups)
+                    .order_by('-pub_date').values('pub_date')[:1])
+
+
+def _scope_versions(scope, *extra):
+    names = [f'feed:{scope}', f'page:{scope}', *extra]
+    found = versions.get_versions(names)
+    return [found[name] for name in names]
+
+
+def _newest_post():
+    with primary_reads():
+        return Post.objects.aggregate(newest=Max('pub_date'))
+
+
+def index(request, **kwargs):
+    """Вся лента: версии из кэша, дата — тоже из кэша по версии ленты.
+
+    Как и страница ленты, дата для кэша читается с основной базы,
+    а после записи — мимо кэша.
+    """
+    parts = _scope_versions('index')
+    if is_pinned(request):
+        newest = _newest_post()['newest']
+    else:
+        newest = get_or_compute(f'feed:index:{parts[0]}:newest',
+                                _newest_post, FEED_CACHE_SECONDS)['newest']
+    return (parts, newest) if newest is not None else (None, None)
+
+
+def group(request, slug, **kwargs):
+    row = Post.objects.filter(group__slug=slug).aggregate(
+        newest=Max('pub_date'), group=Max('group_id')
+    )
+    if row['newest'] is None:
+        return None, None
+    pk = row['group']
+    return (_scope_versions(f'group:{pk}', f'fragment:group:{pk}'),
+            row['newest'])
+
+
+def author(request, username, **kwargs):
+    """Лента автора и его счётчики: в шапке профиля видны подписчики."""
+    row = next(iter(User.objects.filter(username=username).order_by().values(
+        'pk', 'counters__posts_count', 'counters__followers_count',
+        'counters__following_count', newest=_newest(author=OuterRef('pk')),
+    )), None)
+    if row is None or row['newest'] is None:
+        return None, None
+    pk = row.pop('pk')
+    newest = row.pop('newest')
+    return (_scope_versions(f'author:{pk}', f'fragment:author:{pk}')
+            + list(row.values()), newest)
+
+
+def post(request, post_id):
+    """Правка поста, последний комментарий и версии его фрагментов."""
+    row = next(iter(Post.objects.filter(pk=post_id).order_by().values(
+        'updated', 'author_id', 'group_id', 'author__counters__posts_count',
+        last_comment=Subquery(Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by('-created').values('created')[:1]),
+    )), None)
+    if row is None:
+        return None, None
+    names = [f'fragment:post:{post_id}', f'fragment:author:{row["author_id"]}']
+    if row['group_id'] is not None:
+        names.append(f'fragment:group:{row["group_id"]}')
+    found = versions.get_versions(names)
+    parts = [found[name] for name in names]
+    parts.append(row['author__counters__posts_count'])
+    modified = max(filter(None, (row['updated'], row['last_comment'])))
+    return parts, modified
+
+
+def conditional(compute, private=True):
+    """`condition` с ETag и Last-Modified из одного вызова `compute`.
+
+    `compute(request, *args, **kwargs)` возвращает части ETag и дату
+    последнего изменения или (None, None), если проверять нечего.
+    Ответ 304 отдаётся до запросов представления и рендеринга.
+    Личные страницы зависят от пользователя: его id входит в ETag,
+    а ответ помечается `private, no-cache`, чтобы браузер всегда
+    переспрашивал сервер, а общие кэши его не хранили. Общие
+    одинаковы для всех: кэш на краю сети держит их
+    `PAGE_SHARED_MAX_AGE` секунд, браузер переспрашивает каждый раз.
+    """
+    def state(request, *args, **kwargs):
+        if not hasattr(request, 'validators'):
+            parts, modified = compute(request, *args, **kwargs)
+            etag = None
+            if parts is not None:
+                if private:
+                    parts = [request.user.pk, *parts]
+                etag = hashlib.md5(
+                    ':'.join(map(str, parts)).encode()
+                ).hexdigest()
+            request.validators = (etag, modified)
+        return request.validators
+
+    def decorator(view):
+        view = condition(
+            etag_func=lambda *args, **kwargs: state(*args, **kwargs)[0],
+            last_modified_func=lambda *args, **kwargs: (
+                state(*args, **kwargs)[1]
+            ),
+        )(view)
+        if private:
+            control = {'private': True, 'no_cache': True}
+        else:
+            control = {'public': True, 'max_age': 0,
+                       's_maxage': PAGE_SHARED_MAX_AGE}
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            patch_cache_control(response, **control)
+            return response
+        return wrapper
+    return decorator
@@ -1,26 +1,55 @@
-from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.views.decorators.cache import never_cache
 
-from core.constants.constants import (get_object_or_none,
-                                      ELEMENTS_PER_PAGE,
-                                      CACHE_SECONDS)
-from .forms import CommentForm, PostForm
+from core import uploads
+from core.constants.constants import COMMENTS_PER_PAGE, ELEMENTS_PER_PAGE
+from core.db.replicas import use_primary, use_replica
+from core.middleware.querybudget import query_budget
+from . import feed_cache, validators
+from .counters import get_counters
+from .follows import followed_ids
+from .forms import CommentForm, PostForm, SearchForm
+from .fragments import attach_versions
 from .models import Comment, Follow, Group, Post, User
+from .paginators import CursorPaginator
+from .search import get_backend
+from .timeline import TimelinePaginator
 
 
-def paginator(request, list):
-    paginator = Paginator(list, ELEMENTS_PER_PAGE)
+def paginator(request, list, paginator_class=CursorPaginator, **kwargs):
+    paginator = paginator_class(list, ELEMENTS_PER_PAGE, **kwargs)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if page_number is not None:
+        page_obj = paginator.get_page(page_number)
+    else:
+        page_obj = paginator.get_cursor_page(request.GET.get('cursor'))
+    attach_versions(page_obj.object_list)
     return page_obj
 
 
-@cache_page(CACHE_SECONDS, key_prefix='index_page')
+def comment_page(request, post_id):
+    """Страница комментариев по курсору вместе с авторами."""
+    comments = Comment.objects.select_related('author').filter(
+        post=post_id)
+    paginator = CursorPaginator(comments, COMMENTS_PER_PAGE,
+                                ordering=('-created', '-id'))
+    return paginator.get_cursor_page(request.GET.get('cursor'))
+
+
+def cached_paginator(request, scope, list):
+    return feed_cache.get_page(request, scope, list,
+                               lambda: paginator(request, list))
+
+
+@query_budget(5)
+@use_replica
+@validators.conditional(validators.index, private=False)
 def index(request):
-    post_list = Post.objects.select_related().all()
-    page_obj = paginator(request, post_list)
+    post_list = Post.objects.select_related('author', 'group')
+    page_obj = cached_paginator(request, 'index', post_list)
     template = "posts/index.html"
     title = "Последние обновления на сайте"
     title_body = "Последние обновления на сайте"
@@ -28,15 +57,20 @@ def index(request):
         "page_obj": page_obj,
         "title": title,
         "title_body": title_body,
+        "public_page": True,
     }
     return render(request, template, context)
 
 
+@query_budget(6)
+@use_replica
+@validators.conditional(validators.group, private=False)
 def group_post(request, slug):
     group = get_object_or_404(Group, slug=slug)
     description_body = group.description
-    group_list = Post.objects.select_related('group').filter(group=group)
-    page_obj = paginator(request, group_list)
+    group_list = Post.objects.select_related('author', 'group').filter(
+        group=group)
+    page_obj = cached_paginator(request, f'group:{group.pk}', group_list)
     template = "posts/group_list.html"
     title = group.title
     title_body = group.title
@@ -46,76 +80,130 @@ def group_post(request, slug):
         "title_body": title_body,
         'slug': slug,
         'page_obj': page_obj,
-
+        'public_page': True,
     }
     return render(request, template, context)
 
 
+@query_budget(8)
+@use_replica
+@validators.conditional(validators.author, private=False)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    posts = Post.objects.select_related('author').filter(author=user)
-    page_obj = paginator(request, posts)
-    following = False
-    if request.user.is_authenticated:
-        is_follow = get_object_or_none(Follow, user=request.user, author=user)
-        if is_follow:
-            following = True
-
-    if request.user == user:
-        not_self_follow = False
-    else:
-        not_self_follow = True
-
+    user = get_object_or_404(User.objects.select_related('counters'),
+                             username=username)
+    counters = get_counters(user)
+    posts = Post.objects.select_related('author', 'group').filter(
+        author=user)
+    page_obj = cached_paginator(request, f'author:{user.pk}', posts)
     context = {
         'username': user,
+        'counters': counters,
+        'posts_count': counters.posts_count,
         'page_obj': page_obj,
-        'following': following,
-        'not_self_follow': not_self_follow,
+        'public_page': True,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@query_budget(6)
+@use_replica
+@validators.conditional(validators.post, private=False)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__counters', 'group'),
+        pk=post_id
+    )
     username = post.author
     thirty_symbols = post.text[:30]
-    form_comment = CommentForm()
-    post_comments = Comment.objects.select_related('post').filter(post=post_id)
+    post_comments = comment_page(request, post_id)
     context = {
         'post': post,
         'thirty_symbols': thirty_symbols,
         'post_id': post_id,
-        'form_comment': form_comment,
         'post_comments': post_comments,
+        'form_comment': CommentForm(),
         'username': username,
-
+        'posts_count': get_counters(username).posts_count,
+        'public_page': True,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(3)
+@use_replica
+@never_cache
+def session(request):
+    """Личная часть общих страниц одним маленьким ответом.
+
+    Общие страницы одинаковы для всех и кэшируются на краю сети,
+    а шапку пользователя, вкладки ленты, кнопку подписки и форму
+    комментария с CSRF-токеном скрипт со страницы берёт отсюда.
+    В параметрах — места на странице и их значения; у кнопок
+    подписки значение `id:username` автора, их может быть много.
+    """
+    user = request.user
+    context = {
+        'nav': 'nav' in request.GET,
+        'switcher': 'switcher' in request.GET,
+        'main': request.GET.get('switcher') == 'main',
+    }
+    values = request.GET.getlist('follow')
+    if values and user.is_authenticated:
+        followed = followed_ids(user)
+        context['follows'] = [
+            {'value': value, 'author': username,
+             'following': int(author_id) in followed}
+            for value in dict.fromkeys(values)
+            for author_id, _, username in [value.partition(':')]
+            if author_id.isdigit() and username
+            and int(author_id) != user.pk
+        ]
+    post_id = request.GET.get('comment_form', '')
+    if post_id.isdigit():
+        context.update(post_id=int(post_id), form_comment=CommentForm())
+    return render(request, 'posts/session.html', context)
+
+
+@query_budget(1)
+@use_replica
+def comments(request, post_id):
+    """Следующая страница комментариев фрагментом для «Показать ещё»."""
+    return render(request, 'posts/includes/comments.html', {
+        'post_id': post_id,
+        'post_comments': comment_page(request, post_id),
+    })
+
+
+@query_budget(12)
+@use_primary
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
     if request.method == 'POST':
         form = PostForm(request.POST,
-                        files=request.FILES or None)
+                        files=request.FILES or None,
+                        oversized=uploads.oversized(request))
         if form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
-            post.save()
+            with transaction.atomic():
+                post.save()
             return redirect("posts:profile", post.author)
     form = PostForm()
     return render(request, template, {'form': form})
 
 
+@query_budget(10)
+@use_primary
 @login_required
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
     post = get_object_or_404(Post, id=post_id)
-    if post.author == request.user:
+    if post.author_id == request.user.id:
         if request.method == 'POST':
             form = PostForm(request.POST,
                             files=request.FILES or None,
+                            oversized=uploads.oversized(request),
                             instance=post)
             if form.is_valid():
                 form.save()
@@ -125,6 +213,8 @@ def post_edit(request, post_id):
                                           'post_id': post_id})
 
 
+@query_budget(6)
+@use_primary
 @login_required
 def add_comment(request, post_id):
     post = Post.objects.get(id=post_id)
@@ -137,20 +227,49 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@query_budget(6)
+def search(request):
+    form = SearchForm(request.GET or None)
+    page_obj = None
+    if form.is_valid():
+        ids = get_backend().search(form.cleaned_data['q'],
+                                   group=form.cleaned_data['group'],
+                                   author=form.cleaned_data['author'])
+        page_obj = Paginator(ids, ELEMENTS_PER_PAGE).get_page(
+            request.GET.get('page'))
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            page_obj.object_list)
+        page_obj.object_list = attach_versions(
+            [posts[pk] for pk in page_obj.object_list if pk in posts])
+    query = request.GET.copy()
+    query.pop('page', None)
+    context = {
+        'form': form,
+        'page_obj': page_obj,
+        'query_string': query.urlencode(),
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@query_budget(5)
+@use_replica
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
     user = request.user
 
-    posts_list = Post.objects.select_related('author').filter(
+    posts_list = Post.objects.select_related('author', 'group').filter(
         author__following__user=user)
-    page_obj = paginator(request, posts_list)
+    page_obj = paginator(request, posts_list,
+                         paginator_class=TimelinePaginator, user=user)
     context = {
         'page_obj': page_obj,
     }
     return render(request, template, context)
 
 
+@query_budget(13)
+@use_primary
 @login_required
 def profile_follow(request, username):
     user = request.user
@@ -163,11 +282,12 @@ def profile_follow(request, username):
     return redirect('posts:main')
 
 
+@query_budget(8)
+@use_primary
 @login_required
 def profile_unfollow(request, username):
-    user = request.user
     Follow.objects.get(
-        user=User.objects.get(username=user),
-        author=User.objects.get(username=username),
+        user=request.user,
+        author__username=username,
     ).delete()
     return redirect('posts:main')
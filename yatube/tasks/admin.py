@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'key', 'attempts', 'run_at', 'failed')
+    list_filter = ('failed', 'name')
+    search_fields = ('name', 'key')
+
+
+admin.site.register(Task, TaskAdmin)
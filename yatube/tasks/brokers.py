@@ -0,0 +1,109 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from .models import Task
+from .queue import execute, retry_delay
+
+logger = logging.getLogger(__name__)
+
+
+class Broker:
+    """Принимает задачи, которые `queue.enqueue` отдаёт после фиксации."""
+
+    def push(self, message):
+        raise NotImplementedError
+
+    def push_many(self, messages):
+        """Задачи одной фиксации; брокер может принять их одним заходом."""
+        for message in messages:
+            self.push(message)
+
+
+class ImmediateBroker(Broker):
+    """Выполняет задачу сразу, в потоке запроса.
+
+    Для тестов: всё происходит так же, как без очереди, только после
+    фиксации транзакции. Ошибка задачи пишется в лог, а не поднимается:
+    запись уже зафиксирована, и ответ 500 толкал бы отправить её снова.
+    """
+
+    def push(self, message):
+        try:
+            execute(message)
+        except Exception:
+            logger.exception('Задача %s не удалась', message['task'])
+
+    def push_many(self, messages):
+        try:
+            execute(*messages)
+        except Exception:
+            # По одной, чтобы упавшая задача не откатила остальные.
+            for message in messages:
+                self.push(message)
+
+
+class LocalBroker(Broker):
+    """Пул потоков в процессе веб-сервера вместо отдельного брокера.
+
+    Повторы и ключи идемпотентности работают в пределах процесса;
+    при его перезапуске невыполненные задачи теряются.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.TASKS_LOCAL_WORKERS,
+            thread_name_prefix='tasks',
+        )
+        self._waiting = set()
+        self._lock = threading.Lock()
+
+    def push(self, message):
+        key = message['key']
+        if key is not None:
+            with self._lock:
+                if key in self._waiting:
+                    return
+                self._waiting.add(key)
+        self._executor.submit(self._run, message)
+
+    def _run(self, message):
+        with self._lock:
+            self._waiting.discard(message['key'])
+        try:
+            for attempt in range(1, message['max_attempts'] + 1):
+                try:
+                    execute(message)
+                    return
+                except Exception:
+                    logger.exception('Задача %s: попытка %s не удалась',
+                                     message['task'], attempt)
+                if attempt < message['max_attempts']:
+                    time.sleep(retry_delay(attempt))
+        finally:
+            connections.close_all()
+
+
+class DatabaseBroker(Broker):
+    """Очередь в таблице `tasks_task`, её разбирает `manage.py run_tasks`.
+
+    Повтор с тем же ключом, пока прежняя задача не взята воркером,
+    тихо пропускается уникальным индексом.
+    """
+
+    def push(self, message):
+        self.push_many([message])
+
+    def push_many(self, messages):
+        Task.objects.bulk_create([Task(
+            name=message['task'],
+            arguments=json.dumps({'args': message['args'],
+                                  'kwargs': message['kwargs']}),
+            key=message['key'],
+            max_attempts=message['max_attempts'],
+        ) for message in messages], ignore_conflicts=True)
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.constants.constants import TASK_BATCH_SIZE, TASK_POLL_INTERVAL
+from tasks.worker import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди в базе (TASKS_BROKER = DatabaseBroker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Разобрать очередь и выйти')
+        parser.add_argument('--batch', type=int, default=TASK_BATCH_SIZE,
+                            help='Сколько задач брать за раз')
+        parser.add_argument('--interval', type=float,
+                            default=TASK_POLL_INTERVAL,
+                            help='Пауза в секундах, когда очередь пуста')
+
+    def handle(self, *args, **options):
+        total_done = total_failed = 0
+        while True:
+            close_old_connections()
+            done, failed = run_pending(options['batch'])
+            total_done += done
+            total_failed += failed
+            if done or failed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(
+            f'Выполнено: {total_done}, с ошибкой: {total_failed}'
+        )
@@ -0,0 +1,50 @@
+import json
+
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    name = models.CharField(max_length=200, verbose_name='Задача')
+    arguments = models.TextField(verbose_name='Аргументы')
+    key = models.CharField(
+        max_length=200,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name='Ключ идемпотентности'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток не больше'
+    )
+    run_at = models.DateTimeField(default=timezone.now,
+                                  verbose_name='Выполнить после')
+    locked_until = models.DateTimeField(null=True, blank=True,
+                                        verbose_name='Занята до')
+    failed = models.BooleanField(default=False, verbose_name='Не удалась')
+    last_error = models.TextField(blank=True, default='',
+                                  verbose_name='Последняя ошибка')
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Дата постановки')
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(fields=('failed', 'run_at'),
+                         name='task_failed_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def message(self):
+        """Сообщение в том виде, в каком его ставит `queue.enqueue`."""
+        return {'task': self.name, 'key': self.key,
+                'max_attempts': self.max_attempts,
+                **json.loads(self.arguments)}
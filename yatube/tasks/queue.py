@@ -0,0 +1,101 @@
+import functools
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from core.constants.constants import TASK_MAX_ATTEMPTS, TASK_RETRY_DELAY
+
+_brokers = {}
+
+
+def task(func=None, *, attempts=TASK_MAX_ATTEMPTS):
+    """Помечает функцию как задачу очереди.
+
+    Задача находится по модулю и имени, аргументы должны
+    укладываться в JSON. Доставка — хотя бы один раз: задачу
+    могут выполнить повторно, и это не должно ничего ломать.
+    """
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.max_attempts = attempts
+        return func
+    return decorator if func is None else decorator(func)
+
+
+def get_broker():
+    path = settings.TASKS_BROKER
+    if path not in _brokers:
+        _brokers[path] = import_string(path)()
+    return _brokers[path]
+
+
+def enqueue(func, *args, key=None, **kwargs):
+    """Ставит задачу в очередь после фиксации текущей транзакции.
+
+    Если транзакция откатится, задачи не будет. `key` — ключ
+    идемпотентности: пока задача с таким ключом ждёт своей очереди,
+    такая же вторая не ставится. Задачи одной транзакции уходят
+    брокеру вместе, после её фиксации.
+    """
+    message = {'task': func.task_name, 'key': key,
+               'max_attempts': func.max_attempts,
+               'args': list(args), 'kwargs': kwargs}
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        transaction.on_commit(lambda: get_broker().push(message))
+        return
+    pending = connection.__dict__.setdefault('queued_tasks', [])
+    transaction.on_commit(lambda: pending.append(message))
+    flush = connection.__dict__.setdefault(
+        'queued_tasks_flush', functools.partial(_flush, connection)
+    )
+    _run_last_on_commit(connection, flush)
+
+
+def _run_last_on_commit(connection, func):
+    """Ставит `func` последним хуком фиксации, вне точек сохранения.
+
+    Публичного способа для этого нет, поэтому список хуков правится
+    напрямую. Его элементы — пары `(sids, func)` в Django 2.2–3.1;
+    с 3.2 к ним добавляется `robust`, и эту функцию надо обновить
+    вместе с Django.
+    """
+    hooks = connection.run_on_commit
+    hooks[:] = [hook for hook in hooks if hook[1] is not func]
+    hooks.append((set(), func))
+
+
+def _flush(connection):
+    """Отдаёт брокеру задачи одной фиксации одним `push_many`.
+
+    Каждая задача попадает в список своим хуком `on_commit`, так что
+    откат точки сохранения убирает ровно её задачи. Сам этот хук
+    всегда стоит последним и не привязан к точкам сохранения.
+    """
+    pending = connection.__dict__.get('queued_tasks', [])
+    messages = pending[:]
+    pending.clear()
+    if messages:
+        get_broker().push_many(messages)
+
+
+def resolve(name):
+    func = import_string(name)
+    if getattr(func, 'task_name', None) != name:
+        raise ImportError(f'{name} не помечена как задача')
+    return func
+
+
+def execute(*messages):
+    """Выполняет задачи в одной транзакции: при ошибке их работа
+    откатывается."""
+    funcs = [resolve(message['task']) for message in messages]
+    with transaction.atomic():
+        for func, message in zip(funcs, messages):
+            func(*message['args'], **message['kwargs'])
+
+
+def retry_delay(attempt):
+    """Пауза перед повтором в секундах, удваивается с каждой попыткой."""
+    return TASK_RETRY_DELAY * 2 ** (attempt - 1)
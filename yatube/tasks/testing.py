@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+@contextmanager
+def run_on_commit(using=DEFAULT_DB_ALIAS):
+    """Выполняет хуки `on_commit`, поставленные внутри блока.
+
+    Транзакция `TestCase` не фиксируется, и без этого задачи очереди
+    в тестах не запускаются. Замена `captureOnCommitCallbacks(execute=True)`
+    из Django 3.2.
+    """
+    connection = connections[using]
+    before = list(connection.run_on_commit)
+    yield
+    while True:
+        added = [index for index, hook in enumerate(connection.run_on_commit)
+                 if not any(hook is old for old in before)]
+        if not added:
+            return
+        _, callback = connection.run_on_commit.pop(added[0])
+        callback()
+
+
+class TestRunner(DiscoverRunner):
+    """Запускает тесты с `ImmediateBroker`: задачи выполняются сразу
+    после фиксации, и их результат можно проверить в том же тесте.
+
+    Картинки обрабатываются в том же процессе: иначе пул может ещё
+    писать миниатюру, когда тест уже удалил временный MEDIA_ROOT.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.overrides = override_settings(
+            TASKS_BROKER='tasks.brokers.ImmediateBroker',
+            POSTS_IMAGE_WORKERS=0,
+        )
+        self.overrides.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.overrides.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,163 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..brokers import ImmediateBroker, LocalBroker
+from ..models import Task
+from ..queue import enqueue, task
+from ..testing import run_on_commit
+from ..worker import claim, run_pending
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(attempts=2)
+def explode():
+    raise RuntimeError('сломалось')
+
+
+@override_settings(TASKS_BROKER='tasks.brokers.DatabaseBroker')
+class DatabaseQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_after_commit(self):
+        """Проверяем, что задача появляется только после фиксации"""
+        with run_on_commit():
+            enqueue(record, 1)
+            self.assertFalse(Task.objects.exists())
+        self.assertEqual(Task.objects.get().message['args'], [1])
+
+    def test_rollback_drops_task(self):
+        """Проверяем, что при откате транзакции задачи нет"""
+        with run_on_commit():
+            with transaction.atomic():
+                enqueue(record, 1)
+                transaction.set_rollback(True)
+        self.assertFalse(Task.objects.exists())
+
+    def test_one_push_per_commit(self):
+        """Проверяем, что задачи одной транзакции уходят одной вставкой,
+        а откат точки сохранения убирает только её задачи"""
+        with mock.patch.object(Task.objects, 'bulk_create',
+                               wraps=Task.objects.bulk_create) as insert:
+            with run_on_commit():
+                with transaction.atomic():
+                    enqueue(record, 1)
+                    with transaction.atomic():
+                        enqueue(record, 2)
+                        transaction.set_rollback(True)
+                    enqueue(record, 3)
+        insert.assert_called_once()
+        self.assertEqual(
+            sorted(task.message['args'] for task in Task.objects.all()),
+            [[1], [3]]
+        )
+
+    def test_idempotency_key(self):
+        """Проверяем, что ждущая задача с тем же ключом не дублируется,
+        а взятая воркером ключ освобождает"""
+        with run_on_commit():
+            enqueue(record, 1, key='record')
+            enqueue(record, 2, key='record')
+        self.assertEqual(Task.objects.count(), 1)
+        claim()
+        with run_on_commit():
+            enqueue(record, 3, key='record')
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_worker_runs_and_deletes(self):
+        """Проверяем, что воркер выполняет задачи и удаляет их"""
+        with run_on_commit():
+            enqueue(record, 1)
+            enqueue(record, 2)
+        self.assertEqual(run_pending(), (2, 0))
+        self.assertEqual(calls, [1, 2])
+        self.assertFalse(Task.objects.exists())
+
+    def test_retry_then_fail(self):
+        """Проверяем повтор с паузой и пометку после последней попытки"""
+        with run_on_commit():
+            enqueue(explode)
+        with self.assertLogs('tasks', 'ERROR'):
+            self.assertEqual(run_pending(), (0, 1))
+        failed = Task.objects.get()
+        self.assertEqual(failed.attempts, 1)
+        self.assertGreater(failed.run_at, timezone.now())
+        self.assertIn('сломалось', failed.last_error)
+        self.assertEqual(run_pending(), (0, 0))
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('tasks', 'ERROR'):
+            self.assertEqual(run_pending(), (0, 1))
+        self.assertTrue(Task.objects.get().failed)
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(run_pending(), (0, 0))
+
+    def test_lease(self):
+        """Проверяем, что взятую задачу другой воркер получит
+        только после истечения аренды"""
+        with run_on_commit():
+            enqueue(record, 1)
+        self.assertEqual(len(claim()), 1)
+        self.assertEqual(claim(), [])
+        Task.objects.update(locked_until=timezone.now() - timedelta(1))
+        self.assertEqual(len(claim()), 1)
+
+    def test_command(self):
+        """Проверяем, что команда разбирает очередь и завершается"""
+        with run_on_commit():
+            enqueue(record, 1)
+        out = StringIO()
+        call_command('run_tasks', '--once', stdout=out)
+        self.assertEqual(calls, [1])
+        self.assertIn('Выполнено: 1', out.getvalue())
+
+
+class LocalBrokerTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    @mock.patch('tasks.brokers.execute')
+    @mock.patch('tasks.brokers.time.sleep')
+    def test_retries_in_process(self, sleep, execute):
+        """Проверяем повторы в пуле потоков и пропуск ждущего ключа"""
+        execute.side_effect = [RuntimeError, None]
+        broker = LocalBroker()
+        message = {'task': record.task_name, 'key': 'record',
+                   'max_attempts': 3, 'args': [1], 'kwargs': {}}
+        broker._waiting.add('record')
+        broker.push(message)
+        broker._waiting.clear()
+        with self.assertLogs('tasks', 'ERROR'):
+            broker.push(message)
+            broker._executor.shutdown(wait=True)
+        self.assertEqual(execute.call_count, 2)
+        sleep.assert_called_once()
+
+
+class ImmediateBrokerTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_failure_logged(self):
+        """Проверяем, что упавшая задача пишется в лог и не мешает
+        остальным задачам той же фиксации"""
+        messages = [
+            {'task': func.task_name, 'key': None, 'max_attempts': 1,
+             'args': args, 'kwargs': {}}
+            for func, args in ((record, [1]), (explode, []), (record, [2]))
+        ]
+        with self.assertLogs('tasks', 'ERROR'):
+            ImmediateBroker().push_many(messages)
+        self.assertEqual(calls, [1, 1, 2])
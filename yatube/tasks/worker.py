@@ -0,0 +1,66 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.constants.constants import TASK_BATCH_SIZE, TASK_LEASE_SECONDS
+from .models import Task
+from .queue import execute, retry_delay
+
+logger = logging.getLogger(__name__)
+
+
+def _free(now):
+    return Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+
+
+def claim(limit=TASK_BATCH_SIZE, lease=TASK_LEASE_SECONDS):
+    """Забирает готовые задачи на время `lease` секунд.
+
+    Каждая задача берётся отдельным условным UPDATE, поэтому два
+    воркера не получат одну и ту же. Если воркер упадёт, аренда
+    истечёт и задачу возьмёт другой. Ключ освобождается сразу:
+    событие, пришедшее во время выполнения, поставит новую задачу.
+    """
+    now = timezone.now()
+    due = list(Task.objects.filter(_free(now), failed=False, run_at__lte=now)
+               .order_by('run_at').values_list('pk', flat=True)[:limit])
+    claimed = [pk for pk in due if Task.objects.filter(_free(now), pk=pk)
+               .update(locked_until=now + timedelta(seconds=lease),
+                       attempts=F('attempts') + 1, key=None)]
+    return list(Task.objects.filter(pk__in=claimed).order_by('run_at'))
+
+
+def process(task):
+    """Выполняет задачу: удачная удаляется, неудачная ждёт повтора.
+
+    Исчерпавшая попытки остаётся в таблице с `failed` для разбора.
+    """
+    try:
+        execute(task.message)
+    except Exception:
+        logger.exception('Задача %s (%s) не удалась', task.pk, task.name)
+        changes = {'locked_until': None, 'last_error': traceback.format_exc()}
+        if task.attempts >= task.max_attempts:
+            changes['failed'] = True
+        else:
+            changes['run_at'] = timezone.now() + timedelta(
+                seconds=retry_delay(task.attempts)
+            )
+        Task.objects.filter(pk=task.pk).update(**changes)
+        return False
+    Task.objects.filter(pk=task.pk).delete()
+    return True
+
+
+def run_pending(limit=TASK_BATCH_SIZE):
+    """Одна порция задач; возвращает число удачных и неудачных."""
+    done = failed = 0
+    for task in claim(limit):
+        if process(task):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
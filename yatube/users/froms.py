@@ -1,7 +1,9 @@
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.contrib.auth import get_user_model
 from django import forms
 
+from notifications import mail
+from tasks import queue
 from .models import Contact
 
 User = get_user_model()
@@ -13,6 +15,24 @@ class CreationForm(UserCreationForm):
         fields = ('first_name', 'last_name', 'username', 'email')
 
 
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Письмо сброса пароля уходит из очереди задач.
+
+    Токен в очередь не попадает: задача получает id пользователя
+    и сама собирает ссылку, см. `mail.send_password_reset`.
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        public = {name: value for name, value in context.items()
+                  if name not in ('user', 'uid', 'token')}
+        queue.enqueue(mail.send_password_reset, context['user'].pk,
+                      subject_template_name, email_template_name,
+                      from_email, to_email, public,
+                      html_email_template_name=html_email_template_name)
+
+
 class ContactForm(forms.ModelForm):
     class Meta:
         model = Contact
@@ -4,6 +4,7 @@ from django.contrib.auth.views import LoginView, LogoutView,\
 from django.urls import path
 
 from . import views
+from .froms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -17,7 +18,8 @@ urlpatterns = [
     path('login/', LoginView.as_view(template_name='users/login.html'),
          name='login'),
     path('password_reset/', PasswordResetView.as_view(
-        template_name='users/password_reset_form.html'),
+        template_name='users/password_reset_form.html',
+        form_class=QueuedPasswordResetForm),
         name='password_reset_form'),
     path('password_reset/done/', PasswordResetDoneView.as_view(
         template_name='users/password_reset_done.html'),
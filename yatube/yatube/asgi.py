@@ -0,0 +1,15 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``,
+e.g. ``uvicorn yatube.asgi:application``. Views still run synchronously,
+in a bounded thread pool, see ``core.asgi.ASGIHandler``.
+"""
+
+import os
+
+from core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = get_asgi_application()
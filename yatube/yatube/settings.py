@@ -50,10 +50,14 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'tasks.apps.TasksConfig',
+    'notifications.apps.NotificationsConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.querybudget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,15 +88,72 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Под ASGI-сервером представления выполняются в пуле из ASGI_THREADS
+# потоков, а медленные клиенты ждут в цикле событий.
+
+ASGI_APPLICATION = 'yatube.asgi.application'
+
+ASGI_THREADS = 8
+
+# Локальная замена кэша на краю сети перед WSGI-приложением,
+# см. core.edge.EdgeCache. В бою эту роль играют CDN или прокси.
+
+EDGE_CACHE = False
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Соединения берутся из пула core.db.pool и возвращаются в него в конце
+# запроса, поэтому CONN_MAX_AGE не нужен. Без пула включите CONN_MAX_AGE
+# и CONN_HEALTH_CHECKS, чтобы держать соединение между запросами.
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,
+            'pool': {'max_size': 8, 'timeout': 10, 'max_age': 600},
+        },
+    },
+    'replica': {
+        'ENGINE': 'core.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'timeout': 20,
+            'pool': {'max_size': 8, 'timeout': 10, 'max_age': 600},
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+# Реплика SQLite обновляется командой `replicate --interval 5`;
+# пока её ни разу не синхронизировали, всё читается с основной базы.
+
+DATABASE_ROUTERS = ['core.db.replicas.ReplicaRouter']
+
+DATABASE_REPLICAS = ['replica']
+
+DATABASE_REPLICA_APPS = ['posts']
+
+DATABASE_REPLICA_STRATEGY = 'round_robin'
+
+DATABASE_REPLICA_MAX_LAG = 30
+
+DATABASE_REPLICA_LAG_CHECK = 5
+
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
 }
 
 
@@ -142,14 +203,83 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Адрес сайта для ссылок в письмах, которые уходят не из запроса.
+
+SITE_URL = 'http://127.0.0.1:8000'
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Загрузки сразу пишутся во временный файл, а больше лимита
+# не принимаются вовсе.
+
+FILE_UPLOAD_HANDLERS = ['core.uploads.LimitedUploadHandler']
+
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+# Процессный LRU (L1) перед кэшем в файле SQLite (L2), общим для всех
+# воркеров. В разработке и тестах L2 живёт в памяти, чтобы данные
+# не переживали перезапуск.
+
 CACHES = {
     'default': {
+        'BACKEND': 'core.cache.backends.tiered.TieredCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 2,
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache.backends.sqlite.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'TIMEOUT': 600,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+if DEBUG:
+    CACHES['shared'] = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared',
     }
-}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+THUMBNAIL_CACHE = 'default'
+
+# Побочная работа записи (ленты подписок, поиск, миниатюры) идёт
+# через очередь, и запрос отвечает сразу после фиксации. Задачи
+# выполняет воркер `manage.py run_tasks`; без него подойдёт
+# tasks.brokers.LocalBroker с пулом потоков в веб-сервере.
+# Тесты запускает tasks.testing.TestRunner с ImmediateBroker.
+
+TASKS_BROKER = 'tasks.brokers.DatabaseBroker'
+
+TEST_RUNNER = 'tasks.testing.TestRunner'
+
+TASKS_LOCAL_WORKERS = 2
+
+# CounterCount читает денормализованные счётчики и не делает COUNT(*),
+# но после массовой загрузки без сигналов врёт до reconcile_counters.
+
+POSTS_COUNT_STRATEGY = 'posts.counts.CachedCount'
+
+POSTS_COUNT_CACHE_SECONDS = 60
+
+POSTS_IMAGE_WORKERS = 2
+
+POSTS_IMAGE_FORMAT = 'WEBP'
+
+# None — выбрать по СУБД, см. posts.search.get_backend.
+
+POSTS_SEARCH_BACKEND = None
+
+QUERY_BUDGET_ENABLED = DEBUG
+
+QUERY_BUDGET_RAISE = False
+
+QUERY_BUDGET_REPEAT_THRESHOLD = 3